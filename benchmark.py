@@ -0,0 +1,415 @@
+# benchmark.py
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import numpy as np
+from painter_algorithm import (look_at, perspective, transform_vertices, polygon_depths, pack_draw_buffers,
+                               cull_frustum, cull_backfaces)
+from polygons import create_random_polygons, create_random_3d_shapes
+from bvh import build_bvh
+from object_sort import ObjectSorter
+from indexed_mesh import weld
+from radix_sort import radix_depth_order
+from parallel_sort import ParallelSorter
+from tiles import screen_tiles
+from polygon_stream import PolygonStream, write_polygon_stream
+from mesh_io import read_obj, read_ply, read_mesh, write_obj, write_ply
+
+# ------------------------------------------------------
+# Benchmarks reproduzíveis (headless, sem GLUT)
+# ------------------------------------------------------
+# Mede separadamente cada etapa do pipeline do Painter's Algorithm em cenas
+# aleatórias com semente fixa e imprime os resultados em JSON. Com --baseline,
+# compara com um JSON salvo anteriormente e termina com erro se alguma etapa
+# ficou mais lenta que o limite permitido.
+#
+# Uso:
+#   python benchmark.py --sizes 1000,10000 --output base.json
+#   python benchmark.py --sizes 1000,10000 --baseline base.json --threshold 0.2
+
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+CAMERA_POS = np.array([0.0, 0.0, 5.0])
+CAMERA_TARGET = np.array([0.0, 0.0, 0.0])
+CAMERA_UP = np.array([0.0, 1.0, 0.0])
+PROJECTION = perspective(60.0, 800.0 / 600.0, 0.1, 100.0)
+NARROW_PROJECTION = perspective(10.0, 800.0 / 600.0, 0.1, 100.0)  # Vê uma pequena parte da cena
+
+# ------------------------------------------------------
+# Medição
+# ------------------------------------------------------
+
+def time_stage(func, repeat):
+    """Executa func() 'repeat' vezes; retorna (último resultado, tempos em ms)"""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return result, samples
+
+def summarize(samples):
+    """Mediana e percentis (em ms) de uma lista de tempos"""
+    s = np.asarray(samples, dtype=float)
+    return {
+        "median_ms": float(np.median(s)),
+        "p90_ms": float(np.percentile(s, 90)),
+        "p99_ms": float(np.percentile(s, 99)),
+        "min_ms": float(s.min()),
+        "samples": len(s),
+    }
+
+def record(results, suite, scene, size, stage, samples, **extra):
+    """Adiciona uma linha de resultado (um estágio de uma cena/tamanho)"""
+    row = {"suite": suite, "scene": scene, "size": size, "stage": stage}
+    row.update(summarize(samples))
+    row.update(extra)
+    results.append(row)
+
+# ------------------------------------------------------
+# Cenas com semente fixa
+# ------------------------------------------------------
+
+def random_polygons_scene(size, seed):
+    """~'size' triângulos planos (create_random_polygons gera 2 triângulos por quadrilátero)"""
+    return create_random_polygons(num=max(1, size // 2), rng=np.random.default_rng(seed))
+
+def random_shapes_scene(size, seed):
+    """Figuras 3D aleatórias com ~'size' triângulos no total (~100 triângulos por figura)"""
+    return create_random_3d_shapes(num_shapes=max(1, size // 100), rng=np.random.default_rng(seed))
+
+SCENES = {
+    "random_polygons": random_polygons_scene,
+    "random_3d_shapes": random_shapes_scene,
+}
+
+# ------------------------------------------------------
+# Suítes
+# ------------------------------------------------------
+
+def pipeline_suite(sizes, repeat, seed, results):
+    """Geração da cena, transformação, culling (frustum e faces de costas), profundidade, ordenação e empacotamento"""
+    view_mat = look_at(CAMERA_POS, CAMERA_TARGET, CAMERA_UP)
+    for scene, create in SCENES.items():
+        for size in sizes:
+            polygons, samples = time_stage(lambda: create(size, seed), repeat)
+            n = len(polygons)
+            record(results, "pipeline", scene, size, "generate", samples, polygons=n)
+
+            _, samples = time_stage(lambda: transform_vertices(polygons, view_mat), repeat)
+            record(results, "pipeline", scene, size, "transform", samples, polygons=n)
+
+            visible, samples = time_stage(lambda: cull_frustum(polygons, view_mat, PROJECTION), repeat)
+            record(results, "pipeline", scene, size, "cull", samples, polygons=n, visible=len(visible))
+
+            facing, samples = time_stage(lambda: cull_backfaces(polygons, view_mat), repeat)
+            record(results, "pipeline", scene, size, "backface", samples, polygons=n, facing=len(facing))
+
+            keys, samples = time_stage(lambda: polygon_depths(polygons, view_mat), repeat)
+            record(results, "pipeline", scene, size, "depth_keys", samples, polygons=n)
+
+            order, samples = time_stage(lambda: np.argsort(keys, kind="stable"), repeat)
+            record(results, "pipeline", scene, size, "sort", samples, polygons=n)
+
+            ordered = polygons.take(order)
+            _, samples = time_stage(lambda: pack_draw_buffers(ordered), repeat)
+            record(results, "pipeline", scene, size, "pack_buffers", samples, polygons=n)
+
+def culling_suite(sizes, repeat, seed, results):
+    """
+    Culling linear (cull_frustum) x BVH com campo de visão normal, estreito e olhando para o
+    lado (quase toda a cena fora): bvh_tree sempre percorre a árvore, bvh é o padrão (cai no
+    linear em cenas pequenas ou com boa parte visível). random_polygons com 200000 triângulos
+    é a cena de test_2D_100k_polys.py vista da mesma câmera (campo normal)
+    """
+    view_mat = look_at(CAMERA_POS, CAMERA_TARGET, CAMERA_UP)
+    side_mat = look_at(CAMERA_POS, CAMERA_POS + np.array([1.0, 0.0, 0.0]), CAMERA_UP)
+    views = (("wide", view_mat, PROJECTION), ("narrow", view_mat, NARROW_PROJECTION),
+             ("side", side_mat, PROJECTION))
+    for scene, create in SCENES.items():
+        for size in sizes:
+            polygons = create(size, seed)
+            n = len(polygons)
+            tree, samples = time_stage(lambda: build_bvh(polygons), repeat)
+            record(results, "culling", scene, size, "bvh_build", samples, polygons=n)
+
+            for name, model_view, projection in views:
+                visible, samples = time_stage(lambda: cull_frustum(polygons, model_view, projection), repeat)
+                record(results, "culling", scene, size, "linear_" + name, samples, polygons=n, visible=len(visible))
+                visible, samples = time_stage(lambda: tree.traverse(polygons, model_view, projection), repeat)
+                record(results, "culling", scene, size, "bvh_tree_" + name, samples, polygons=n, visible=len(visible))
+                visible, samples = time_stage(lambda: tree(polygons, model_view, projection), repeat)
+                record(results, "culling", scene, size, "bvh_" + name, samples, polygons=n, visible=len(visible))
+
+def objects_suite(sizes, repeat, seed, results):
+    """Ordenação por triângulo (argsort das profundidades) x por objeto (ObjectSorter)"""
+    view_mat = look_at(CAMERA_POS, CAMERA_TARGET, CAMERA_UP)
+    for size in sizes:
+        polygons = random_shapes_scene(size, seed)
+        n = len(polygons)
+        _, samples = time_stage(lambda: np.argsort(polygon_depths(polygons, view_mat), kind="stable"), repeat)
+        record(results, "objects", "random_3d_shapes", size, "triangle_sort", samples, polygons=n)
+
+        sorter = ObjectSorter()
+        _, samples = time_stage(lambda: sorter.prepare(polygons), 1)
+        record(results, "objects", "random_3d_shapes", size, "object_prepare", samples, polygons=n)
+        _, samples = time_stage(lambda: sorter.order(polygons, view_mat), repeat)
+        record(results, "objects", "random_3d_shapes", size, "object_sort", samples, polygons=n,
+               objects=sorter.stats["objects"])
+
+def indexed_suite(sizes, repeat, seed, results):
+    """PolygonBatch x IndexedMesh (vértices soldados): transformação, profundidade e culling"""
+    view_mat = look_at(CAMERA_POS, CAMERA_TARGET, CAMERA_UP)
+    for size in sizes:
+        batch = random_shapes_scene(size, seed)
+        mesh, samples = time_stage(lambda: weld(batch), 1)
+        n = len(batch)
+        record(results, "indexed", "random_3d_shapes", size, "weld", samples, polygons=n,
+               vertices=len(mesh.positions), batch_bytes=batch.nbytes, mesh_bytes=mesh.nbytes)
+        for kind, polygons in (("batch", batch), ("mesh", mesh)):
+            _, samples = time_stage(lambda: transform_vertices(polygons, view_mat), repeat)
+            record(results, "indexed", "random_3d_shapes", size, "transform_" + kind, samples, polygons=n)
+            _, samples = time_stage(lambda: polygon_depths(polygons, view_mat), repeat)
+            record(results, "indexed", "random_3d_shapes", size, "depth_keys_" + kind, samples, polygons=n)
+            _, samples = time_stage(lambda: cull_frustum(polygons, view_mat, PROJECTION), repeat)
+            record(results, "indexed", "random_3d_shapes", size, "cull_" + kind, samples, polygons=n)
+
+def sorting_suite(sizes, repeat, seed, results):
+    """Ordenação das chaves de profundidade: sorted (Python), np.argsort estável e radix 16/32 bits"""
+    view_mat = look_at(CAMERA_POS, CAMERA_TARGET, CAMERA_UP)
+    for scene, create in SCENES.items():
+        for size in sizes:
+            polygons = create(size, seed)
+            keys = polygon_depths(polygons, view_mat)
+            n = len(keys)
+            _, samples = time_stage(lambda: sorted(range(n), key=keys.__getitem__), repeat)
+            record(results, "sorting", scene, size, "python_sorted", samples, polygons=n)
+            _, samples = time_stage(lambda: np.argsort(keys, kind="stable"), repeat)
+            record(results, "sorting", scene, size, "argsort", samples, polygons=n)
+            for bits in (16, 32):
+                stats = {}
+                radix_depth_order(keys, bits=bits, stats=stats)
+                _, samples = time_stage(lambda: radix_depth_order(keys, bits=bits), repeat)
+                record(results, "sorting", scene, size, "radix%d" % bits, samples, polygons=n, **stats)
+
+SCALING_WORKERS = (1, 2, 4, 8, 16)
+
+def scaling_suite(sizes, repeat, seed, results):
+    """Profundidade + ordenação em vários processos (ParallelSorter) contra o caminho de um núcleo"""
+    view_mat = look_at(CAMERA_POS, CAMERA_TARGET, CAMERA_UP)
+    for scene, create in SCENES.items():
+        for size in sizes:
+            polygons = create(size, seed)
+            n = len(polygons)
+            _, samples = time_stage(lambda: np.argsort(polygon_depths(polygons, view_mat), kind="stable"), repeat)
+            record(results, "scaling", scene, size, "argsort", samples, polygons=n)
+            for workers in SCALING_WORKERS:
+                with ParallelSorter(workers=workers) as sorter:
+                    sorter.order(polygons, view_mat)  # Cria os processos e copia os vértices
+                    _, samples = time_stage(lambda: sorter.order(polygons, view_mat), repeat)
+                    record(results, "scaling", scene, size, "parallel_w%d" % workers, samples,
+                           polygons=n, chunks=sorter.stats["chunks"])
+
+TILE_SIZES = (16, 32, 64)
+
+def tiles_suite(sizes, repeat, seed, results):
+    """Agrupamento em tiles da tela (800x600) por tamanho de tile, com histograma de ocupação"""
+    view_mat = look_at(CAMERA_POS, CAMERA_TARGET, CAMERA_UP)
+    mvp = PROJECTION @ view_mat
+    for scene, create in SCENES.items():
+        for size in sizes:
+            polygons = create(size, seed)
+            for tile_size in TILE_SIZES:
+                bins, samples = time_stage(lambda: screen_tiles(polygons, mvp, 800, 600, tile_size), repeat)
+                hist, edges = bins.occupancy_histogram()
+                record(results, "tiles", scene, size, "bin_tiles%d" % tile_size, samples,
+                       polygons=len(polygons), histogram=hist.tolist(), histogram_edges=edges.tolist(),
+                       **bins.stats())
+
+LOD_Z_FAR = -80.0  # Cena profunda: boa parte das figuras fica pequena na tela
+
+def lod_suite(sizes, repeat, seed, results):
+    """Escolha de nível de detalhe (LODScene) e ordenação da cena completa x geometria escolhida"""
+    view_mat = look_at(CAMERA_POS, CAMERA_TARGET, CAMERA_UP)
+    for size in sizes:
+        scene = create_random_3d_shapes(num_shapes=max(1, size // 100), z_far=LOD_Z_FAR,
+                                         rng=np.random.default_rng(seed), lod_levels=4)
+        full = scene.to_batch()
+
+        def select():
+            scene.current = None  # Sem histerese: mede a escolha e a montagem do lote
+            return scene.select_level(view_mat, PROJECTION)
+        chosen, samples = time_stage(select, repeat)
+        record(results, "lod", "random_3d_shapes_deep", size, "select_level", samples,
+               polygons=len(full), lod_polygons=len(chosen), levels=scene.stats["levels"])
+        _, samples = time_stage(lambda: scene.select_level(view_mat, PROJECTION), repeat)
+        record(results, "lod", "random_3d_shapes_deep", size, "select_level_cached", samples, polygons=len(full))
+
+        for stage, polygons in (("sort_full", full), ("sort_lod", chosen)):
+            _, samples = time_stage(lambda: np.argsort(polygon_depths(polygons, view_mat), kind="stable"), repeat)
+            record(results, "lod", "random_3d_shapes_deep", size, stage, samples, polygons=len(polygons))
+
+def stream_suite(sizes, repeat, seed, results):
+    """Conjunto visível ordenado lido do disco em blocos (PolygonStream) x cena em memória"""
+    view_mat = look_at(CAMERA_POS, CAMERA_TARGET, CAMERA_UP)
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            polygons = random_polygons_scene(size, seed)
+            path = os.path.join(tmp, "scene%d.pstr" % size)
+            _, samples = time_stage(lambda: write_polygon_stream(path, polygons), repeat)
+            record(results, "stream", "random_polygons", size, "write", samples, polygons=len(polygons))
+
+            _, samples = time_stage(lambda: np.argsort(polygon_depths(polygons.take(
+                cull_frustum(polygons, view_mat, PROJECTION)), view_mat), kind="stable"), repeat)
+            record(results, "stream", "random_polygons", size, "cull_sort_memory", samples, polygons=len(polygons))
+
+            stream = PolygonStream(path)
+            _, samples = time_stage(lambda: stream.ordered_visible(view_mat, view_mat, PROJECTION), repeat)
+            record(results, "stream", "random_polygons", size, "ordered_visible", samples,
+                   polygons=len(polygons), **{k: v for k, v in stream.stats.items() if k != "polygons"})
+            del stream  # Fecha o mmap antes de apagar o diretório
+
+def write_mixed_ply(path, mesh):
+    """
+    PLY binário com triângulos e quadriláteros alternados (listas de tamanhos variados)
+    Os quadriláteros repetem o último vértice do triângulo: a geometria desenhada é a mesma
+    """
+    header = ("ply\nformat binary_little_endian 1.0\nelement vertex %d\nproperty float x\nproperty float y\n"
+              "property float z\nelement face %d\nproperty list uchar int vertex_indices\nend_header\n") % (
+        len(mesh.positions), len(mesh))
+    # Registro: 1 byte com o tamanho + 4 bytes por índice (os 12 ou 16 primeiros bytes de cada linha)
+    corners = np.concatenate([mesh.faces, mesh.faces[:, 2:3]], axis=1).astype("<i4").view(np.uint8)
+    length = 4 * (3 + np.arange(len(mesh)) % 2)
+    start = np.cumsum(length + 1) - length - 1
+    records = np.empty(int((length + 1).sum()), dtype=np.uint8)
+    records[start] = length // 4
+    row = np.repeat(np.arange(len(mesh)), length)
+    within = np.arange(len(row)) - np.repeat(np.cumsum(length) - length, length)
+    records[np.repeat(start + 1, length) + within] = corners[row, within]
+    with open(path, "wb") as f:
+        f.write(header.encode("ascii"))
+        f.write(mesh.positions.astype("<f4").tobytes())
+        f.write(records.tobytes())
+
+MESH_FORMATS = (
+    ("obj", write_obj, read_obj),
+    ("ply_binary", lambda path, mesh: write_ply(path, mesh, binary=True), read_ply),
+    ("ply_ascii", lambda path, mesh: write_ply(path, mesh, binary=False), read_ply),
+    ("ply_mixed", write_mixed_ply, read_ply),
+)
+
+def mesh_io_suite(sizes, repeat, seed, results):
+    """Leitura de malhas OBJ/PLY (vetorizada) e do cache binário (mmap) de uma cena com ~'size' triângulos"""
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            mesh = weld(random_shapes_scene(size, seed))
+            for fmt, write, read in MESH_FORMATS:
+                path = os.path.join(tmp, "scene%d_%s.%s" % (size, fmt, fmt[:3]))
+                write(path, mesh)
+                megabytes = os.path.getsize(path) / 1e6
+                _, samples = time_stage(lambda: read(path), repeat)
+                record(results, "mesh_io", fmt, size, "parse", samples, polygons=len(mesh), megabytes=megabytes)
+
+                cache_dir = os.path.join(tmp, "cache")
+                _, samples = time_stage(lambda: read_mesh(path, indexed=True, cache_dir=cache_dir), 1)
+                record(results, "mesh_io", fmt, size, "parse_and_cache", samples, polygons=len(mesh))
+                _, samples = time_stage(lambda: read_mesh(path, indexed=True, cache_dir=cache_dir), repeat)
+                record(results, "mesh_io", fmt, size, "cached_load", samples, polygons=len(mesh))
+
+SUITES = {
+    "pipeline": pipeline_suite,
+    "culling": culling_suite,
+    "objects": objects_suite,
+    "indexed": indexed_suite,
+    "sorting": sorting_suite,
+    "scaling": scaling_suite,
+    "tiles": tiles_suite,
+    "lod": lod_suite,
+    "stream": stream_suite,
+    "mesh_io": mesh_io_suite,
+}
+
+# ------------------------------------------------------
+# Comparação com baseline
+# ------------------------------------------------------
+
+def compare_to_baseline(results, baseline, threshold, min_ms=0.1):
+    """
+    Compara as medianas com as de um resultado anterior
+    Retorna a lista de regressões: etapas mais lentas que (1 + threshold) vezes a baseline
+    Etapas abaixo de min_ms são ignoradas (ruído de medição)
+    """
+    def key(row):
+        return (row["suite"], row["scene"], row["size"], row["stage"])
+
+    base = {key(row): row for row in baseline.get("results", [])}
+    regressions = []
+    for row in results:
+        old = base.get(key(row))
+        if old is None or max(old["median_ms"], row["median_ms"]) < min_ms:
+            continue
+        ratio = row["median_ms"] / max(old["median_ms"], 1e-9)
+        if ratio > 1.0 + threshold:
+            regressions.append({
+                "suite": row["suite"], "scene": row["scene"], "size": row["size"], "stage": row["stage"],
+                "baseline_ms": old["median_ms"], "current_ms": row["median_ms"], "ratio": ratio,
+            })
+    return regressions
+
+def run(suites, sizes, repeat, seed):
+    """Executa as suítes pedidas e retorna o relatório completo (dict serializável em JSON)"""
+    results = []
+    for name in suites:
+        SUITES[name](sizes, repeat, seed, results)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "sizes": list(sizes),
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do pipeline do Painter's Algorithm")
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES),
+                        help="suíte a executar (pode repetir; padrão: pipeline)")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="tamanhos das cenas em triângulos, separados por vírgula")
+    parser.add_argument("--repeat", type=int, default=5, help="repetições por etapa")
+    parser.add_argument("--seed", type=int, default=0, help="semente das cenas aleatórias")
+    parser.add_argument("--output", help="grava o JSON neste arquivo (além de imprimir)")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparação")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="regressão tolerada em relação à baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    report = run(args.suite or ["pipeline"], sizes, args.repeat, args.seed)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report["regressions"] = compare_to_baseline(report["results"], baseline, args.threshold)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+    if report.get("regressions"):
+        print("%d etapa(s) acima do limite de regressão" % len(report["regressions"]), file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
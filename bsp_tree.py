@@ -0,0 +1,231 @@
+# bsp_tree.py
+import numpy as np
+from polygon_batch import PolygonBatch, as_batch
+
+# ------------------------------------------------------
+# BSP Tree (Binary Space Partitioning)
+# ------------------------------------------------------
+# Diferente do protótipo em specs/test_bsp_trees.py (que separa os polígonos
+# apenas pelo z do centroide), aqui cada nó usa o plano real de um polígono,
+# triângulos que atravessam o plano são divididos, e o percurso de trás para
+# frente funciona para qualquer posição da câmera.
+
+EPSILON = 1e-5  # Tolerância para considerar um vértice sobre o plano
+
+def polygon_planes(vertices):
+    """
+    Calcula o plano (nx, ny, nz, d) de cada triângulo, com n normalizado e n·x + d = 0
+    vertices: array (N, 3, 3)
+    Triângulos degenerados (área zero) recebem normal nula
+    """
+    v = np.asarray(vertices, dtype=float)
+    n = np.cross(v[:, 1] - v[:, 0], v[:, 2] - v[:, 0])
+    length = np.linalg.norm(n, axis=1)
+    valid = length > 0
+    n[valid] /= length[valid, None]
+    d = -np.einsum("ij,ij->i", n, v[:, 0])
+    return np.column_stack([n, d])
+
+def classify_polygons(vertices, plane, epsilon=EPSILON):
+    """
+    Classifica triângulos em relação a um plano
+    Retorna (front, back, coplanar, spanning) como máscaras booleanas (N,)
+    """
+    dist = vertices @ plane[0:3] + plane[3]  # Distância com sinal de cada vértice (N, 3)
+    above = dist > epsilon
+    below = dist < -epsilon
+    front = above.any(axis=1) & ~below.any(axis=1)
+    back = below.any(axis=1) & ~above.any(axis=1)
+    coplanar = ~above.any(axis=1) & ~below.any(axis=1)
+    spanning = above.any(axis=1) & below.any(axis=1)
+    return front, back, coplanar, spanning
+
+def split_triangle(tri, plane, epsilon=EPSILON):
+    """
+    Divide um triângulo pelo plano (recorte de Sutherland-Hodgman)
+    Retorna (front_tris, back_tris): listas de triângulos (arrays (3, 3))
+    """
+    dist = tri @ plane[0:3] + plane[3]
+    front_pts, back_pts = [], []
+    for i in range(3):
+        j = (i + 1) % 3
+        vi, vj = tri[i], tri[j]
+        di, dj = dist[i], dist[j]
+        if di >= -epsilon:
+            front_pts.append(vi)
+        if di <= epsilon:
+            back_pts.append(vi)
+        # A aresta cruza o plano: adiciona o ponto de interseção aos dois lados
+        if (di > epsilon and dj < -epsilon) or (di < -epsilon and dj > epsilon):
+            t = di / (di - dj)
+            p = vi + t * (vj - vi)
+            front_pts.append(p)
+            back_pts.append(p)
+
+    def fan(points):
+        # Triangulação em leque do polígono recortado (até 4 vértices)
+        return [np.array([points[0], points[k], points[k + 1]]) for k in range(1, len(points) - 1)]
+
+    return fan(front_pts), fan(back_pts)
+
+
+class BSPTree:
+    """
+    Árvore BSP armazenada em arrays planos (um elemento por nó)
+    polygons: PolygonBatch com os polígonos da cena (já divididos), agrupados por nó
+    planes: (M, 4) plano de corte de cada nó
+    front, back: (M,) índice do filho da frente/de trás (-1 = vazio)
+    poly_start, poly_count: (M,) faixa de polígonos coplanares guardados em cada nó
+    """
+
+    def __init__(self, polygons, planes, front, back, poly_start, poly_count):
+        self.polygons = polygons
+        self.planes = np.asarray(planes, dtype=float).reshape(-1, 4)
+        self.front = np.asarray(front, dtype=np.int32)
+        self.back = np.asarray(back, dtype=np.int32)
+        self.poly_start = np.asarray(poly_start, dtype=np.int32)
+        self.poly_count = np.asarray(poly_count, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.planes)
+
+    def back_to_front(self, eye):
+        """
+        Percorre a árvore de forma iterativa (sem recursão) e retorna os índices
+        dos polígonos em ordem de desenho (do mais distante para o mais próximo)
+        para uma câmera em 'eye'. Não faz nenhuma ordenação: O(n).
+        """
+        if len(self) == 0:
+            return np.empty(0, dtype=np.intp)
+
+        # Lado da câmera em relação a todos os planos de uma só vez
+        eye_in_front = self.planes[:, 0:3] @ np.asarray(eye, dtype=float) + self.planes[:, 3] > 0
+        front, back = self.front.tolist(), self.back.tolist()
+        in_front = eye_in_front.tolist()
+
+        visited = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if node < 0:
+                # Marcador ~node: desenhar os polígonos do próprio nó
+                visited.append(~node)
+                continue
+            # Câmera na frente: desenha trás -> nó -> frente (pilha empilha ao contrário)
+            near, far = (front[node], back[node]) if in_front[node] else (back[node], front[node])
+            if near >= 0:
+                stack.append(near)
+            stack.append(~node)
+            if far >= 0:
+                stack.append(far)
+
+        # Expande a faixa de polígonos de cada nó visitado
+        visited = np.array(visited, dtype=np.intp)
+        counts = self.poly_count[visited]
+        starts = self.poly_start[visited]
+        offsets = np.cumsum(counts) - counts
+        return np.repeat(starts - offsets, counts) + np.arange(counts.sum())
+
+    def __call__(self, polygons, view_mat):
+        """
+        Mesma interface de sort_polygons, para uso como sort_func
+        'polygons' precisa ser tree.polygons (a cena com os polígonos já divididos)
+        """
+        if len(polygons) != len(self.polygons):
+            raise ValueError("a BSP foi construída para outra cena; use tree.polygons para desenhar")
+        eye = np.linalg.inv(view_mat)[0:3, 3]  # Posição da câmera no mundo
+        return as_batch(polygons).take(self.back_to_front(eye))
+
+
+def build_bsp(polygons, candidates=8, split_weight=8.0, balance_weight=1.0, epsilon=EPSILON):
+    """
+    Constrói uma BSPTree para uma cena estática (feito uma única vez)
+    polygons: lista de polígonos ou PolygonBatch
+    candidates: quantos polígonos testar como plano de corte em cada nó
+    split_weight, balance_weight: pesos da heurística de custo
+        custo = split_weight * divisões + balance_weight * |frente - trás|
+    """
+    batch = as_batch(polygons)
+    total = len(batch)
+
+    # Vértices originais + fragmentos criados pelas divisões (buffer que cresce sob demanda)
+    all_verts = np.empty((max(2 * total, 16), 3, 3))
+    all_verts[:total] = batch.vertices
+    all_source = np.empty(len(all_verts), dtype=np.intp)  # Polígono original de cada fragmento
+    all_source[:total] = np.arange(total)
+
+    planes, front, back, members = [], [], [], []
+
+    def new_node():
+        planes.append(None)
+        front.append(-1)
+        back.append(-1)
+        members.append(None)
+        return len(planes) - 1
+
+    stack = [(new_node(), np.arange(total))] if total else []
+    while stack:
+        node, idx = stack.pop()
+        v = all_verts[idx]
+
+        # Escolhe o plano de corte entre alguns candidatos (ignora triângulos degenerados)
+        cand = idx[np.linspace(0, len(idx) - 1, min(candidates, len(idx))).astype(int)]
+        cand_planes = polygon_planes(all_verts[cand])
+        if not cand_planes[:, 0:3].any():
+            # Todos os candidatos amostrados são degenerados: usa o primeiro triângulo válido do nó
+            node_planes = polygon_planes(v)
+            cand_planes = node_planes[node_planes[:, 0:3].any(axis=1)][:1]
+        best, best_cost, best_classes = None, None, None
+        for plane in cand_planes:
+            if not plane[0:3].any():
+                continue
+            classes = classify_polygons(v, plane, epsilon)
+            n_front, n_back, _, n_span = (int(c.sum()) for c in classes)
+            cost = split_weight * n_span + balance_weight * abs(n_front - n_back)
+            if best_cost is None or cost < best_cost:
+                best, best_cost, best_classes = plane, cost, classes
+
+        if best is None:
+            # Só restaram triângulos degenerados: ficam todos neste nó
+            planes[node] = np.zeros(4)
+            members[node] = idx
+            continue
+
+        is_front, is_back, is_coplanar, is_spanning = best_classes
+        planes[node] = best
+        members[node] = idx[is_coplanar]
+        front_idx = [idx[is_front]]
+        back_idx = [idx[is_back]]
+
+        # Divide os triângulos que atravessam o plano
+        for i in idx[is_spanning]:
+            f_tris, b_tris = split_triangle(all_verts[i], best, epsilon)
+            pieces = f_tris + b_tris
+            if total + len(pieces) > len(all_verts):
+                grow = max(len(all_verts), len(pieces))
+                all_verts = np.concatenate([all_verts, np.empty((grow, 3, 3))])
+                all_source = np.concatenate([all_source, np.empty(grow, dtype=np.intp)])
+            all_verts[total:total + len(pieces)] = pieces
+            all_source[total:total + len(pieces)] = all_source[i]
+            front_idx.append(np.arange(total, total + len(f_tris)))
+            back_idx.append(np.arange(total + len(f_tris), total + len(pieces)))
+            total += len(pieces)
+
+        front_idx = np.concatenate(front_idx)
+        back_idx = np.concatenate(back_idx)
+        if len(front_idx):
+            front[node] = new_node()
+            stack.append((front[node], front_idx))
+        if len(back_idx):
+            back[node] = new_node()
+            stack.append((back[node], back_idx))
+
+    # Reagrupa os polígonos para que os de cada nó fiquem contíguos
+    counts = np.array([len(m) for m in members], dtype=np.int32)
+    order = np.concatenate(members) if members else np.empty(0, dtype=np.intp)
+    starts = np.cumsum(counts) - counts
+    src = all_source[order]
+    normals = batch.normals[src] if batch.normals is not None else None
+    object_ids = batch.object_ids[src] if batch.object_ids is not None else None
+    tree_polygons = PolygonBatch(all_verts[order], batch.colors[src], normals, object_ids)
+    return BSPTree(tree_polygons, np.array(planes).reshape(-1, 4), front, back, starts, counts)
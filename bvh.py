@@ -0,0 +1,211 @@
+# bvh.py
+import numpy as np
+from polygon_batch import as_batch
+from painter_algorithm import frustum_planes, in_frustum, cull_frustum
+
+# ------------------------------------------------------
+# BVH (Bounding Volume Hierarchy) para culling hierárquico
+# ------------------------------------------------------
+# Os polígonos são ordenados pelo código de Morton do centroide e agrupados em
+# folhas de 'leaf_size' polígonos consecutivos. Sobre as folhas é montada uma
+# árvore binária completa guardada em arrays planos no layout de heap: o nó i tem
+# filhos 2i+1 e 2i+2 e as folhas ocupam as últimas posições. Cada nó guarda a
+# caixa (AABB) que envolve seus polígonos, de modo que uma subárvore inteira é
+# descartada com um único teste caixa x frustum.
+
+# Percorrer a árvore só compensa quando ela descarta a maior parte de uma cena grande:
+# em cenas pequenas, ou com boa parte da cena no campo de visão, o teste linear
+# (cull_frustum, um produto vetorizado sobre todos os vértices) é mais rápido que
+# expandir as folhas. Por isso a BVH estima a fração visível com uma amostra fixa
+# dos polígonos antes de decidir. benchmark.py --suite culling --sizes 20000,200000
+# (200k triângulos = cena de test_2D_100k_polys.py), mediana em ms:
+#                       linear   árvore   padrão
+#   20k, campo normal     0,95     2,64     0,94
+#   20k, estreito         0,94     1,48     0,95
+#   200k, campo normal   11,29    18,01    11,72   (79% visível)
+#   200k, estreito       10,70     6,80     7,24   (4% visível)
+#   200k, para o lado    11,38     1,76     1,92   (0,4% visível)
+
+MORTON_BITS = 10            # Bits por eixo na quantização dos centroides (código de 30 bits)
+LINEAR_BELOW = 50000        # Cenas com menos polígonos usam o teste linear direto
+MAX_VISIBLE_FRACTION = 0.2  # Acima desta fração visível estimada, usa o teste linear
+SAMPLE_SIZE = 1024          # Polígonos da amostra que estima a fração visível
+
+def _spread_bits(v):
+    """Intercala 2 zeros entre os bits de v (inteiros de até 10 bits)"""
+    v = v.astype(np.uint32)
+    v = (v | (v << 16)) & 0x030000FF
+    v = (v | (v << 8)) & 0x0300F00F
+    v = (v | (v << 4)) & 0x030C30C3
+    v = (v | (v << 2)) & 0x09249249
+    return v
+
+def morton_codes(points):
+    """
+    Código de Morton (curva Z) de cada ponto (N, 3), quantizado na caixa dos pontos
+    Pontos próximos no espaço tendem a ter códigos próximos
+    """
+    lo, hi = points.min(axis=0), points.max(axis=0)
+    scale = (2 ** MORTON_BITS - 1) / np.where(hi > lo, hi - lo, 1.0)
+    q = ((points - lo) * scale).astype(np.uint32)
+    return (_spread_bits(q[:, 0]) << 2) | (_spread_bits(q[:, 1]) << 1) | _spread_bits(q[:, 2])
+
+class BVH:
+    """
+    BVH em arrays planos (layout de heap), construída com build_bvh
+    Pode ser usada como cull_func em painter_algorithm/render_scene_painter:
+    bvh(polygons, model_view, projection) retorna os índices dos polígonos visíveis
+    Cenas com menos de linear_below polígonos, ou em que uma amostra indica mais de
+    max_visible_fraction da cena no frustum, usam cull_frustum (mais rápido nesses casos);
+    traverse() sempre percorre a árvore
+    """
+
+    linear_below = LINEAR_BELOW
+    max_visible_fraction = MAX_VISIBLE_FRACTION
+
+    def __init__(self, index, bounds_min, bounds_max, node_count, leaf_size):
+        self.index = index              # Permutação: posição na BVH -> índice original do polígono
+        # Amostra espalhada pela cena: a ordem de Morton agrupa polígonos vizinhos
+        self.sample = index[::max(len(index) // SAMPLE_SIZE, 1)]
+        self.bounds_min = bounds_min    # (M, 3) canto mínimo da caixa de cada nó
+        self.bounds_max = bounds_max    # (M, 3) canto máximo
+        self.node_count = node_count    # (M,) número de polígonos sob cada nó
+        self.leaf_size = leaf_size
+        self.num_leaves = (len(node_count) + 1) // 2
+        self.levels = self.num_leaves.bit_length() - 1  # Profundidade das folhas
+
+    def __len__(self):
+        return len(self.node_count)
+
+    def visible_leaves(self, planes):
+        """
+        Percorre a árvore nível a nível (vetorizado) e retorna (folhas, inside):
+        os nós-folha que intersectam o frustum e se cada um está inteiramente dentro dele
+        """
+        normals, d = planes[:, 0:3], planes[:, 3]
+        positive = normals > 0
+        nodes = np.zeros(1, dtype=np.int64)
+        inside = np.zeros(1, dtype=bool)
+        for level in range(self.levels + 1):
+            if level > 0:
+                nodes = (2 * nodes[:, None] + np.array([1, 2])).ravel()
+                inside = np.repeat(inside, 2)
+                keep = self.node_count[nodes] > 0
+                nodes, inside = nodes[keep], inside[keep]
+
+            # Só nós que ainda cruzam a borda precisam ser testados
+            test = np.flatnonzero(~inside)
+            if len(test) == 0:
+                continue
+            lo = self.bounds_min[nodes[test]][:, None, :]  # (k, 1, 3)
+            hi = self.bounds_max[nodes[test]][:, None, :]
+            # Vértice da caixa mais à frente (p) e mais atrás (n) de cada plano
+            p_vertex = np.where(positive, hi, lo)  # (k, 6, 3)
+            n_vertex = np.where(positive, lo, hi)
+            outside = ((p_vertex * normals).sum(axis=2) + d < 0).any(axis=1)
+            inside[test] = ((n_vertex * normals).sum(axis=2) + d >= 0).all(axis=1)
+
+            keep = np.ones(len(nodes), dtype=bool)
+            keep[test[outside]] = False
+            nodes, inside = nodes[keep], inside[keep]
+        return nodes, inside
+
+    def __call__(self, polygons, model_view, projection):
+        """
+        Índices (no lote original) dos polígonos possivelmente visíveis: os de traverse(),
+        ou os de cull_frustum (em ordem crescente) quando a árvore não compensa
+        """
+        batch = as_batch(polygons)
+        self._check(batch)
+        if len(batch) < self.linear_below:
+            return cull_frustum(batch, model_view, projection)
+        planes = frustum_planes(projection, model_view)
+        if in_frustum(batch.vertices[self.sample], planes).mean() > self.max_visible_fraction:
+            return cull_frustum(batch, model_view, projection)
+        return self.traverse(batch, model_view, projection)
+
+    def _check(self, batch):
+        if len(batch) != len(self.index):
+            raise ValueError("a BVH foi construída para %d polígonos, recebeu %d"
+                             % (len(self.index), len(batch)))
+
+    def traverse(self, polygons, model_view, projection):
+        """
+        Índices (no lote original) dos polígonos possivelmente visíveis, folha a folha,
+        das folhas mais distantes para as mais próximas
+        Polígonos de folhas parcialmente dentro do frustum passam pelo teste individual
+        """
+        batch = as_batch(polygons)
+        self._check(batch)
+
+        planes = frustum_planes(projection, model_view)
+        nodes, inside = self.visible_leaves(planes)
+        if len(nodes) == 0:
+            return np.empty(0, dtype=np.intp)
+
+        # Ordena as folhas pela profundidade do centro da caixa (mais distante primeiro)
+        centers = (self.bounds_min[nodes] + self.bounds_max[nodes]) * 0.5
+        order = np.argsort(centers @ model_view[2, 0:3] + model_view[2, 3], kind="stable")
+        nodes, inside = nodes[order], inside[order]
+
+        # Expande cada folha no intervalo contíguo de seus polígonos
+        counts = self.node_count[nodes]
+        starts = (nodes - (self.num_leaves - 1)) * self.leaf_size
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        positions = offsets + np.arange(counts.sum())
+        visible = self.index[positions]
+
+        # Folhas que cruzam a borda: teste polígono a polígono
+        partial = np.repeat(~inside, counts)
+        if partial.any():
+            keep = np.ones(len(visible), dtype=bool)
+            keep[partial] = in_frustum(batch.vertices[visible[partial]], planes)
+            visible = visible[keep]
+        return visible
+
+def build_bvh(polygons, leaf_size=64):
+    """
+    Constrói a BVH de um PolygonBatch (ou lista de polígonos) sem laços em Python:
+    ordenação de Morton, caixas das folhas com reduceat e dos níveis acima por pares
+    leaf_size: número de polígonos por folha
+    """
+    batch = as_batch(polygons)
+    n = len(batch)
+    verts = batch.vertices
+    if n == 0:
+        return BVH(np.empty(0, dtype=np.intp), np.zeros((1, 3)), np.zeros((1, 3)),
+                   np.zeros(1, dtype=np.int64), leaf_size)
+
+    index = np.argsort(morton_codes(verts.mean(axis=1)), kind="stable")
+    poly_min = verts.min(axis=1)[index]
+    poly_max = verts.max(axis=1)[index]
+
+    # Folhas: blocos consecutivos de leaf_size polígonos (completadas até potência de 2)
+    used = -(-n // leaf_size)
+    num_leaves = 1 << (used - 1).bit_length()
+    starts = np.arange(0, n, leaf_size)
+    leaf_min = np.zeros((num_leaves, 3))
+    leaf_max = np.zeros((num_leaves, 3))
+    leaf_count = np.zeros(num_leaves, dtype=np.int64)
+    leaf_min[:used] = np.minimum.reduceat(poly_min, starts, axis=0)
+    leaf_max[:used] = np.maximum.reduceat(poly_max, starts, axis=0)
+    leaf_count[:used] = np.diff(np.append(starts, n))
+
+    # Níveis internos, de baixo para cima; folhas vazias não alargam as caixas
+    levels_min, levels_max, levels_count = [leaf_min], [leaf_max], [leaf_count]
+    while len(levels_count[-1]) > 1:
+        cmin, cmax, ccount = levels_min[-1], levels_max[-1], levels_count[-1]
+        empty = (ccount == 0)[:, None]
+        pmin = np.where(empty, np.inf, cmin).reshape(-1, 2, 3).min(axis=1)
+        pmax = np.where(empty, -np.inf, cmax).reshape(-1, 2, 3).max(axis=1)
+        pcount = ccount.reshape(-1, 2).sum(axis=1)
+        levels_min.append(np.where(pcount[:, None] > 0, pmin, 0.0))
+        levels_max.append(np.where(pcount[:, None] > 0, pmax, 0.0))
+        levels_count.append(pcount)
+
+    # Layout de heap: raiz primeiro, folhas por último
+    return BVH(index,
+               np.concatenate(levels_min[::-1]),
+               np.concatenate(levels_max[::-1]),
+               np.concatenate(levels_count[::-1]),
+               leaf_size)
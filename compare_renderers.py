@@ -0,0 +1,73 @@
+# compare_renderers.py
+import argparse
+import json
+import time
+import numpy as np
+from painter_algorithm import look_at, sort_polygons
+from polygons import create_polygons_2D_scene, create_polygons_3D_oclusion, create_random_polygons
+from software_renderer import render_scene_software, render_scene_zbuffer, image_difference, write_png
+
+# ------------------------------------------------------
+# Comparação Painter's Algorithm x Z-buffer (headless)
+# ------------------------------------------------------
+# Para cada cena, mede ms/frame dos dois métodos no renderizador por software
+# e a diferença entre as imagens geradas. O resultado sai em JSON.
+
+UP = np.array([0.0, 1.0, 0.0])
+
+def scenes(seed):
+    """Cenas comparadas: (nome, função geradora, posição da câmera, alvo da câmera)"""
+    def random_100k():
+        return create_random_polygons(num=100000, rng=np.random.default_rng(seed))
+    return [
+        ("create_polygons_2D_scene", create_polygons_2D_scene, np.array([0.0, 0.0, 5.0]), np.array([0.0, 0.0, 0.0])),
+        ("create_polygons_3D_oclusion", create_polygons_3D_oclusion, np.array([3.0, 2.0, 1.0]), np.array([0.0, 0.0, -5.5])),
+        ("create_random_polygons(100000)", random_100k, np.array([0.0, 0.0, 5.0]), np.array([0.0, 0.0, 0.0])),
+    ]
+
+def time_frames(render, frames):
+    """Executa render() 'frames' vezes; retorna (última imagem, lista de tempos em ms)"""
+    times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        image = render()
+        times.append((time.perf_counter() - start) * 1000.0)
+    return image, times
+
+def compare(frames=3, width=800, height=600, seed=0, save_prefix=None):
+    """Roda a comparação em todas as cenas e retorna a lista de resultados"""
+    results = []
+    for name, create, camera_pos, camera_target in scenes(seed):
+        polygons = create()
+        view_mat = look_at(camera_pos, camera_target, UP)
+
+        _, sort_times = time_frames(lambda: sort_polygons(polygons, view_mat), frames)
+        painter_img, painter_times = time_frames(
+            lambda: render_scene_software(polygons, camera_pos, camera_target, UP, width=width, height=height), frames)
+        zbuffer_img, zbuffer_times = time_frames(
+            lambda: render_scene_zbuffer(polygons, camera_pos, camera_target, UP, width=width, height=height), frames)
+
+        if save_prefix:
+            write_png("%s_%s_painter.png" % (save_prefix, name), painter_img)
+            write_png("%s_%s_zbuffer.png" % (save_prefix, name), zbuffer_img)
+
+        results.append({
+            "scene": name,
+            "polygons": len(polygons),
+            "painter_ms": float(np.median(painter_times)),
+            "painter_sort_ms": float(np.median(sort_times)),
+            "zbuffer_ms": float(np.median(zbuffer_times)),
+            "difference": image_difference(painter_img, zbuffer_img),
+        })
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara Painter's Algorithm e Z-buffer no renderizador por software")
+    parser.add_argument("--frames", type=int, default=3, help="frames medidos por método (mediana)")
+    parser.add_argument("--width", type=int, default=800)
+    parser.add_argument("--height", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=0, help="semente da cena aleatória")
+    parser.add_argument("--save", metavar="PREFIXO", help="salva as imagens como PREFIXO_<cena>_<método>.png")
+    args = parser.parse_args()
+
+    print(json.dumps(compare(args.frames, args.width, args.height, args.seed, args.save), indent=2))
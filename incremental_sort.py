@@ -0,0 +1,83 @@
+# incremental_sort.py
+import numpy as np
+from painter_algorithm import polygon_depths, take_polygons
+
+# ------------------------------------------------------
+# Ordenação incremental (coerência entre frames)
+# ------------------------------------------------------
+
+class IncrementalSorter:
+    """
+    Ordenador com estado para o Painter's Algorithm em animações de câmera
+    Guarda a ordem do frame anterior e apenas a corrige com insertion sort,
+    que custa O(n + trocas) quando a câmera se move pouco entre frames.
+    Se muitos polígonos mudarem de posição, faz uma ordenação completa.
+
+    Pode ser usado diretamente como sort_func em painter_algorithm/render_scene_painter.
+    Após cada chamada, 'stats' contém:
+      polygons: número de polígonos ordenados
+      moved: quantos polígonos precisaram ser reposicionados
+      swaps: número de trocas (deslocamentos) feitas pelo insertion sort
+      fallback: True se foi feita uma ordenação completa
+    """
+
+    def __init__(self, max_moved_ratio=0.25, max_swaps_ratio=1.0):
+        """
+        max_moved_ratio: fração máxima de polígonos fora de ordem antes de desistir da correção
+        max_swaps_ratio: orçamento de trocas (proporcional a n) antes de desistir da correção
+        """
+        self.max_moved_ratio = max_moved_ratio
+        self.max_swaps_ratio = max_swaps_ratio
+        self.order = None
+        self.stats = {"polygons": 0, "moved": 0, "swaps": 0, "fallback": False}
+
+    def reset(self):
+        """Descarta a ordem guardada (a próxima chamada fará uma ordenação completa)"""
+        self.order = None
+
+    def _full_sort(self, keys):
+        """Ordenação completa (estável) do mais distante para o mais próximo"""
+        self.order = np.argsort(keys, kind="stable")
+        self.stats = {"polygons": len(keys), "moved": len(keys), "swaps": 0, "fallback": True}
+        return self.order
+
+    def update(self, keys):
+        """
+        Atualiza a ordem guardada para as novas chaves de profundidade
+        Retorna os índices ordenados do mais distante para o mais próximo
+        """
+        keys = np.asarray(keys)
+        n = len(keys)
+        if self.order is None or len(self.order) != n:
+            return self._full_sort(keys)
+
+        order = self.order.copy()
+        k = keys[order]
+
+        # Com insertion sort, o elemento j só se move se for menor que algum
+        # elemento anterior, isto é, menor que o máximo do prefixo
+        prefix_max = np.maximum.accumulate(k)
+        pending = np.flatnonzero(k[1:] < prefix_max[:-1]) + 1
+        if len(pending) > self.max_moved_ratio * n:
+            return self._full_sort(keys)
+
+        swaps = 0
+        budget = self.max_swaps_ratio * n
+        for j in pending:
+            x, idx = k[j], order[j]
+            # O prefixo k[:j] já está ordenado: busca binária pela posição de inserção
+            p = np.searchsorted(k[:j], x, side="right")
+            k[p + 1:j + 1] = k[p:j]
+            order[p + 1:j + 1] = order[p:j]
+            k[p], order[p] = x, idx
+            swaps += j - p
+            if swaps > budget:
+                return self._full_sort(keys)
+
+        self.order = order
+        self.stats = {"polygons": n, "moved": len(pending), "swaps": int(swaps), "fallback": False}
+        return order
+
+    def __call__(self, polygons, view_mat):
+        """Mesma interface de sort_polygons (retorna os polígonos ordenados)"""
+        return take_polygons(polygons, self.update(polygon_depths(polygons, view_mat)))
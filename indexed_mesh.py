@@ -0,0 +1,148 @@
+# indexed_mesh.py
+import numpy as np
+from polygon_batch import PolygonBatch, as_batch
+
+# ------------------------------------------------------
+# Malha indexada (vértices compartilhados)
+# ------------------------------------------------------
+# Em um PolygonBatch cada triângulo guarda cópias dos seus 3 vértices: na esfera
+# UV um vértice interno aparece em até 6 triângulos. A IndexedMesh guarda cada
+# vértice uma única vez (positions) e os triângulos como índices (faces), então
+# transformar a cena custa V vértices em vez de 3F.
+
+class IndexedMesh:
+    """
+    Malha de F triângulos sobre V vértices únicos
+    positions: array (V, 3) float32 - vértices únicos
+    faces: array (F, 3) int32 - índices dos 3 vértices de cada triângulo
+    vertex_colors: array (V, 3) float32 - cor de cada vértice (a solda não junta cores diferentes)
+    normals: array (F, 3) float32 opcional - normal de cada triângulo
+    object_ids: array (F,) int32 opcional - objeto de cada triângulo
+
+    Pode ser usada no lugar de um PolygonBatch em painter_algorithm/render_scene_painter:
+    profundidade, transformação e culling trabalham sobre os vértices únicos, e
+    draw_polygons_elements desenha com glDrawElements.
+    """
+
+    def __init__(self, positions, faces, vertex_colors, normals=None, object_ids=None):
+        self.positions = np.ascontiguousarray(positions, dtype=np.float32).reshape(-1, 3)
+        self.faces = np.ascontiguousarray(faces, dtype=np.int32).reshape(-1, 3)
+        self.vertex_colors = np.ascontiguousarray(vertex_colors, dtype=np.float32).reshape(-1, 3)
+        f = len(self.faces)
+        self.normals = None if normals is None else np.ascontiguousarray(normals, dtype=np.float32).reshape(-1, 3)
+        self.object_ids = None if object_ids is None else np.ascontiguousarray(object_ids, dtype=np.int32).reshape(-1)
+
+        if len(self.vertex_colors) != len(self.positions):
+            raise ValueError("positions e vertex_colors precisam ter o mesmo número de vértices")
+        if (self.normals is not None and len(self.normals) != f) or \
+                (self.object_ids is not None and len(self.object_ids) != f):
+            raise ValueError("faces, normals e object_ids precisam ter o mesmo número de polígonos")
+
+    # --------------------------------------------------
+    # Conversão
+    # --------------------------------------------------
+
+    @property
+    def colors(self):
+        """Cor de cada triângulo (F, 3): a cor do seu primeiro vértice"""
+        return self.vertex_colors[self.faces[:, 0]]
+
+    @property
+    def vertices(self):
+        """Vértices expandidos por triângulo (F, 3, 3), como em PolygonBatch (cópia)"""
+        return self.positions[self.faces]
+
+    def to_batch(self):
+        """Converte para PolygonBatch (vértices copiados em cada triângulo)"""
+        return PolygonBatch(self.vertices, self.colors, self.normals, self.object_ids)
+
+    def take(self, indices):
+        """Nova malha com os triângulos 'indices' (na ordem dada); os vértices são compartilhados"""
+        indices = np.asarray(indices, dtype=np.intp)
+        return IndexedMesh(self.positions, self.faces[indices], self.vertex_colors,
+                           None if self.normals is None else self.normals[indices],
+                           None if self.object_ids is None else self.object_ids[indices])
+
+    # --------------------------------------------------
+    # Transformação e profundidade (uma vez por vértice único)
+    # --------------------------------------------------
+
+    def transform(self, mat4):
+        """Transforma os V vértices únicos pela matriz 4x4 (com divisão por w): (V, 3)"""
+        p = self.positions.astype(float)
+        tv = p @ mat4[:, 0:3].T + mat4[:, 3]
+        w = tv[:, 3:4]
+        return tv[:, 0:3] / np.where(w != 0, w, 1.0)
+
+    def depths(self, view_mat):
+        """Profundidade média de cada triângulo (como polygon_depths), via os índices"""
+        p = self.positions.astype(float)
+        z = p @ view_mat[2, 0:3] + view_mat[2, 3]
+        w = p @ view_mat[3, 0:3] + view_mat[3, 3]
+        w[w == 0] = 1.0
+        return (z / w)[self.faces].mean(axis=1)
+
+    # --------------------------------------------------
+    # Acesso
+    # --------------------------------------------------
+
+    @property
+    def nbytes(self):
+        """Memória ocupada pelos arrays da malha (em bytes)"""
+        total = self.positions.nbytes + self.faces.nbytes + self.vertex_colors.nbytes
+        if self.normals is not None:
+            total += self.normals.nbytes
+        if self.object_ids is not None:
+            total += self.object_ids.nbytes
+        return total
+
+    def __len__(self):
+        return len(self.faces)
+
+    def __getitem__(self, key):
+        # Mesmo comportamento de PolygonBatch: inteiro -> dicionário; fatia/array -> nova malha
+        if isinstance(key, (int, np.integer)):
+            return self.take([key]).to_batch().polygon(0)
+        if isinstance(key, slice):
+            return self.take(np.arange(len(self))[key])
+        return self.take(key)
+
+    def __iter__(self):
+        return iter(self.to_batch())
+
+    def __repr__(self):
+        return "IndexedMesh(%d polígonos, %d vértices, %.1f KiB)" % (
+            len(self), len(self.positions), self.nbytes / 1024.0)
+
+
+def weld(polygons, tolerance=1e-6):
+    """
+    Solda vértices repetidos de um PolygonBatch (ou lista de polígonos) em uma IndexedMesh
+    Vértices são unidos quando caem na mesma célula de uma grade de lado 'tolerance'
+    e têm a mesma cor e o mesmo objeto (objetos diferentes nunca compartilham vértices)
+    """
+    if isinstance(polygons, IndexedMesh):
+        return polygons
+    batch = as_batch(polygons)
+    f = len(batch)
+    if f == 0:
+        return IndexedMesh(np.empty((0, 3)), np.empty((0, 3)), np.empty((0, 3)), batch.normals, batch.object_ids)
+
+    verts = batch.vertices.reshape(-1, 3)
+    colors = np.repeat(batch.colors, 3, axis=0)
+    columns = [np.round(verts / tolerance), np.round(colors * 65535)]
+    if batch.object_ids is not None:
+        columns.append(np.repeat(batch.object_ids, 3)[:, None])
+    keys = np.ascontiguousarray(np.column_stack(columns).astype(np.int64))
+
+    # Linhas iguais viram um único vértice: ordena as chaves e marca o início de cada grupo
+    order = np.lexsort(keys.T[::-1])
+    sorted_keys = keys[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (sorted_keys[1:] != sorted_keys[:-1]).any(axis=1)
+    inverse = np.empty(len(order), dtype=np.int64)
+    inverse[order] = np.cumsum(first) - 1
+
+    representative = order[first]  # Um vértice original de cada grupo
+    return IndexedMesh(verts[representative], inverse.reshape(f, 3), colors[representative],
+                       batch.normals, batch.object_ids)
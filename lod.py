@@ -0,0 +1,173 @@
+# lod.py
+import numpy as np
+from polygon_batch import PolygonBatch
+
+# ------------------------------------------------------
+# Nível de detalhe (LOD) por objeto
+# ------------------------------------------------------
+# Esferas e cilindros são gerados em vários níveis de tesselação (do mais fino ao
+# mais grosso). A cada frame, cada objeto usa o nível mais grosso cujo erro
+# geométrico projetado na tela (a "flecha" entre o círculo verdadeiro e o
+# polígono que o aproxima) fica abaixo de max_error pixels. Objetos distantes
+# passam a ter poucos triângulos sem mudança visível na imagem.
+# Para não alternar de nível a cada frame (flicker) perto do limite, há uma faixa
+# de histerese: só se troca para um nível mais grosso com folga abaixo do limite e
+# para um mais fino com folga acima dele.
+
+LOD_FACTORS = (1, 2, 4, 8)  # Divisores da resolução (slices/stacks) de cada nível
+MAX_ERROR = 1.0             # Erro máximo na tela, em pixels
+HYSTERESIS = 0.25           # Largura relativa da faixa de histerese
+
+def circle_error(radius, segments, arc=2 * np.pi):
+    """
+    Flecha (distância máxima entre arco e corda) de um arco de 'arc' radianos de um
+    círculo de raio 'radius' aproximado por 'segments' segmentos
+    """
+    return radius * (1.0 - np.cos(arc / (2.0 * np.asarray(segments, dtype=float))))
+
+class LODScene:
+    """
+    Cena com vários níveis de detalhe por objeto, usada no lugar dos polígonos em
+    painter_algorithm/render_scene_painter (select_level escolhe a geometria de cada frame)
+    levels: PolygonBatch com todos os níveis de todos os objetos
+    level_start, level_count: (M, L) faixa do objeto m no nível l dentro de 'levels'
+    error: (M, L) erro geométrico (unidades do mundo) do objeto m no nível l
+    centers, radii: (M, 3), (M,) esfera envolvente de cada objeto
+
+    max_error: erro máximo na tela (pixels); hysteresis: faixa relativa de histerese
+    viewport_height: altura da janela em pixels (atualize no reshape)
+    stats: {"objects", "polygons", "full_polygons", "changed", "levels"} do último frame
+    """
+
+    def __init__(self, levels, level_start, level_count, error, centers, radii,
+                 max_error=MAX_ERROR, hysteresis=HYSTERESIS, viewport_height=600):
+        self.levels = levels
+        self.level_start = np.asarray(level_start, dtype=np.int64)
+        self.level_count = np.asarray(level_count, dtype=np.int64)
+        self.error = np.asarray(error, dtype=float)
+        self.centers = np.asarray(centers, dtype=float).reshape(-1, 3)
+        self.radii = np.asarray(radii, dtype=float)
+        self.max_error = max_error
+        self.hysteresis = hysteresis
+        self.viewport_height = viewport_height
+        self.current = None   # Nível atual de cada objeto (estado da histerese)
+        self.stats = {}
+        self._batch = None
+
+    @classmethod
+    def from_levels(cls, batches, errors, **kwargs):
+        """
+        Monta a cena a partir de um PolygonBatch por nível (do mais fino ao mais grosso)
+        batches: lotes com os mesmos M objetos (object_ids 0..M-1, em blocos contíguos)
+        errors: um array (M,) de erro geométrico por nível
+        """
+        counts = np.stack([np.bincount(b.object_ids, minlength=len(errors[0])) for b in batches], axis=1)
+        sizes = np.array([len(b) for b in batches])
+        level_offset = np.cumsum(sizes) - sizes
+        starts = np.cumsum(counts, axis=0) - counts + level_offset
+
+        # Esfera envolvente: centro da caixa dos vértices do nível mais fino
+        finest = batches[0]
+        m = counts.shape[0]
+        verts = finest.vertices.reshape(-1, 3).astype(float)
+        owner = np.repeat(finest.object_ids, 3)
+        lo = np.full((m, 3), np.inf)
+        hi = np.full((m, 3), -np.inf)
+        np.minimum.at(lo, owner, verts)
+        np.maximum.at(hi, owner, verts)
+        centers = np.where(np.isfinite(lo), (lo + hi) * 0.5, 0.0)
+        radii = np.zeros(m)
+        np.maximum.at(radii, owner, np.linalg.norm(verts - centers[owner], axis=1))
+        # Os níveis são empilhados mantendo os ids (PolygonBatch.concatenate os deslocaria)
+        levels = PolygonBatch(np.concatenate([b.vertices for b in batches]),
+                              np.concatenate([b.colors for b in batches]),
+                              np.concatenate([b.normals for b in batches]) if finest.normals is not None else None,
+                              np.concatenate([b.object_ids for b in batches]))
+        return cls(levels, starts, counts, np.stack(errors, axis=1), centers, radii, **kwargs)
+
+    @classmethod
+    def concatenate(cls, scenes):
+        """Junta várias cenas; objetos com menos níveis repetem o seu nível mais grosso"""
+        depth = max(s.level_count.shape[1] for s in scenes)
+        batches, errors = [[] for _ in range(depth)], [[] for _ in range(depth)]
+        for scene in scenes:
+            for level in range(depth):
+                l = min(level, scene.level_count.shape[1] - 1)
+                batches[level].append(scene.level_batch(l))
+                errors[level].append(scene.error[:, l])
+        return cls.from_levels([PolygonBatch.concatenate(b) for b in batches],
+                               [np.concatenate(e) for e in errors],
+                               max_error=scenes[0].max_error, hysteresis=scenes[0].hysteresis,
+                               viewport_height=scenes[0].viewport_height)
+
+    def __len__(self):
+        return len(self.level_count)
+
+    def __repr__(self):
+        return "LODScene(%d objetos, %d níveis, %d..%d polígonos)" % (
+            len(self), self.level_count.shape[1], self.level_count[:, -1].sum(), self.level_count[:, 0].sum())
+
+    # --------------------------------------------------
+    # Geometria de um conjunto de níveis
+    # --------------------------------------------------
+
+    def take_levels(self, chosen):
+        """PolygonBatch com cada objeto m no nível chosen[m], na ordem dos objetos"""
+        rows = np.arange(len(self))
+        counts = self.level_count[rows, chosen]
+        starts = self.level_start[rows, chosen]
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        return self.levels.take(offsets + np.arange(counts.sum()))
+
+    def level_batch(self, level):
+        """Todos os objetos em um mesmo nível"""
+        return self.take_levels(np.full(len(self), level))
+
+    def to_batch(self):
+        """Geometria mais fina (nível 0) de todos os objetos"""
+        return self.level_batch(0)
+
+    # --------------------------------------------------
+    # Escolha de nível por frame
+    # --------------------------------------------------
+
+    def screen_error(self, model_view, projection=None):
+        """Erro (pixels) de cada objeto em cada nível: (M, L)"""
+        focal = 1.0 / np.tan(np.radians(60.0) / 2.0) if projection is None else projection[1, 1]
+        depth = -(self.centers @ model_view[2, 0:3] + model_view[2, 3])
+        # Câmera dentro (ou perto) da esfera envolvente: usa a distância mínima possível
+        depth = np.maximum(depth - self.radii, 1e-6)
+        pixels_per_unit = focal * 0.5 * self.viewport_height / depth
+        return self.error * pixels_per_unit[:, None]
+
+    def choose_levels(self, model_view, projection=None):
+        """Nível de cada objeto neste frame, com histerese em relação ao frame anterior"""
+        error = self.screen_error(model_view, projection)
+        last = error.shape[1] - 1
+        # Níveis vão do mais fino ao mais grosso (erro crescente): conta os que cabem no limite
+        coarsest = np.clip((error <= self.max_error).sum(axis=1) - 1, 0, last)
+        if self.current is None:
+            return coarsest
+        current = self.current
+        rows = np.arange(len(self))
+        # Mais fino quando o nível atual passou do limite com folga
+        too_coarse = error[rows, current] > self.max_error * (1.0 + self.hysteresis)
+        # Mais grosso só se houver um nível com folga abaixo do limite
+        relaxed = np.clip((error <= self.max_error * (1.0 - self.hysteresis)).sum(axis=1) - 1, 0, last)
+        return np.where(too_coarse, coarsest, np.maximum(current, relaxed))
+
+    def select_level(self, model_view, projection=None):
+        """
+        Geometria do frame: PolygonBatch com o nível escolhido de cada objeto
+        Se nenhum objeto trocou de nível, devolve o mesmo lote do frame anterior
+        (ordenadores e caches que comparam o lote por identidade continuam valendo)
+        """
+        chosen = self.choose_levels(model_view, projection)
+        changed = len(self) if self.current is None else int((chosen != self.current).sum())
+        if changed or self._batch is None:
+            self._batch = self.take_levels(chosen)
+        self.current = chosen
+        self.stats = {"objects": len(self), "polygons": len(self._batch),
+                      "full_polygons": int(self.level_count[:, 0].sum()), "changed": changed,
+                      "levels": np.bincount(chosen, minlength=self.level_count.shape[1]).tolist()}
+        return self._batch
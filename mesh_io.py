@@ -0,0 +1,429 @@
+# mesh_io.py
+import os
+import numpy as np
+from polygon_batch import as_batch
+from indexed_mesh import IndexedMesh, weld
+from scene_cache import CACHE_DIR, cached_mesh
+
+# ------------------------------------------------------
+# Importação de malhas (Wavefront OBJ e PLY)
+# ------------------------------------------------------
+# Os arquivos são lidos inteiros como um array de bytes e processados com operações
+# de array, sem laço por linha: as linhas de interesse (ex.: "v" e "f" no OBJ) são
+# selecionadas por máscaras sobre os bytes, os números de todas elas são convertidos
+# de uma vez com np.fromstring e a quantidade de números de cada linha vem da contagem
+# de início de tokens. Polígonos com mais de 3 vértices são triangulados em leque.
+# read_mesh guarda o resultado no cache binário de scene_cache: a partir da segunda
+# leitura o arquivo original nem é aberto, e a malha sai de um mmap em milissegundos.
+
+DEFAULT_COLOR = (0.8, 0.8, 0.8)  # Cor dos vértices quando o arquivo não tem cores
+SEQUENTIAL_STARTS = 4096         # Registros percorridos um a um nas listas PLY de tamanhos variados
+
+PLY_TYPES = {
+    "char": "i1", "int8": "i1", "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2", "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4", "uint": "u4", "uint32": "u4",
+    "float": "f4", "float32": "f4", "double": "f8", "float64": "f8",
+}
+
+# ------------------------------------------------------
+# Utilitários vetorizados
+# ------------------------------------------------------
+
+def _lines(data):
+    """Início e fim (posição do '\\n') de cada linha de um texto terminado em '\\n'"""
+    ends = np.flatnonzero(data == 10)
+    starts = np.empty_like(ends)
+    starts[:1] = 0
+    starts[1:] = ends[:-1] + 1
+    return starts, ends
+
+def _line_tokens(data, starts, ends, skip=0, slashes=False):
+    """
+    Números das linhas [starts, ends] de 'data' (uint8), todos convertidos de uma vez
+    skip: caracteres ignorados no início de cada linha (a palavra-chave, ex.: "v", "f")
+    slashes: trata '/' como separador (índices v/vt/vn das faces do OBJ)
+    Retorna (tokens float64, número de tokens de cada linha, número de grupos separados
+    por espaço de cada linha: os cantos "v/vt/vn" quando slashes, senão igual aos tokens)
+    """
+    if len(starts) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return np.empty(0), empty, empty
+    # Máscara dos bytes das linhas escolhidas (cada linha com o seu '\n')
+    mark = np.zeros(len(data) + 1, dtype=np.int8)
+    mark[starts] += 1
+    mark[ends + 1] -= 1
+    blob = data[np.cumsum(mark[:-1], dtype=np.int8).view(bool)]
+    lengths = ends - starts + 1
+    line_start = np.cumsum(lengths) - lengths
+    for k in range(skip):
+        blob[line_start + k] = 32
+    # Comentários no fim da linha ("f 1 2 3 # tri"): do '#' até o '\n' vira espaço
+    hashes = blob == 35
+    if hashes.any():
+        seen = np.cumsum(hashes, dtype=np.int64)
+        before = seen[line_start] - hashes[line_start]
+        comment = seen > np.repeat(before, lengths)
+        blob[comment & (blob != 10)] = 32
+
+    def count_per_line():
+        # Tokens por linha: posições onde um caractere visível segue um espaço (ou '\n', '\t', '\r')
+        space = blob <= 32
+        first = ~space
+        first[1:] &= space[:-1]
+        return np.add.reduceat(first.view(np.uint8), line_start, dtype=np.int64)
+
+    groups = count_per_line()
+    if slashes:
+        blob[blob == 47] = 32
+        counts = count_per_line()
+    else:
+        counts = groups
+
+    tokens = np.fromstring(blob.tobytes(), sep=" ")
+    if len(tokens) != counts.sum():
+        raise ValueError("valor numérico inválido no arquivo de malha")
+    return tokens, counts, groups
+
+def _ragged_take(values, row_start, row_count, offset=0):
+    """Concatena values[row_start[i] + offset : row_start[i] + offset + row_count[i]] de todas as linhas"""
+    within = np.arange(row_count.sum()) - np.repeat(np.cumsum(row_count) - row_count, row_count)
+    return values[np.repeat(row_start + offset, row_count) + within]
+
+def triangulate(corners, counts):
+    """
+    Triangulação em leque (v0, vk, vk+1) de polígonos com counts[i] vértices,
+    concatenados em 'corners'. Retorna (faces (F, 3), polígono de origem de cada triângulo)
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    tris = np.maximum(counts - 2, 0)
+    poly = np.repeat(np.arange(len(counts)), tris)
+    k = np.arange(tris.sum()) - np.repeat(np.cumsum(tris) - tris, tris)
+    base = (np.cumsum(counts) - counts)[poly]
+    faces = np.stack([corners[base], corners[base + k + 1], corners[base + k + 2]], axis=1)
+    return faces, poly
+
+def face_normals(positions, faces):
+    """Normal unitária de cada triângulo pela ordem dos vértices (regra da mão direita)"""
+    p0 = positions[faces[:, 0]]
+    n = np.cross(positions[faces[:, 1]] - p0, positions[faces[:, 2]] - p0)
+    length = np.sqrt(np.einsum("ij,ij->i", n, n))
+    return n / np.where(length > 0, length, 1.0)[:, None]
+
+def _mesh(positions, faces, vertex_colors, object_ids=None):
+    """IndexedMesh com índices conferidos e normais pela ordem dos vértices"""
+    positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    if len(faces) and (faces.min() < 0 or faces.max() >= len(positions)):
+        raise ValueError("face com índice de vértice inexistente")
+    return IndexedMesh(positions, faces, vertex_colors, face_normals(positions, faces), object_ids)
+
+def _read_text(path):
+    """Bytes do arquivo (uint8), terminados em '\\n'"""
+    data = np.fromfile(path, dtype=np.uint8)
+    if len(data) == 0 or data[-1] != 10:
+        data = np.append(data, np.uint8(10))
+    return data
+
+def _colors(values, n, integer=None):
+    """
+    Cores (n, 3) em [0, 1]; None usa DEFAULT_COLOR
+    integer: valores de 0 a 255 (None: deduz pelo maior valor)
+    """
+    if values is None:
+        return np.broadcast_to(np.asarray(DEFAULT_COLOR, dtype=np.float32), (n, 3))
+    values = np.asarray(values, dtype=np.float32)
+    if integer is None:
+        integer = values.size > 0 and values.max() > 1.0
+    return values / 255.0 if integer else values
+
+# ------------------------------------------------------
+# Wavefront OBJ
+# ------------------------------------------------------
+
+def read_obj(path):
+    """
+    Lê um arquivo OBJ como IndexedMesh
+    Usa as linhas "v x y z [w]" ou "v x y z r g b" (cores por vértice), "f" (índices
+    v, v/vt, v//vn ou v/vt/vn, inclusive negativos) e "o"/"g" (cada grupo vira um objeto
+    em object_ids); as demais linhas (vt, vn, usemtl, ...) são ignoradas
+    """
+    data = _read_text(path)
+    starts, ends = _lines(data)
+    first = data[starts]
+    second = data[np.minimum(starts + 1, len(data) - 1)]
+    keyword_end = second <= 32
+    is_vertex = (first == ord("v")) & keyword_end
+    is_face = (first == ord("f")) & keyword_end
+    is_group = ((first == ord("o")) | (first == ord("g"))) & keyword_end
+
+    # Vértices: todas as linhas com o mesmo número de valores
+    values, counts, _ = _line_tokens(data, starts[is_vertex], ends[is_vertex], skip=1)
+    columns = int(counts[0]) if len(counts) else 3
+    if (counts != columns).any() or columns not in (3, 4, 6):
+        raise ValueError("linhas 'v' com números diferentes de valores (use x y z [w] ou x y z r g b)")
+    values = values.reshape(-1, columns)
+    positions = values[:, 0:3]
+    vertex_colors = _colors(values[:, 3:6] if columns == 6 else None, len(positions))
+
+    # Faces: cada canto tem 1, 2 ou 3 números (v, v/vt, v//vn, v/vt/vn); o primeiro é o vértice
+    face_rows = np.flatnonzero(is_face)
+    tokens, counts, sizes = _line_tokens(data, starts[face_rows], ends[face_rows], skip=1, slashes=True)
+    per_corner = counts // np.maximum(sizes, 1)
+    if (per_corner * sizes != counts).any():
+        raise ValueError("face com cantos em formatos diferentes (v, v/vt, v//vn, v/vt/vn)")
+    first_token = np.cumsum(counts) - counts
+    within = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    corners = tokens[np.repeat(first_token, sizes) + within * np.repeat(per_corner, sizes)].astype(np.int64)
+
+    # Índices começam em 1; negativos contam a partir do último vértice lido até a linha da face
+    vertices_before = np.cumsum(is_vertex)[face_rows]
+    corners = np.where(corners > 0, corners - 1, corners + np.repeat(vertices_before, sizes))
+    faces, poly = triangulate(corners, sizes)
+
+    object_ids = None
+    if is_group.any():
+        _, group = np.unique(np.cumsum(is_group)[face_rows], return_inverse=True)
+        object_ids = group[poly]
+    return _mesh(positions, faces, vertex_colors, object_ids)
+
+def write_obj(path, polygons):
+    """
+    Grava polígonos (PolygonBatch, IndexedMesh, ...) como OBJ, com cores por vértice
+    ("v x y z r g b") e um "o" por objeto quando há object_ids
+    """
+    mesh = polygons if isinstance(polygons, IndexedMesh) else weld(as_batch(polygons))
+    with open(path, "w") as f:
+        np.savetxt(f, np.hstack([mesh.positions, mesh.vertex_colors]), fmt="v %.7g %.7g %.7g %.4g %.4g %.4g")
+        faces = mesh.faces + 1
+        if mesh.object_ids is None:
+            np.savetxt(f, faces, fmt="f %d %d %d")
+            return
+        order = np.argsort(mesh.object_ids, kind="stable")
+        ids, first = np.unique(mesh.object_ids[order], return_index=True)
+        for obj, block in zip(ids, np.split(order, first[1:])):
+            f.write("o object%d\n" % obj)
+            np.savetxt(f, faces[block], fmt="f %d %d %d")
+
+# ------------------------------------------------------
+# PLY (ASCII e binário)
+# ------------------------------------------------------
+
+def _ply_header(data):
+    """Lê o cabeçalho: (formato, [(elemento, quantidade, [propriedades])], tamanho do cabeçalho)"""
+    raw = bytes(data[:65536])
+    end = raw.find(b"end_header")
+    if not raw.startswith(b"ply") or end < 0:
+        raise ValueError("cabeçalho PLY inválido")
+    size = raw.index(b"\n", end) + 1
+    fmt, elements = None, []
+    for line in raw[:size].decode("ascii", "replace").splitlines():
+        words = line.split()
+        if not words:
+            continue
+        if words[0] == "format":
+            fmt = words[1]
+        elif words[0] == "element":
+            elements.append((words[1], int(words[2]), []))
+        elif words[0] == "property" and words[1] == "list":
+            elements[-1][2].append((words[4], PLY_TYPES[words[2]], PLY_TYPES[words[3]]))
+        elif words[0] == "property":
+            elements[-1][2].append((words[2], PLY_TYPES[words[1]], None))
+    if fmt not in ("ascii", "binary_little_endian", "binary_big_endian"):
+        raise ValueError("formato PLY não suportado: %s" % fmt)
+    return fmt, elements, size
+
+def _byte_view(data, dtype, offset):
+    """Valores de tipo 'dtype' começando em cada byte de data[offset:] (visão sem cópia, desalinhada)"""
+    dtype = np.dtype(dtype)
+    n = max(len(data) - offset - dtype.itemsize + 1, 0)
+    return np.ndarray((n,), dtype, buffer=data, offset=offset, strides=(1,))
+
+def _binary_lists(data, offset, count, props, endian):
+    """
+    Elemento binário com uma propriedade lista (ex.: vertex_indices das faces)
+    Retorna (campos escalares {nome: array}, itens concatenados, tamanho de cada lista, novo offset)
+    Listas todas do mesmo tamanho são lidas de uma vez como um dtype estruturado; com tamanhos
+    variados, o início de cada registro é achado por saltos dobrados (ver abaixo)
+    """
+    def layout(k):
+        """dtype de um registro cuja lista tem k itens"""
+        fields = []
+        for name, t, item in props:
+            if item is None:
+                fields.append((name, endian + t))
+            else:
+                fields += [(name + "_count", endian + t), (name, endian + item, (k,))]
+        return np.dtype(fields)
+
+    list_name, item = next((name, item) for name, _, item in props if item is not None)
+    head = layout(0)  # Registro com a lista vazia: escalares e contador
+    count_type, count_at = head.fields[list_name + "_count"]
+    item_size = np.dtype(item).itemsize
+    if count == 0:
+        return {name: np.empty(0, endian + t) for name, t, it in props if it is None}, \
+            np.empty(0, endian + item), np.empty(0, dtype=np.int64), offset
+    if offset + head.itemsize > len(data):
+        raise ValueError("arquivo PLY truncado")
+
+    # Caso comum: todas as listas com o mesmo tamanho (ex.: só triângulos)
+    k = int(np.frombuffer(data, head, 1, offset)[list_name + "_count"][0])
+    dtype = layout(k)
+    if offset + count * dtype.itemsize <= len(data):
+        records = np.frombuffer(data, dtype, count, offset)
+        if (records[list_name + "_count"] == k).all():
+            scalars = {name: records[name] for name, _, it in props if it is None}
+            return scalars, records[list_name].ravel(), np.full(count, k), offset + count * dtype.itemsize
+
+    # Tamanhos variados: o contador lido em cada byte dá o início do registro seguinte, caso um
+    # registro comece ali (step). Dobrando os saltos 'levels' vezes (jump: 2^levels registros
+    # adiante) sobram poucos milhares de inícios a percorrer em sequência; os registros entre
+    # eles saem de 2^levels - 1 aplicações de step, cada uma sobre todos esses inícios de uma vez
+    sizes = _byte_view(data, count_type, offset + count_at)
+    m = len(sizes)  # Posições candidatas; m também é a marca de "passou do fim"
+    index_type = np.int32 if len(data) < 2 ** 31 else np.int64
+    step = np.empty(m + 1, dtype=index_type)
+    # Bytes que não são contadores podem ter qualquer valor: limitados para não estourar o índice
+    limit = min(m // item_size + 1, int(np.iinfo(count_type).max))
+    np.multiply(np.clip(sizes, 0, limit), item_size, out=step[:m], casting="unsafe")
+    step[:m] += np.arange(head.itemsize, m + head.itemsize, dtype=index_type)
+    np.minimum(step, m, out=step)
+    step[m] = m
+    levels = (count // SEQUENTIAL_STARTS).bit_length()
+    jump = step
+    for _ in range(levels):
+        jump = jump[jump]
+    anchors, at = np.empty(-(-count >> levels), dtype=index_type), 0
+    for i in range(len(anchors)):
+        anchors[i] = at
+        at = jump[at]
+    starts = np.empty((len(anchors), 1 << levels), dtype=index_type)
+    starts[:, 0] = anchors
+    for j in range(1, 1 << levels):
+        starts[:, j] = step[starts[:, j - 1]]
+    starts = starts.ravel()
+    starts = starts[:count]
+    if starts[-1] >= m:
+        raise ValueError("arquivo PLY truncado")
+    sizes = sizes[starts].astype(np.int64)
+    if sizes.min() < 0:
+        raise ValueError("lista com tamanho negativo no arquivo PLY")
+    end = int(starts[-1]) + head.itemsize + int(sizes[-1]) * item_size
+    if offset + end > len(data):
+        raise ValueError("arquivo PLY truncado")
+
+    # Campos de cada registro pelo seu deslocamento (os que vêm depois da lista andam k itens)
+    starts = starts.astype(np.int64) + offset
+    scalars = {}
+    for name, t, it in props:
+        if it is None:
+            at = head.fields[name][1]
+            shift = sizes * item_size if at > count_at else 0
+            scalars[name] = _byte_view(data, endian + t, 0)[starts + at + shift]
+    first_item = starts + count_at + count_type.itemsize
+    within = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    items = _byte_view(data, endian + item, 0)[np.repeat(first_item, sizes) + within * item_size]
+    return scalars, items, sizes, offset + end
+
+def read_ply(path):
+    """
+    Lê um arquivo PLY (ascii, binary_little_endian ou binary_big_endian) como IndexedMesh
+    Usa x, y, z e red, green, blue do elemento "vertex" e a lista vertex_indices
+    (ou vertex_index) do elemento "face"; outros elementos e propriedades são ignorados
+    """
+    data = np.fromfile(path, dtype=np.uint8)
+    fmt, elements, offset = _ply_header(data)
+    endian = "<" if fmt == "binary_little_endian" else ">"
+    if fmt == "ascii":
+        body = data[offset:]
+        if len(body) == 0 or body[-1] != 10:
+            body = np.append(body, np.uint8(10))
+        starts, ends = _lines(body)
+        line = 0
+
+    fields, corners, sizes = {}, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    for name, count, props in elements:
+        has_list = any(item is not None for _, _, item in props)
+        if fmt == "ascii":
+            tokens, counts, _ = _line_tokens(body, starts[line:line + count], ends[line:line + count])
+            line += count
+            row_start = np.cumsum(counts) - counts
+            if not has_list:
+                values = {p[0]: tokens[row_start + i] for i, p in enumerate(props)}
+            else:
+                # Lista: [escalares antes] n i1..in [escalares depois]
+                at = next(i for i, p in enumerate(props) if p[2] is not None)
+                values = {p[0]: tokens[row_start + i] for i, p in enumerate(props[:at])}
+                n = tokens[row_start + at].astype(np.int64)
+                values.update({p[0]: tokens[row_start + at + n + i] for i, p in enumerate(props[at + 1:], 1)})
+                values[props[at][0]] = (_ragged_take(tokens, row_start, n, at + 1), n)
+        elif not has_list:
+            dtype = np.dtype([(p[0], endian + p[1]) for p in props])
+            if offset + count * dtype.itemsize > len(data):
+                raise ValueError("arquivo PLY truncado")
+            records = np.frombuffer(data, dtype, count, offset)
+            offset += count * dtype.itemsize
+            values = {p[0]: records[p[0]] for p in props}
+        else:
+            values, items, n, offset = _binary_lists(data, offset, count, props, endian)
+            list_name = next(p[0] for p in props if p[2] is not None)
+            values[list_name] = (items, n)
+        fields[name] = values
+
+    vertex = fields.get("vertex", {})
+    if not all(axis in vertex for axis in "xyz"):
+        raise ValueError("PLY sem as coordenadas x, y, z dos vértices")
+    positions = np.stack([vertex["x"], vertex["y"], vertex["z"]], axis=1)
+    rgb = [vertex.get(c) for c in ("red", "green", "blue")]
+    types = {p[0]: p[1] for e in elements if e[0] == "vertex" for p in e[2]}
+    vertex_colors = _colors(np.stack(rgb, axis=1) if all(c is not None for c in rgb) else None, len(positions),
+                            integer=types.get("red", "f")[0] in "iu")
+
+    face = fields.get("face", {})
+    indices = face.get("vertex_indices", face.get("vertex_index"))
+    if indices is not None:
+        corners, sizes = indices
+    faces, _ = triangulate(np.asarray(corners, dtype=np.int64), sizes)
+    return _mesh(positions, faces, vertex_colors)
+
+def write_ply(path, polygons, binary=True):
+    """
+    Grava polígonos (PolygonBatch, IndexedMesh, ...) como PLY com cores por vértice (uchar)
+    binary: binary_little_endian (padrão) ou ascii
+    """
+    mesh = polygons if isinstance(polygons, IndexedMesh) else weld(as_batch(polygons))
+    rgb = np.clip(np.round(mesh.vertex_colors * 255.0), 0, 255).astype(np.uint8)
+    header = ("ply\nformat %s 1.0\nelement vertex %d\nproperty float x\nproperty float y\nproperty float z\n"
+              "property uchar red\nproperty uchar green\nproperty uchar blue\nelement face %d\n"
+              "property list uchar int vertex_indices\nend_header\n") % (
+        "binary_little_endian" if binary else "ascii", len(mesh.positions), len(mesh))
+    with open(path, "wb") as f:
+        f.write(header.encode("ascii"))
+        if binary:
+            vertices = np.empty(len(mesh.positions), dtype=[("p", "<f4", (3,)), ("c", "u1", (3,))])
+            vertices["p"], vertices["c"] = mesh.positions, rgb
+            faces = np.empty(len(mesh), dtype=[("n", "u1"), ("i", "<i4", (3,))])
+            faces["n"], faces["i"] = 3, mesh.faces
+            f.write(vertices.tobytes())
+            f.write(faces.tobytes())
+        else:
+            np.savetxt(f, np.hstack([mesh.positions, rgb]), fmt="%.7g %.7g %.7g %d %d %d")
+            np.savetxt(f, mesh.faces, fmt="3 %d %d %d")
+
+# ------------------------------------------------------
+# Leitura com cache
+# ------------------------------------------------------
+
+READERS = {".obj": read_obj, ".ply": read_ply}
+
+def read_mesh(path, indexed=False, cache_dir=CACHE_DIR):
+    """
+    Lê uma malha OBJ ou PLY (pela extensão) para o pipeline do Painter's Algorithm
+    indexed: retorna a IndexedMesh (vértices compartilhados) em vez de um PolygonBatch
+    cache_dir: diretório do cache binário (scene_cache.cached_mesh); None lê sempre o arquivo
+    """
+    reader = READERS.get(os.path.splitext(path)[1].lower())
+    if reader is None:
+        raise ValueError("formato de malha não suportado: %s (use .obj ou .ply)" % path)
+    mesh = reader(path) if cache_dir is None else cached_mesh(path, reader, cache_dir)
+    return mesh if indexed else mesh.to_batch()
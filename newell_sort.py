@@ -0,0 +1,502 @@
+# newell_sort.py
+import heapq
+import numpy as np
+from polygon_batch import PolygonBatch, as_batch, same_polygons
+from painter_algorithm import depth_order
+from bsp_tree import EPSILON, polygon_planes, split_triangle
+from tiles import bin_boxes
+
+# ------------------------------------------------------
+# Ordenação exata (Newell-Newell-Sancha)
+# ------------------------------------------------------
+# A ordem pela profundidade média (depth_order) erra sempre que dois polígonos
+# se sobrepõem em profundidade. Esta etapa corrige a ordem aproximada aplicando
+# os testes clássicos de Newell-Newell-Sancha aos pares de polígonos que podem se
+# cobrir na tela:
+#   1. caixas na tela não se sobrepõem          -> sem restrição
+#   2. extensões em z separadas                  -> o mais distante vem antes
+#   3. P inteiro atrás do plano de Q             -> P antes de Q
+#   4. Q inteiro na frente do plano de P (lado da câmera) -> P antes de Q
+#   5. projeções (triângulos 2D) não se sobrepõem -> sem restrição
+# Cada par decidido vira uma restrição "P antes de Q"; a ordem final é uma ordenação
+# topológica que preserva a ordem aproximada onde não há restrição. Pares que se
+# atravessam (nenhum teste decide) e ciclos (A antes de B antes de C antes de A)
+# são resolvidos dividindo um polígono pelo plano do outro (split_triangle) e
+# repetindo a etapa. Só os pares que caem no mesmo tile da tela (tiles.py) são
+# testados, então o custo acompanha as sobreposições reais e não N².
+# Os pares são gerados e testados em lotes de grupos de tiles (memória limitada).
+# O teste 2 vem antes de tudo: um par separado em z que já está na ordem aproximada
+# nunca inverte essa ordem, então nem chega a ser formado, a não ser que um dos seus
+# polígonos acabe ligado a alguma restrição invertida (o que é raro: na maioria das
+# cenas esses pares são quase todos e ficam de fora). As caixas 3D separadas em um
+# eixo do mundo também decidem o par sem olhar os planos.
+# Os polígonos que se atravessam no espaço são divididos uma vez, antes do primeiro
+# frame (split_intersections); a partir daí a ordem do frame anterior serve de ordem
+# de partida e quase todas as restrições já vêm na ordem certa.
+
+NEAR_Z = 1e-6          # Polígonos com vértice atrás deste z (espaço de visão) ficam fora dos testes
+SCREEN_EPSILON = 1e-7  # Tolerância do teste de sobreposição 2D (arestas compartilhadas não contam)
+SPLITS_PER_ROUND = 4   # Máximo de planos usados para dividir um mesmo polígono em uma rodada
+PAIR_BATCH = 1 << 18   # Pares brutos gerados e testados por vez
+MAX_TILES = 256        # Máximo de tiles por eixo na grade automática
+
+def view_space(vertices, view_mat):
+    """Vértices (N, 3, 3) no espaço da câmera (câmera na origem olhando para -z)"""
+    v = np.asarray(vertices, dtype=float)
+    return v @ view_mat[0:3, 0:3].T + view_mat[0:3, 3]
+
+def screen_project(view_verts):
+    """
+    Projeção perspectiva no plano de imagem (x/-z, y/-z): (N, 3, 2) e máscara dos
+    polígonos inteiramente na frente da câmera. Independe do campo de visão, pois
+    só importa quem cobre quem.
+    """
+    z = view_verts[:, :, 2]
+    valid = (z < -NEAR_Z).all(axis=1)
+    depth = np.where(z < -NEAR_Z, -z, 1.0)
+    return view_verts[:, :, 0:2] / depth[:, :, None], valid
+
+def triangles_overlap_2d(tri_a, tri_b, epsilon=SCREEN_EPSILON):
+    """
+    Teste dos eixos separadores para pares de triângulos 2D (P, 3, 2)
+    True quando as áreas se sobrepõem (tocar em uma aresta ou vértice não conta)
+    """
+    alive = np.arange(len(tri_a))  # Pares ainda sem eixo separador
+    for which in (0, 1):
+        for i in range(3):
+            a, b = tri_a[alive], tri_b[alive]
+            tri = a if which == 0 else b
+            # Eixo: normal da aresta i do triângulo
+            edge = tri[:, (i + 1) % 3] - tri[:, i]
+            axis_x, axis_y = -edge[:, 1:2], edge[:, 0:1]
+            pa = a[:, :, 0] * axis_x + a[:, :, 1] * axis_y   # (P, 3)
+            pb = b[:, :, 0] * axis_x + b[:, :, 1] * axis_y
+            min_a = np.minimum(np.minimum(pa[:, 0], pa[:, 1]), pa[:, 2])
+            max_a = np.maximum(np.maximum(pa[:, 0], pa[:, 1]), pa[:, 2])
+            min_b = np.minimum(np.minimum(pb[:, 0], pb[:, 1]), pb[:, 2])
+            max_b = np.maximum(np.maximum(pb[:, 0], pb[:, 1]), pb[:, 2])
+            alive = alive[(max_a > min_b + epsilon) & (max_b > min_a + epsilon)]
+    overlap = np.zeros(len(tri_a), dtype=bool)
+    overlap[alive] = True
+    return overlap
+
+def _plane_distances(vertices, planes):
+    """Distâncias (P, 3) dos vértices de cada triângulo ao plano correspondente"""
+    return np.einsum("pvd,pd->pv", vertices, planes[:, 0:3]) + planes[:, 3:4]
+
+def _side(vertices, planes, eye_side, epsilon):
+    """
+    Posição de cada triângulo em relação a um plano (pares alinhados)
+    Retorna (na frente: lado da câmera, atrás, atravessa o plano)
+    """
+    dist = _plane_distances(vertices, planes)
+    dist *= np.where(eye_side, 1.0, -1.0)[:, None]   # Positivo = lado da câmera
+    front = (dist >= -epsilon).all(axis=1)
+    back = (dist <= epsilon).all(axis=1)
+    return front, back, ~front & ~back
+
+def polygon_bounds(verts, view_verts):
+    """Extensões usadas por pair_order, por polígono: (z mín, z máx na visão, caixa 3D mín, máx)"""
+    z = view_verts[:, :, 2]
+    return z.min(axis=1), z.max(axis=1), verts.min(axis=1), verts.max(axis=1)
+
+def _box_order(lo, hi, eye, a, b):
+    """
+    Ordem pelas caixas 3D (lo, hi: (N, 3)): se um eixo separa as caixas de a e b, o
+    polígono do lado oposto ao da câmera vem antes. 1 (a antes de b), -1 (b antes de a) ou 0
+    """
+    lo_a, hi_a, lo_b, hi_b = lo[a], hi[a], lo[b], hi[b]
+    a_below = hi_a <= lo_b                 # (P, 3): a inteiro abaixo de b no eixo
+    b_below = hi_b <= lo_a
+    near_b = eye >= 0.5 * (hi_a + lo_b)    # Câmera do lado de b (quando a_below)
+    near_a = eye >= 0.5 * (hi_b + lo_a)    # Câmera do lado de a (quando b_below)
+    a_first = (a_below & near_b) | (b_below & ~near_a)
+    b_first = (a_below & ~near_b) | (b_below & near_a)
+    order = np.zeros(len(a), dtype=np.int8)
+    order[a_first.any(axis=1)] = 1
+    order[(order == 0) & b_first.any(axis=1)] = -1
+    return order
+
+def pair_order(verts, view_verts, planes, eye, a, b, epsilon=EPSILON, bounds=None):
+    """
+    Decide a ordem de cada par (a, b) que se sobrepõe na tela
+    bounds: polygon_bounds(verts, view_verts), se já calculado
+    Retorna (order, straddle_a, straddle_b): order = 1 (a antes de b), -1 (b antes de a)
+    ou 0 (nenhum teste decide: os polígonos se atravessam); straddle_x indica que o
+    polígono x atravessa o plano do outro (pode ser dividido por ele)
+    """
+    z_min, z_max, lo, hi = polygon_bounds(verts, view_verts) if bounds is None else bounds
+    order = np.zeros(len(a), dtype=np.int8)
+
+    # Teste 2: extensões em z (maior z = mais perto da câmera)
+    order[z_max[a] <= z_min[b]] = 1
+    order[(order == 0) & (z_max[b] <= z_min[a])] = -1
+
+    # Caixas 3D separadas em algum eixo do mundo (decide pares que se cruzam só nos planos)
+    undecided = np.flatnonzero(order == 0)
+    order[undecided] = _box_order(lo, hi, eye, a[undecided], b[undecided])
+
+    # Testes 3 e 4 nos dois sentidos, com o lado da câmera de cada plano
+    eye_a = planes[a, 0:3] @ eye + planes[a, 3] >= 0
+    eye_b = planes[b, 0:3] @ eye + planes[b, 3] >= 0
+    a_front_b, a_behind_b, straddle_a = _side(verts[a], planes[b], eye_b, epsilon)
+    b_front_a, b_behind_a, straddle_b = _side(verts[b], planes[a], eye_a, epsilon)
+    undecided = order == 0
+    order[undecided & (a_behind_b | b_front_a)] = 1
+    order[(order == 0) & (b_behind_a | a_front_b)] = -1
+    return order, straddle_a, straddle_b
+
+def _line_interval(points, dist, epsilon):
+    """
+    Intervalo (mín, máx) que um triângulo ocupa sobre a reta de interseção com o outro plano:
+    points são os vértices projetados na reta (P, 3), dist as distâncias ao outro plano
+    """
+    lo = np.where(np.abs(dist) <= epsilon, points, np.inf).min(axis=1)
+    hi = np.where(np.abs(dist) <= epsilon, points, -np.inf).max(axis=1)
+    for i, j in ((0, 1), (1, 2), (2, 0)):
+        di, dj = dist[:, i], dist[:, j]
+        cross = ((di > epsilon) & (dj < -epsilon)) | ((di < -epsilon) & (dj > epsilon))
+        t = di / np.where(cross, di - dj, 1.0)
+        p = np.where(cross, points[:, i] + (points[:, j] - points[:, i]) * t, np.nan)
+        lo = np.fmin(lo, p)
+        hi = np.fmax(hi, p)
+    return lo, hi
+
+def intersecting_pairs(verts, planes, a, b, epsilon=EPSILON):
+    """
+    Máscara dos pares de triângulos (a, b) que se atravessam no espaço (Möller): cada um
+    cruza o plano do outro e os trechos sobre a reta de interseção dos planos se sobrepõem
+    """
+    dist_a = _plane_distances(verts[a], planes[b])
+    dist_b = _plane_distances(verts[b], planes[a])
+    cross = ((dist_a > epsilon).any(axis=1) & (dist_a < -epsilon).any(axis=1) &
+             (dist_b > epsilon).any(axis=1) & (dist_b < -epsilon).any(axis=1))
+    a, b, dist_a, dist_b = a[cross], b[cross], dist_a[cross], dist_b[cross]
+    line = np.cross(planes[a, 0:3], planes[b, 0:3])
+    lo_a, hi_a = _line_interval(np.einsum("pvd,pd->pv", verts[a], line), dist_a, epsilon)
+    lo_b, hi_b = _line_interval(np.einsum("pvd,pd->pv", verts[b], line), dist_b, epsilon)
+    tolerance = epsilon * np.linalg.norm(line, axis=1)
+    mask = np.zeros(len(cross), dtype=bool)
+    mask[np.flatnonzero(cross)] = (hi_a > lo_b + tolerance) & (hi_b > lo_a + tolerance)
+    return mask
+
+def split_intersections(batch, max_rounds=8, epsilon=EPSILON):
+    """
+    Divide os polígonos que se atravessam no espaço, independente do ponto de vista:
+    em cada par que se atravessa, o menor é cortado pelo plano do maior. Os pedaços
+    ficam inteiros de um lado do plano, então o par passa a ser decidido pelos testes
+    3 e 4 de qualquer câmera. Repete até não sobrar par (ou max_rounds rodadas).
+    Retorna (lote dividido, número de polígonos divididos)
+    """
+    batch = as_batch(batch)
+    total = 0
+    for _ in range(max_rounds):
+        if not len(batch):
+            break
+        verts = batch.vertices.astype(float)
+        lo, hi = verts.min(axis=1), verts.max(axis=1)
+        # Pares com caixas 3D sobrepostas: tiles nos dois eixos que mais separam as caixas (em
+        # unidades do tamanho mediano das caixas em cada eixo) e depois a faixa no terceiro
+        extent = np.maximum(hi.max(axis=0) - lo.min(axis=0), 1e-12)
+        scale = np.maximum(np.median(hi - lo, axis=0), extent / MAX_TILES)
+        axes = np.argsort(extent / scale)
+        binned, other = axes[1:], axes[0]
+        a, b = bin_boxes(lo[:, binned] / scale[binned], hi[:, binned] / scale[binned], 1.0).pairs()
+        near = (lo[a, other] <= hi[b, other]) & (lo[b, other] <= hi[a, other])
+        a, b = a[near], b[near]
+        planes = polygon_planes(verts)
+        crossing = intersecting_pairs(verts, planes, a, b, epsilon)
+        if not crossing.any():
+            break
+        a, b = a[crossing], b[crossing]
+        area = np.linalg.norm(np.cross(verts[:, 1] - verts[:, 0], verts[:, 2] - verts[:, 0]), axis=1)
+        small_a = area[a] <= area[b]
+        splits = {}
+        for i, j in zip(np.where(small_a, a, b).tolist(), np.where(small_a, b, a).tolist()):
+            planes_i = splits.setdefault(i, [])
+            if len(planes_i) < SPLITS_PER_ROUND:
+                planes_i.append(j)
+        batch, count = _split(batch, splits, planes, epsilon)
+        total += count
+        if count == 0:
+            break
+    return batch, total
+
+def involved_polygons(rank, src, dst):
+    """
+    Máscara (N,) dos polígonos nas componentes (ligadas pelas restrições src[k] antes de
+    dst[k]) que contêm alguma restrição invertida em relação a 'rank'
+    """
+    n = len(rank)
+    backward = rank[src] > rank[dst]
+    if not backward.any():
+        return np.zeros(n, dtype=bool)
+
+    # Componentes ligadas pelas restrições (propagação do menor rótulo)
+    label = np.arange(n)
+    while True:
+        m = np.minimum(label[src], label[dst])
+        new = label.copy()
+        np.minimum.at(new, src, m)
+        np.minimum.at(new, dst, m)
+        new = new[new]
+        if np.array_equal(new, label):
+            break
+        label = new
+    dirty = np.zeros(n, dtype=bool)
+    dirty[np.unique(label[src[backward]])] = True
+    return dirty[label]
+
+def constrained_order(rank, src, dst):
+    """
+    Ordenação topológica das restrições src[k] antes de dst[k], desempatada por 'rank'
+    (a ordem aproximada). Só os polígonos ligados a alguma restrição invertida são
+    reordenados; eles voltam para as mesmas posições que ocupavam.
+    Retorna (ordem dos índices, polígonos presos em ciclos)
+    """
+    n = len(rank)
+    coarse = np.argsort(rank, kind="stable")
+    involved = involved_polygons(rank, src, dst)
+    if not involved.any():
+        return coarse, np.empty(0, dtype=np.intp)
+    inside = involved[src]
+    src, dst = src[inside], dst[inside]
+
+    # Kahn com fila de prioridade pela ordem aproximada
+    by_src = np.argsort(src, kind="stable")
+    targets = dst[by_src].tolist()
+    start = np.searchsorted(src[by_src], np.arange(n)).tolist() + [len(targets)]
+    indegree = np.bincount(dst, minlength=n).tolist()
+    nodes = np.flatnonzero(involved)
+    heap = [(rank[v], v) for v in nodes.tolist() if indegree[v] == 0]
+    heapq.heapify(heap)
+    rank_list = rank.tolist()
+    result = []
+    while heap:
+        _, v = heapq.heappop(heap)
+        result.append(v)
+        for w in targets[start[v]:start[v + 1]]:
+            indegree[w] -= 1
+            if indegree[w] == 0:
+                heapq.heappush(heap, (rank_list[w], w))
+
+    placed = np.zeros(n, dtype=bool)
+    placed[result] = True
+    cyclic = nodes[~placed[nodes]]
+    cyclic = cyclic[np.argsort(rank[cyclic], kind="stable")]
+
+    # Os reordenados ocupam as posições que já eram deles na ordem aproximada
+    order = coarse.copy()
+    slots = involved[coarse]
+    order[slots] = np.concatenate([np.array(result, dtype=np.intp), cyclic])
+    return order, cyclic
+
+def _split(batch, splits, planes, epsilon):
+    """
+    Novo lote em que cada polígono i de 'splits' (i -> [j, ...]) é dividido pelos planos dos j
+    Retorna (lote, número de polígonos divididos)
+    """
+    pieces, parents = [], []
+    keep = np.ones(len(batch), dtype=bool)
+    for i, plane_of in splits.items():
+        parts = [batch.vertices[i].astype(float)]
+        for j in plane_of:
+            cut = []
+            for tri in parts:
+                front, back = split_triangle(tri, planes[j], epsilon)
+                cut.extend(front + back)
+            parts = cut
+        if len(parts) < 2:
+            continue
+        keep[i] = False
+        pieces.extend(parts)
+        parents.extend([i] * len(parts))
+    if not parents:
+        return batch, 0
+    kept = batch.take(np.flatnonzero(keep))
+    parents = np.array(parents, dtype=np.intp)
+    new = PolygonBatch(np.array(pieces), batch.colors[parents],
+                       None if batch.normals is None else batch.normals[parents],
+                       None if batch.object_ids is None else batch.object_ids[parents])
+    return PolygonBatch.concatenate([kept, new]), int((~keep).sum())
+
+class NewellSorter:
+    """
+    sort_func com ordenação exata: ordem aproximada (depth_order) corrigida pelos
+    testes de Newell-Newell-Sancha, com divisão de polígonos que se atravessam ou
+    formam ciclos
+    Uso: render_scene_painter(polygons, ..., sort_func=NewellSorter())
+
+    grid: tiles por eixo (no maior lado da área ocupada na tela) usados para achar os pares
+          candidatos; None: tiles do tamanho mediano das caixas na tela (até MAX_TILES por eixo)
+    max_rounds: máximo de rodadas de divisão (na preparação do lote e por frame)
+    mode: modo da ordenação aproximada (ver SORT_MODES)
+    max_growth: limite do lote dividido guardado, em múltiplos do lote original
+    Com divisões, o lote retornado tem mais polígonos que o recebido (como na BSP).
+    Um lote novo é preparado uma vez por split_intersections (os polígonos que se atravessam
+    são divididos para qualquer ponto de vista); enquanto o mesmo lote (same_polygons) for
+    passado, o frame parte do lote já dividido e da ordem do frame anterior, então quase
+    nenhuma restrição fica invertida e as divisões param de crescer.
+    Custo: proporcional aos pares de caixas sobrepostas na tela. Os pares separados em z na
+    ordem certa são descartados antes de formados, os testes baratos (z, caixas 3D e planos)
+    vêm antes da sobreposição na tela, que só é testada nos pares que contrariam a ordem de
+    partida ou que nenhum teste decide.
+    stats: {"pairs" (candidatos fora os adiados), "tested" (sobreposição na tela testada),
+            "overlaps", "reordered", "splits", "rounds", "unresolved", "polygons"} do último frame
+    """
+
+    def __init__(self, grid=None, max_rounds=8, mode="argsort", max_growth=4.0, epsilon=EPSILON):
+        self.grid = grid
+        self.max_rounds = max_rounds
+        self.mode = mode
+        self.max_growth = max_growth
+        self.epsilon = epsilon
+        self.stats = {}
+        self._source = None
+        self._source_len = 0
+        self._split_batch = None
+        self._order = None
+
+    def bins(self, lo, hi, valid):
+        """
+        Tiles da tela (TileBins) para as caixas (lo, hi) dos polígonos válidos
+        A grade cobre a faixa de 1% a 99% das caixas: as que passam dela (ex.: polígonos enormes
+        perto da câmera) são recortadas à borda, o que só acrescenta pares candidatos
+        """
+        if not valid.any():
+            return bin_boxes(lo, hi, 1.0, valid=valid)
+        window_lo = np.percentile(lo[valid], 1, axis=0)
+        window_hi = np.maximum(np.percentile(hi[valid], 99, axis=0), window_lo)
+        lo, hi = np.clip(lo, window_lo, window_hi), np.clip(hi, window_lo, window_hi)
+        extent = max((window_hi - window_lo).max(), 1e-12)
+        if self.grid is not None:
+            size = extent / self.grid
+        else:
+            size = max(np.median((hi[valid] - lo[valid]).max(axis=1)), extent / MAX_TILES)
+        return bin_boxes(lo, hi, size, valid=valid)
+
+    def order(self, batch, view_mat, coarse=None):
+        """
+        Uma rodada: retorna (ordem, divisões pedidas {i: [j, ...]}, planos, estatísticas) para o lote
+        coarse: ordem de partida (padrão: depth_order); a ordem do frame anterior já vem quase certa
+        """
+        n = len(batch)
+        if coarse is None:
+            coarse = depth_order(batch, view_mat, self.mode)
+        # Os testes usam as posições na ordem de partida: no par (a, b) com a < b (como os de
+        # TileBins.pairs), a é o que essa ordem desenha primeiro
+        rank = np.arange(n)
+        verts = batch.vertices[coarse].astype(float)
+        view_verts = view_space(verts, view_mat)
+        screen, valid = screen_project(view_verts)
+        lo, hi = screen.min(axis=1), screen.max(axis=1)
+        bounds = polygon_bounds(verts, view_verts)
+        z_min, z_max = bounds[0:2]
+        planes = polygon_planes(verts)
+        eye = np.linalg.inv(view_mat)[0:3, 3]
+
+        def overlapping(a, b, order, straddle_a, straddle_b):
+            # Teste 5 por último: só os pares que se sobrepõem na tela viram restrições
+            overlap = triangles_overlap_2d(screen[a], screen[b])
+            return a[overlap], b[overlap], order[overlap], straddle_a[overlap], straddle_b[overlap]
+
+        def forward(a, b):
+            # Teste 2 contra a ordem de partida: separados em z e já na ordem certa
+            return z_max[a] <= z_min[b]
+
+        # Pares candidatos em lotes, sem os separados em z na ordem certa. Os que os testes
+        # baratos põem na ordem de partida também não inverteriam nada: ficam adiados, e só os
+        # invertidos ou indecisos passam pelo teste de sobreposição na tela
+        tested, late = [], [(np.empty(0, dtype=np.intp),) * 2]
+        pairs = count = 0
+        bins = self.bins(lo, hi, valid)
+        for a, b in bins.pair_batches(PAIR_BATCH, lambda a, b: ~forward(a, b)):
+            pairs += len(a)
+            decided = pair_order(verts, view_verts, planes, eye, a, b, self.epsilon, bounds)
+            ahead = decided[0] == 1
+            late.append((a[ahead], b[ahead]))
+            rest = ~ahead
+            count += int(rest.sum())
+            tested.append(overlapping(a[rest], b[rest], *(x[rest] for x in decided)))
+
+        def edges(tested):
+            a, b, order, straddle_a, straddle_b = (np.concatenate(c) for c in zip(*tested))
+            src = np.where(order >= 0, a, b)[order != 0]
+            dst = np.where(order >= 0, b, a)[order != 0]
+            return a, b, order, straddle_a, straddle_b, src, dst
+
+        # Pares adiados já estão na ordem de partida: só importam se a ordem corrigida os inverter.
+        # Só os polígonos ligados a restrições invertidas mudam de posição, então os separados em z
+        # são gerados só para eles, e os adiados que a ordem corrigida inverte são testados até
+        # nenhum novo par invertido aparecer
+        a, b, order, straddle_a, straddle_b, src, dst = edges(tested)
+        result, cyclic = constrained_order(rank, src, dst)
+        generated = np.zeros(n, dtype=bool)
+        position = np.empty(n, dtype=np.intp)
+        while True:
+            fresh = involved_polygons(rank, src, dst) & ~generated
+            if fresh.any():
+                late.extend(bins.pair_batches(PAIR_BATCH, lambda a, b: forward(a, b) &
+                                              (fresh[a] | fresh[b]) & ~generated[a] & ~generated[b]))
+                generated |= fresh
+            late_a, late_b = (np.concatenate(c) for c in zip(*late))
+            position[result] = rank
+            flipped = position[late_a] > position[late_b]
+            if not flipped.any():
+                break
+            fa, fb = late_a[flipped], late_b[flipped]
+            count += len(fa)
+            tested.append(overlapping(fa, fb, *pair_order(verts, view_verts, planes, eye,
+                                                          fa, fb, self.epsilon, bounds)))
+            late = [(late_a[~flipped], late_b[~flipped])]
+            a, b, order, straddle_a, straddle_b, src, dst = edges(tested)
+            result, cyclic = constrained_order(rank, src, dst)
+
+        # Divisões: pares que se atravessam e, nos ciclos, um polígono que cruza o plano do outro
+        splits = {}
+        undecided = order == 0
+        split_pairs = [(b[undecided], a[undecided], straddle_b[undecided])]
+        if len(cyclic):
+            in_cycle = np.zeros(n, dtype=bool)
+            in_cycle[cyclic] = True
+            edge = (order != 0) & in_cycle[a] & in_cycle[b]
+            split_pairs.append((a[edge], b[edge], straddle_a[edge]))
+            split_pairs.append((b[edge], a[edge], straddle_b[edge]))
+        for target, plane_of, can_split in split_pairs:
+            for i, j in zip(coarse[target[can_split]].tolist(), coarse[plane_of[can_split]].tolist()):
+                planes_i = splits.setdefault(i, [])
+                if len(planes_i) < SPLITS_PER_ROUND:
+                    planes_i.append(j)
+
+        stats = {"pairs": pairs, "tested": count, "overlaps": len(a),
+                 "reordered": int((result != rank).sum()),
+                 "unresolved": int(undecided.sum()) + len(cyclic)}
+        # De volta aos índices do lote
+        batch_planes = np.empty_like(planes)
+        batch_planes[coarse] = planes
+        return coarse[result], splits, batch_planes, stats
+
+    def __call__(self, polygons, view_mat):
+        """Interface de sort_func: retorna os polígonos (possivelmente divididos) na ordem de desenho"""
+        total_splits = 0
+        if same_polygons(polygons, self._source):
+            batch, coarse = self._split_batch, self._order  # Divisões e ordem do frame anterior
+        else:
+            source = as_batch(polygons)
+            batch, total_splits = split_intersections(source, self.max_rounds, self.epsilon)
+            self._source, self._source_len = polygons, len(source)
+            coarse = None
+        for rounds in range(1, self.max_rounds + 1):
+            result, splits, planes, stats = self.order(batch, view_mat, coarse)
+            if not splits or rounds == self.max_rounds:
+                break
+            batch, count = _split(batch, splits, planes, self.epsilon)
+            coarse = None
+            total_splits += count
+            if count == 0:
+                break
+        self._split_batch, self._order = batch, result
+        if len(batch) > self.max_growth * self._source_len:
+            self._source = None  # Divisões demais acumuladas: recomeça do lote original
+        self.stats = dict(stats, splits=total_splits, rounds=rounds, polygons=len(batch))
+        return batch.take(result)
@@ -0,0 +1,138 @@
+# object_sort.py
+import numpy as np
+from polygon_batch import as_batch, same_polygons
+
+# ------------------------------------------------------
+# Ordenação por objeto (objetos convexos)
+# ------------------------------------------------------
+# Para objetos convexos (cubos, esferas, pirâmides, cilindros) não é preciso
+# ordenar cada triângulo: basta ordenar os objetos pela profundidade do centro
+# e, dentro de cada objeto, desenhar as faces de costas antes das faces de frente
+# (faces de um mesmo lado de um objeto convexo nunca se sobrepõem).
+# Assim a ordenação passa de N triângulos para M objetos.
+
+def object_ranges(object_ids):
+    """
+    Agrupa os polígonos por objeto (formato CSR)
+    Retorna (poly_index, object_start, object_count): os polígonos do k-ésimo objeto
+    são poly_index[object_start[k]:object_start[k] + object_count[k]], na ordem original
+    """
+    ids = np.asarray(object_ids)
+    if len(ids) == 0:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty, empty
+    # Os geradores produzem ids contíguos: nesse caso não é preciso ordenar
+    if np.all(ids[1:] >= ids[:-1]):
+        poly_index = np.arange(len(ids))
+    else:
+        poly_index = np.argsort(ids, kind="stable")
+    grouped = ids[poly_index]
+    object_start = np.flatnonzero(np.concatenate([[True], grouped[1:] != grouped[:-1]]))
+    object_count = np.diff(np.append(object_start, len(ids)))
+    return poly_index, object_start, object_count
+
+def outward_normals(vertices, centers):
+    """
+    Normal de cada triângulo orientada para fora do objeto
+    vertices: (N, 3, 3); centers: (N, 3) centro do objeto de cada triângulo
+    A orientação não depende da ordem dos vértices (que varia entre os geradores)
+    """
+    v = np.asarray(vertices, dtype=float)
+    n = np.cross(v[:, 1] - v[:, 0], v[:, 2] - v[:, 0])
+    flip = np.einsum("ij,ij->i", n, v.mean(axis=1) - centers) < 0
+    n[flip] = -n[flip]
+    return n
+
+class ObjectSorter:
+    """
+    sort_func que ordena objetos em vez de triângulos (requer object_ids no PolygonBatch)
+    Uso: render_scene_painter(..., sort_func=ObjectSorter())
+
+    Os agrupamentos por objeto, os centros e as normais externas são calculados
+    na primeira chamada e reaproveitados enquanto o mesmo lote (ou um lote com o
+    mesmo conteúdo) for passado.
+    A cada frame: ordenação dos M centros + classificação frente/costas (O(N), sem sort).
+
+    draw_back_faces: se False, as faces de costas são descartadas (back-face culling)
+    stats: {"objects", "polygons", "back_faces", "rebuilt"} do último frame
+    """
+
+    def __init__(self, draw_back_faces=True):
+        self.draw_back_faces = draw_back_faces
+        self.stats = {}
+        self._source = None
+
+    def prepare(self, polygons):
+        """
+        Calcula (ou reaproveita) os dados por objeto do lote
+        Reaproveita se o lote tem o mesmo conteúdo do anterior (same_polygons): com culling,
+        cada frame recebe um lote novo, que se repete enquanto a câmera não se move
+        """
+        if same_polygons(polygons, self._source):
+            return False
+        batch = as_batch(polygons)
+        if batch.object_ids is None:
+            raise ValueError("ObjectSorter requer polígonos com object_ids (ex.: create_polygons_3D)")
+
+        self.poly_index, self.object_start, self.object_count = object_ranges(batch.object_ids)
+        centroids = batch.vertices.mean(axis=1, dtype=float)[self.poly_index]
+        # Centro de cada objeto: média dos centroides de seus triângulos
+        sums = np.add.reduceat(centroids, self.object_start, axis=0) if len(centroids) else centroids
+        self.centers = sums / np.maximum(self.object_count, 1)[:, None]
+        if batch.normals is not None:
+            # Normais já orientadas pelos geradores (compute_normals)
+            self.normals = batch.normals[self.poly_index].astype(float)
+        else:
+            self.normals = outward_normals(batch.vertices[self.poly_index],
+                                           np.repeat(self.centers, self.object_count, axis=0))
+        # Face de costas quando normal·eye <= normal·centroide (plano de cada face)
+        self.plane_offsets = np.einsum("ij,ij->i", self.normals, centroids)
+        self._source = polygons
+        return True
+
+    def order(self, polygons, view_mat):
+        """Índices dos polígonos na ordem de desenho (objetos do mais distante ao mais próximo)"""
+        rebuilt = self.prepare(polygons)
+        m = len(self.object_count)
+
+        # Ordena apenas os objetos pela profundidade do centro (como polygon_depths)
+        z = self.centers @ view_mat[2, 0:3] + view_mat[2, 3]
+        w = self.centers @ view_mat[3, 0:3] + view_mat[3, 3]
+        w[w == 0] = 1.0
+        object_order = np.argsort(z / w, kind="stable")
+
+        # Expande os objetos ordenados nos intervalos de seus polígonos
+        counts = self.object_count[object_order]
+        starts = self.object_start[object_order]
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        positions = offsets + np.arange(counts.sum())
+
+        # Faces de costas: a normal externa aponta para longe da câmera
+        eye = np.linalg.inv(view_mat)[0:3, 3]
+        back = (self.normals @ eye <= self.plane_offsets)[positions]
+
+        if self.draw_back_faces:
+            # Partição estável dentro de cada objeto: costas primeiro, depois frente
+            seg_start = np.cumsum(counts) - counts
+            seg = np.repeat(np.arange(m), counts)
+            back_before = np.cumsum(back) - back        # Faces de costas antes de cada posição
+            back_in_seg = np.add.reduceat(back, seg_start) if m else back
+            rank_back = back_before - back_before[seg_start][seg]
+            rank_front = np.arange(len(back)) - seg_start[seg] - rank_back
+            target = seg_start[seg] + np.where(back, rank_back, back_in_seg[seg] + rank_front)
+            ordered = np.empty_like(positions)
+            ordered[target] = positions
+            positions = ordered
+        else:
+            positions = positions[~back]
+
+        self.stats = {"objects": m, "polygons": len(positions), "back_faces": int(back.sum()),
+                      "rebuilt": rebuilt}
+        return self.poly_index[positions]
+
+    def __call__(self, polygons, view_mat):
+        """Interface de sort_func: retorna os polígonos na ordem de desenho"""
+        order = self.order(polygons, view_mat)
+        if hasattr(polygons, "take"):  # PolygonBatch ou IndexedMesh
+            return polygons.take(order)
+        return [polygons[i] for i in order]
@@ -1,6 +1,9 @@
 # painter_algorithm.py
 from OpenGL.GL import *
 import numpy as np
+from polygon_batch import PolygonBatch, as_batch
+from indexed_mesh import IndexedMesh
+from radix_sort import radix_depth_order
 
 # ------------------------------------------------------
 # Utilitários
@@ -34,12 +37,131 @@ def look_at(eye, target, up):
     
     return M @ T  # Combina rotação e translação
 
+def perspective(fovy, aspect, near, far):
+    """
+    Cria uma matriz de projeção perspectiva equivalente a gluPerspective
+    fovy: campo de visão vertical em graus
+    aspect: proporção largura/altura
+    near, far: distância dos planos de corte próximo e distante
+    """
+    f = 1.0 / np.tan(np.radians(fovy) / 2.0)  # Cotangente de metade do campo de visão
+    P = np.zeros((4, 4), dtype=float)
+    P[0, 0] = f / aspect
+    P[1, 1] = f
+    P[2, 2] = (far + near) / (near - far)
+    P[2, 3] = 2.0 * far * near / (near - far)
+    P[3, 2] = -1.0  # w = -z (divisão perspectiva)
+    return P
+
+def rotation_y(angle):
+    """Matriz 4x4 de rotação em torno do eixo Y (em graus), como glRotatef(angle, 0, 1, 0)"""
+    a = np.radians(angle)
+    c, s = np.cos(a), np.sin(a)
+    R = np.identity(4, dtype=float)
+    R[0, 0], R[0, 2] = c, s
+    R[2, 0], R[2, 2] = -s, c
+    return R
+
 def transform_point(mat4, v3):
     """Aplica uma transformação matricial 4x4 a um ponto 3D"""
     v4 = np.array([v3[0], v3[1], v3[2], 1.0], dtype=float)  # Converte para coordenadas homogêneas
     tv = mat4 @ v4  # Aplica a transformação matricial
     return tv[0:3] / (tv[3] if tv[3] != 0 else 1.0)  # Retorna para coordenadas 3D (perspectiva division)
 
+def transform_vertices(polygons, mat4):
+    """
+    Versão vetorizada de transform_point: transforma todos os vértices de uma vez
+    Retorna um array (N, 3, 3) com os vértices transformados (após a divisão por w)
+    Para uma IndexedMesh, cada vértice único é transformado uma só vez
+    """
+    if isinstance(polygons, IndexedMesh):
+        return polygons.transform(mat4)[polygons.faces]
+    verts = as_batch(polygons).vertices.astype(float)
+    tv = verts @ mat4[:, 0:3].T + mat4[:, 3]  # (N, 3, 4) em coordenadas homogêneas
+    w = tv[..., 3:4]
+    return tv[..., 0:3] / np.where(w != 0, w, 1.0)
+
+# ------------------------------------------------------
+# Frustum culling - descarta polígonos fora do campo de visão
+# ------------------------------------------------------
+
+def frustum_planes(projection, model_view):
+    """
+    Extrai os 6 planos do frustum (esquerda, direita, baixo, cima, perto, longe)
+    da matriz projection @ model_view (método de Gribb-Hartmann)
+    Retorna um array (6, 4) com planos (a, b, c, d) normalizados, normal apontando
+    para dentro: um ponto p está dentro do plano se a*x + b*y + c*z + d >= 0
+    """
+    clip = projection @ model_view
+    planes = np.array([
+        clip[3] + clip[0], clip[3] - clip[0],  # Esquerda, direita
+        clip[3] + clip[1], clip[3] - clip[1],  # Baixo, cima
+        clip[3] + clip[2], clip[3] - clip[2],  # Perto, longe
+    ])
+    return planes / np.linalg.norm(planes[:, 0:3], axis=1, keepdims=True)
+
+def in_frustum(vertices, planes, faces=None):
+    """
+    Máscara (N,) dos triângulos que não estão inteiramente fora de nenhum plano
+    vertices: array (N, 3, 3); planes: array (6, 4) de frustum_planes
+    faces: se informado (N, 3), vertices são os vértices únicos (V, 3) de uma malha indexada
+    """
+    # Distância de todos os vértices aos 6 planos com um único produto (6, 3N) em float32
+    planes = np.asarray(planes, dtype=np.float32)
+    outside = (planes[:, 0:3] @ vertices.reshape(-1, 3).T) < -planes[:, 3:4]
+    if faces is not None:
+        # Cada vértice único é testado uma vez; os 6 resultados viram bits de um uint8,
+        # e o triângulo é descartado se os 3 vértices têm um bit (plano) em comum
+        bits = (outside.astype(np.uint8) << np.arange(6, dtype=np.uint8)[:, None]).sum(axis=0, dtype=np.uint8)
+        corner = bits[faces]
+        return (corner[:, 0] & corner[:, 1] & corner[:, 2]) == 0
+    outside = outside.reshape(6, len(vertices), 3)
+    # Descartado: os 3 vértices fora de um mesmo plano
+    return ~(outside[:, :, 0] & outside[:, :, 1] & outside[:, :, 2]).any(axis=0)
+
+def cull_frustum(polygons, model_view, projection):
+    """
+    Retorna os índices (em ordem crescente) dos polígonos que podem estar visíveis
+    Um polígono é descartado quando todos os seus vértices estão fora de um mesmo plano
+    do frustum (teste conservador: polígonos que cruzam um canto podem ser mantidos)
+    """
+    planes = frustum_planes(projection, model_view)
+    if isinstance(polygons, IndexedMesh):
+        return np.flatnonzero(in_frustum(polygons.positions, planes, polygons.faces))
+    if not isinstance(polygons, PolygonBatch):
+        return np.array([i for i, p in enumerate(polygons)
+                         if all((np.asarray(p["vertices"], dtype=float) @ pl[0:3] + pl[3] >= 0).any()
+                                for pl in planes)], dtype=np.intp)
+
+    return np.flatnonzero(in_frustum(polygons.vertices, planes))
+
+def cull_backfaces(polygons, model_view):
+    """
+    Retorna os índices (em ordem crescente) dos polígonos voltados para a câmera
+    Usa as normais guardadas no PolygonBatch (compute_normals) e a posição da câmera
+    obtida da inversa da model_view. Só faces de objetos fechados (com normals e
+    object_ids) são descartadas; superfícies abertas, como as cenas 2D, são mantidas
+    """
+    n = len(polygons)
+    if not isinstance(polygons, (PolygonBatch, IndexedMesh)) or polygons.normals is None \
+            or polygons.object_ids is None:
+        return np.arange(n)
+    eye = np.linalg.inv(model_view)[0:3, 3]
+    normals = polygons.normals
+    if isinstance(polygons, IndexedMesh):
+        first = polygons.positions[polygons.faces[:, 0]]
+    else:
+        first = polygons.vertices[:, 0]
+    # Frente: normal·(eye - v0) > 0, calculado como normal·eye > normal·v0
+    facing = normals @ eye.astype(np.float32) > np.einsum("ij,ij->i", normals, first)
+    return np.flatnonzero(facing)
+
+def take_polygons(polygons, indices):
+    """Seleciona 'indices' de um PolygonBatch/IndexedMesh ou de uma lista de polígonos (mesmo tipo recebido)"""
+    if hasattr(polygons, "take"):
+        return polygons.take(indices)
+    return [polygons[i] for i in indices]
+
 # ------------------------------------------------------
 # Painter's Algorithm - Implementação do algoritmo do pintor
 # ------------------------------------------------------
@@ -54,12 +176,57 @@ def polygon_avg_depth(poly, view_mat):
     depths = [transform_point(view_mat, v)[2] for v in verts]
     return np.mean(depths)  # Retorna a profundidade média
 
-def sort_polygons(polygons, view_mat):
+def polygon_depths(polygons, view_mat):
+    """
+    Versão vetorizada de polygon_avg_depth: calcula a profundidade média de todos
+    os polígonos de uma vez, com um único produto matricial sobre todos os vértices
+    Retorna um array (N,) float64 com a profundidade de cada polígono
+    """
+    if isinstance(polygons, IndexedMesh):
+        return polygons.depths(view_mat)  # Uma vez por vértice único, reunido pelos índices
+    if isinstance(polygons, PolygonBatch):
+        verts = polygons.vertices
+    else:
+        try:
+            verts = np.array([p["vertices"] for p in polygons], dtype=float)
+        except ValueError:
+            # Polígonos com números diferentes de vértices: calcula um a um
+            return np.array([polygon_avg_depth(p, view_mat) for p in polygons], dtype=float)
+    if len(verts) == 0:
+        return np.empty(0, dtype=float)
+
+    verts = np.asarray(verts, dtype=float)
+    # Apenas as linhas Z e W da matriz interessam para a profundidade
+    z = verts @ view_mat[2, 0:3] + view_mat[2, 3]
+    w = verts @ view_mat[3, 0:3] + view_mat[3, 3]
+    w[w == 0] = 1.0  # Mesma proteção contra divisão por zero de transform_point
+    return (z / w).mean(axis=1)
+
+SORT_MODES = ("argsort", "radix16", "radix32")
+
+def depth_order(polygons, view_mat, mode="argsort", stats=None):
+    """
+    Retorna os índices dos polígonos ordenados do mais distante para o mais próximo
+    mode: "argsort" - argsort estável, empates mantêm a ordem original (como sorted)
+          "radix16"/"radix32" - radix sort linear das profundidades quantizadas em
+          16/32 bits (radix_sort.py); profundidades muito próximas podem empatar
+    stats: dicionário opcional; nos modos radix recebe {"passes", "ties"}
+    """
+    depths = polygon_depths(polygons, view_mat)
+    if mode == "argsort":
+        return np.argsort(depths, kind="stable")
+    if mode in ("radix16", "radix32"):
+        return radix_depth_order(depths, bits=int(mode[5:]), stats=stats)
+    raise ValueError("modo de ordenação desconhecido: %r (use um de %s)" % (mode, ", ".join(SORT_MODES)))
+
+def sort_polygons(polygons, view_mat, mode="argsort", stats=None):
     """
     Ordena os polígonos por profundidade média (do mais distante para o mais próximo)
     O Painter's Algorithm requer desenhar dos objetos mais distantes para os mais próximos
+    Aceita uma lista de dicionários ou um PolygonBatch (retorna o mesmo tipo recebido)
+    mode/stats: ver depth_order (ex.: sort_func=functools.partial(sort_polygons, mode="radix32"))
     """
-    return sorted(polygons, key=lambda p: polygon_avg_depth(p, view_mat))
+    return take_polygons(polygons, depth_order(polygons, view_mat, mode, stats))
 
 def draw_polygons(polygons):
     """
@@ -84,38 +251,225 @@ def draw_polygons(polygons):
             glVertex3f(v[0], v[1], v[2])
         glEnd()
 
-def painter_algorithm(polygons, view_mat, angle=0.0, draw_func=draw_polygons):
+def pack_draw_buffers(polygons):
+    """
+    Empacota os polígonos (já ordenados) em arrays contíguos prontos para o OpenGL
+    Função NumPy pura - não faz chamadas OpenGL, podendo ser testada sem janela
+    Retorna (fill_vertices, fill_colors, outline_vertices):
+      fill_vertices: (3N, 3) float32 - vértices para GL_TRIANGLES
+      fill_colors: (3N, 3) float32 - cor de cada vértice (repete a cor do triângulo)
+      outline_vertices: (6N, 3) float32 - pares de vértices das arestas para GL_LINES
+    """
+    batch = as_batch(polygons)
+    fill_vertices = batch.vertices.reshape(-1, 3)
+    fill_colors = np.repeat(batch.colors, 3, axis=0)
+    # Cada triângulo vira 3 segmentos: (v0,v1), (v1,v2), (v2,v0)
+    outline_vertices = np.ascontiguousarray(batch.vertices[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 3))
+    return fill_vertices, fill_colors, outline_vertices
+
+def _begin_fills():
+    """
+    Estado do preenchimento em lote: a ordem de desenho decide quem cobre quem (GL_ALWAYS),
+    mas a profundidade do último polígono desenhado em cada pixel fica gravada (um pouco
+    recuada) para os contornos desenhados depois
+    """
+    glEnable(GL_DEPTH_TEST)
+    glDepthFunc(GL_ALWAYS)
+    glEnable(GL_POLYGON_OFFSET_FILL)
+    glPolygonOffset(1.0, 1.0)
+
+def _begin_outlines():
+    """Contornos só onde o seu polígono é o que ficou por cima: os encobertos são descartados"""
+    glDisable(GL_POLYGON_OFFSET_FILL)
+    glDepthFunc(GL_LEQUAL)
+
+def _end_outlines():
+    """Volta ao estado do Painter's Algorithm (sem teste de profundidade)"""
+    glDepthFunc(GL_LESS)
+    glDisable(GL_DEPTH_TEST)
+
+def draw_polygons_arrays(polygons):
+    """
+    Alternativa a draw_polygons usando vertex arrays: envia todos os polígonos de uma vez
+    com um glDrawArrays para o preenchimento e outro para os contornos
+    Pode ser usada como draw_func em painter_algorithm/render_scene_painter
+    Os contornos vêm depois de todos os preenchimentos; para manter a ordem do pintor, o
+    preenchimento grava a profundidade do polígono que ficou por cima em cada pixel e os
+    contornos dos polígonos encobertos são descartados pelo teste de profundidade
+    """
+    fill_vertices, fill_colors, outline_vertices = pack_draw_buffers(polygons)
+    if len(fill_vertices) == 0:
+        return
+
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glEnableClientState(GL_COLOR_ARRAY)
+
+    # Preenchimento: um único draw call para todos os triângulos
+    _begin_fills()
+    glVertexPointer(3, GL_FLOAT, 0, fill_vertices)
+    glColorPointer(3, GL_FLOAT, 0, fill_colors)
+    glDrawArrays(GL_TRIANGLES, 0, len(fill_vertices))
+
+    # Contornos em preto: um único draw call com todas as arestas
+    _begin_outlines()
+    glDisableClientState(GL_COLOR_ARRAY)
+    glColor3f(0,0,0)
+    glVertexPointer(3, GL_FLOAT, 0, outline_vertices)
+    glDrawArrays(GL_LINES, 0, len(outline_vertices))
+    _end_outlines()
+
+    glDisableClientState(GL_VERTEX_ARRAY)
+
+def draw_polygons_elements(mesh):
+    """
+    Desenha uma IndexedMesh com glDrawElements: os vértices únicos são enviados uma vez
+    e os triângulos (na ordem de 'mesh.faces', já ordenada) são índices sobre eles
+    Pode ser usada como draw_func; outros tipos de entrada usam draw_polygons_arrays
+    """
+    if not isinstance(mesh, IndexedMesh):
+        return draw_polygons_arrays(mesh)
+    if len(mesh) == 0:
+        return
+
+    glEnableClientState(GL_VERTEX_ARRAY)
+    glEnableClientState(GL_COLOR_ARRAY)
+    glVertexPointer(3, GL_FLOAT, 0, mesh.positions)
+    glColorPointer(3, GL_FLOAT, 0, mesh.vertex_colors)
+
+    # Preenchimento: índices dos triângulos na ordem de desenho
+    _begin_fills()
+    indices = np.ascontiguousarray(mesh.faces, dtype=np.uint32)
+    glDrawElements(GL_TRIANGLES, indices.size, GL_UNSIGNED_INT, indices)
+
+    # Contornos em preto: (v0,v1), (v1,v2), (v2,v0) de cada triângulo (só os não encobertos,
+    # como em draw_polygons_arrays)
+    _begin_outlines()
+    glDisableClientState(GL_COLOR_ARRAY)
+    glColor3f(0,0,0)
+    edges = np.ascontiguousarray(mesh.faces[:, [0, 1, 1, 2, 2, 0]], dtype=np.uint32)
+    glDrawElements(GL_LINES, edges.size, GL_UNSIGNED_INT, edges)
+    _end_outlines()
+
+    glDisableClientState(GL_VERTEX_ARRAY)
+
+def painter_algorithm(polygons, view_mat, angle=0.0, draw_func=draw_polygons, sort_func=sort_polygons,
+                      profiler=None, projection=None, cull_func=cull_frustum, backface_culling=False,
+                      frame_cache=None):
     """
     Implementação principal do Painter's Algorithm
-    polygons: lista de polígonos a serem desenhados
+    polygons: lista de polígonos ou PolygonBatch a serem desenhados (ou uma LODScene de lod.py,
+              que escolhe o nível de detalhe de cada objeto pelo tamanho na tela, ou um
+              PolygonStream de polygon_stream.py, lido do disco em blocos)
     view_mat: matriz de visualização para cálculo de profundidade
     angle: ângulo de rotação opcional para animação
     draw_func: função personalizada para desenho (padrão: draw_polygons)
+    sort_func: função de ordenação sort_func(polygons, view_mat) (padrão: sort_polygons)
+    profiler: FrameProfiler opcional (profiler.py) que recebe os tempos das etapas
+    projection: matriz de projeção (ex.: perspective); se informada, os polígonos fora
+                do frustum são descartados antes da ordenação
+    cull_func: função de descarte cull_func(polygons, model_view, projection) que retorna
+               os índices dos polígonos mantidos (padrão: cull_frustum)
+    backface_culling: descarta as faces de costas (cull_backfaces) antes da ordenação
+    frame_cache: FrameCache opcional (frame_cache.py); se nada mudou desde o último frame,
+                 redesenha a ordem anterior sem descartar nem ordenar de novo
+    Obs.: com descarte, sort_func recebe apenas os polígonos visíveis; ordenadores
+    presos a uma cena fixa (ex.: BSPTree) devem ser usados sem projection/backface_culling
     """
-    # Ordena polígonos pela profundidade (mais distante primeiro)
-    ordered = sort_polygons(polygons, view_mat)
-
     # Configurações específicas do Painter's Algorithm
     glDisable(GL_DEPTH_TEST)   # Desativa teste de profundidade (Z-buffer)
     glDisable(GL_LIGHTING)     # Desativa iluminação para usar cores sólidas
 
+    key_args = (polygons, view_mat, angle, projection, backface_culling, sort_func, draw_func)
+    if frame_cache is not None and frame_cache.matches(*key_args):
+        # Nada mudou: repete o desenho guardado
+        glPushMatrix()
+        glRotatef(angle, 0, 1, 0)
+        frame_cache.replay()
+        glPopMatrix()
+        if profiler is not None:
+            profiler.mark("draw")
+            profiler.count("cached", 1)
+        glEnable(GL_LIGHTING)
+        return
+
+    model_view = view_mat @ rotation_y(angle)  # Inclui a rotação aplicada no desenho
+    if hasattr(polygons, "select_level"):
+        # Cena com níveis de detalhe (LODScene): escolhe a tesselação de cada objeto neste frame
+        scene = polygons
+        polygons = scene.select_level(model_view, projection)
+        if profiler is not None:
+            profiler.mark("lod")
+            profiler.count("lod_saved", scene.stats["full_polygons"] - scene.stats["polygons"])
+            profiler.count("lod_changed", scene.stats["changed"])
+    total = len(polygons)
+    if hasattr(polygons, "ordered_visible"):
+        # Cena em disco (PolygonStream): descarte e chaves de profundidade bloco a bloco, e a
+        # ordem final sai da intercalação dos blocos (sort_func não é usado)
+        ordered = polygons.ordered_visible(model_view, view_mat, projection, cull_func, backface_culling)
+        stats = None
+        if profiler is not None:
+            profiler.mark("stream")
+            profiler.count("drawn", len(ordered))
+            profiler.count("culled", total - len(ordered))
+            profiler.count("chunks", polygons.stats["chunks"])
+    else:
+        if projection is not None:
+            # Descarta o que está fora do campo de visão
+            polygons = take_polygons(polygons, cull_func(polygons, model_view, projection))
+            if profiler is not None:
+                profiler.mark("cull")
+        if backface_culling:
+            # Descarta as faces voltadas para longe da câmera
+            before = len(polygons)
+            polygons = take_polygons(polygons, cull_backfaces(polygons, model_view))
+            if profiler is not None:
+                profiler.mark("backface")
+                profiler.count("backfaces", before - len(polygons))
+
+        # Ordena polígonos pela profundidade (mais distante primeiro)
+        ordered = sort_func(polygons, view_mat)
+        stats = getattr(sort_func, "stats", None)
+        if profiler is not None:
+            profiler.mark("sort")
+            profiler.count("drawn", len(ordered))
+            profiler.count("culled", total - len(ordered))
+            if stats is not None:  # Ordenadores com estado (ex.: IncrementalSorter) expõem o trabalho feito
+                profiler.count("sort_swaps", stats.get("swaps", 0))
+
     # Aplica transformações (rotação para animação)
     glPushMatrix()
     glRotatef(angle, 0, 1, 0)  # Rotação em Y
-    draw_func(ordered)          # Desenha polígonos ordenados
+    if frame_cache is not None:
+        # Guarda o desenho só quando as entradas se repetem e a ordem não é de um frame anterior (AsyncSorter)
+        current = stats is None or stats.get("latency", 0) == 0
+        frame_cache.record(ordered, key_args, current=current)
+    else:
+        draw_func(ordered)      # Desenha polígonos ordenados
     glPopMatrix()
+    if profiler is not None:
+        profiler.mark("draw")
     
     # Restaura iluminação para outros elementos da cena
     glEnable(GL_LIGHTING)
 
-def render_scene_painter(polygons, camera_pos, camera_target, camera_up, angle=0.0, draw_func=draw_polygons):
+def render_scene_painter(polygons, camera_pos, camera_target, camera_up, angle=0.0, draw_func=draw_polygons,
+                         sort_func=sort_polygons, profiler=None, projection=None, cull_func=cull_frustum,
+                         backface_culling=False, frame_cache=None):
     """
     Função principal de renderização que integra o Painter's Algorithm
     com a configuração de câmera do OpenGL
+    profiler: FrameProfiler opcional; mede look_at, sort, draw e swap de cada frame
+    projection: matriz de projeção usada no reshape; ativa o frustum culling
+    cull_func: função de descarte (padrão: cull_frustum; ex.: uma BVH de bvh.py)
+    backface_culling: descarta as faces de costas dos objetos fechados antes da ordenação
+    frame_cache: FrameCache opcional; repete o último desenho enquanto câmera e cena não mudam
     """
     from OpenGL.GL import glClear, GL_COLOR_BUFFER_BIT, GL_DEPTH_BUFFER_BIT
     from OpenGL.GLU import gluLookAt
-    from OpenGL.GLUT import glutSwapBuffers
+    from OpenGL.GLUT import glutSwapBuffers, glutPostRedisplay
+
+    if profiler is not None:
+        profiler.begin_frame()
 
     # Limpa os buffers de cor e profundidade
     glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
@@ -129,9 +483,22 @@ def render_scene_painter(polygons, camera_pos, camera_target, camera_up, angle=0
     
     # Calcula a matriz de visualização para o Painter's Algorithm
     view_mat = look_at(camera_pos, camera_target, camera_up)
+    if profiler is not None:
+        profiler.mark("look_at")
     
     # Executa o Painter's Algorithm
-    painter_algorithm(polygons, view_mat, angle, draw_func=draw_func)
+    painter_algorithm(polygons, view_mat, angle, draw_func=draw_func, sort_func=sort_func, profiler=profiler,
+                      projection=projection, cull_func=cull_func, backface_culling=backface_culling,
+                      frame_cache=frame_cache)
+    if profiler is not None and profiler.overlay:
+        profiler.draw_overlay()
+        profiler.mark("overlay")
     
     # Troca os buffers (double buffering)
-    glutSwapBuffers()
\ No newline at end of file
+    glutSwapBuffers()
+    if profiler is not None:
+        profiler.mark("swap")
+        profiler.end_frame()
+    if frame_cache is not None and frame_cache.pending:
+        # A ordem desenhada ainda era a do frame anterior: mais um frame para a definitiva
+        glutPostRedisplay()
\ No newline at end of file
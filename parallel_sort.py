@@ -0,0 +1,190 @@
+# parallel_sort.py
+import os
+import numpy as np
+from multiprocessing import Pool, shared_memory
+from polygon_batch import as_batch
+from painter_algorithm import take_polygons
+
+# ------------------------------------------------------
+# Ordenação paralela (vários processos, memória compartilhada)
+# ------------------------------------------------------
+# Os vértices são copiados uma única vez para memória compartilhada; a cada frame
+# os processos recebem apenas nomes, limites e a view matrix (nada de pickle dos
+# vértices). Etapas:
+#   1. cada processo calcula as profundidades de um bloco contíguo de polígonos e
+#      o ordena (argsort estável), gerando k sequências ordenadas;
+#   2. o processo principal escolhe chaves divisoras e corta cada sequência nelas
+#      (searchsorted), definindo faixas de saída independentes;
+#   3. cada processo intercala (k-way merge) os pedaços das k sequências que caem
+#      na sua faixa e escreve o resultado direto na posição final.
+# O resultado é idêntico a np.argsort(profundidades, kind="stable").
+
+_attached = {}  # Blocos de memória compartilhada abertos em cada processo (nome -> SharedMemory)
+
+def _shared_array(name, shape, dtype):
+    """No processo trabalhador: array NumPy sobre um bloco compartilhado (aberto uma vez)"""
+    shm = _attached.get(name)
+    if shm is None:
+        # O resource_tracker é o mesmo do processo principal, que remove o bloco (unlink)
+        shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = shm
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+def _forget_others(names):
+    """Fecha os blocos de cenas anteriores que o trabalhador ainda mantém abertos"""
+    for name in list(_attached):
+        if name not in names:
+            _attached.pop(name).close()
+
+def _key_chunk(task):
+    """Etapa 1 (trabalhador): profundidades do bloco [start, stop) e ordenação local"""
+    names, n, view_mat, start, stop = task
+    _forget_others(names)
+    verts = _shared_array(names[0], (n, 3, 3), np.float32)[start:stop].astype(float)
+    sorted_keys = _shared_array(names[1], (n,), np.float64)
+    order = _shared_array(names[2], (n,), np.int64)
+
+    # Mesma conta de polygon_depths (linhas Z e W da view matrix)
+    z = verts @ view_mat[2, 0:3] + view_mat[2, 3]
+    w = verts @ view_mat[3, 0:3] + view_mat[3, 3]
+    w[w == 0] = 1.0
+    keys = (z / w).mean(axis=1)
+    local = np.argsort(keys, kind="stable")
+    sorted_keys[start:stop] = keys[local]
+    order[start:stop] = local + start
+
+def _merge_segment(task):
+    """Etapa 3 (trabalhador): intercala os pedaços das k sequências de uma faixa da saída"""
+    names, n, pieces, offset = task
+    sorted_keys = _shared_array(names[1], (n,), np.float64)
+    order = _shared_array(names[2], (n,), np.int64)
+    out = _shared_array(names[3], (n,), np.int64)
+
+    # Os pedaços já estão ordenados e vêm na ordem das sequências (índices crescentes):
+    # o argsort estável (timsort) detecta as k sequências e apenas as intercala
+    keys = np.concatenate([sorted_keys[a:b] for a, b in pieces])
+    idx = np.concatenate([order[a:b] for a, b in pieces])
+    out[offset:offset + len(idx)] = idx[np.argsort(keys, kind="stable")]
+
+def split_runs(sorted_keys, bounds, parts):
+    """
+    Divide k sequências ordenadas (sorted_keys[a:b] para (a, b) em bounds) em 'parts'
+    faixas de chaves. Retorna uma lista, por faixa, de (pedaços [(a, b), ...], deslocamento na saída)
+    """
+    # Chaves divisoras: quantis de uma amostra regular de todas as sequências
+    sample = np.concatenate([sorted_keys[a:b][::max(1, (b - a) // (4 * parts))] for a, b in bounds])
+    splitters = np.quantile(sample, np.arange(1, parts) / parts) if len(sample) else np.empty(0)
+
+    # cuts[r, j]: início da faixa j dentro da sequência r (empates com o divisor vão para a faixa j)
+    cuts = np.array([np.concatenate([[a], a + np.searchsorted(sorted_keys[a:b], splitters, side="left"), [b]])
+                     for a, b in bounds])
+    segments, offset = [], 0
+    for j in range(parts):
+        pieces = [(int(cuts[r, j]), int(cuts[r, j + 1])) for r in range(len(bounds))
+                  if cuts[r, j + 1] > cuts[r, j]]
+        size = sum(b - a for a, b in pieces)
+        if size:
+            segments.append((pieces, offset))
+        offset += size
+    return segments
+
+class ParallelSorter:
+    """
+    sort_func que calcula as profundidades e ordena em 'workers' processos
+    Uso: with ParallelSorter(workers=8) as sorter: render_scene_painter(..., sort_func=sorter)
+
+    workers: número de processos (padrão: os.cpu_count())
+    chunk_size: polígonos por tarefa da etapa 1 (padrão: dividir igualmente entre os processos)
+    Os vértices são copiados para a memória compartilhada quando um lote novo é recebido
+    e reaproveitados enquanto o mesmo lote for passado.
+    """
+
+    def __init__(self, workers=None, chunk_size=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.stats = {}
+        self._pool = None
+        self._blocks = []
+        self._source = None
+        self._n = 0
+
+    # --------------------------------------------------
+    # Recursos (processos e memória compartilhada)
+    # --------------------------------------------------
+
+    def _release_blocks(self):
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks = []
+        self._source = None
+
+    def prepare(self, polygons):
+        """Copia os vértices do lote para a memória compartilhada (se ainda não copiados)"""
+        if polygons is self._source:
+            return
+        self._release_blocks()
+        verts = as_batch(polygons).vertices
+        n = len(verts)
+        sizes = (max(verts.nbytes, 1), max(8 * n, 1), max(8 * n, 1), max(8 * n, 1))
+        self._blocks = [shared_memory.SharedMemory(create=True, size=s) for s in sizes]
+        np.ndarray(verts.shape, dtype=np.float32, buffer=self._blocks[0].buf)[:] = verts
+        self._n = n
+        self._source = polygons
+        if self._pool is None:
+            self._pool = Pool(self.workers)
+
+    def close(self):
+        """Encerra os processos e libera a memória compartilhada"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        self._release_blocks()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    # --------------------------------------------------
+    # Ordenação
+    # --------------------------------------------------
+
+    def order(self, polygons, view_mat):
+        """Índices dos polígonos do mais distante para o mais próximo (igual a depth_order)"""
+        self.prepare(polygons)
+        n = self._n
+        if n == 0:
+            return np.empty(0, dtype=np.intp)
+        names = tuple(shm.name for shm in self._blocks)
+        view_mat = np.asarray(view_mat, dtype=float)
+
+        # Etapa 1: blocos contíguos, cada um vira uma sequência ordenada
+        chunk = self.chunk_size or -(-n // self.workers)
+        bounds = [(a, min(a + chunk, n)) for a in range(0, n, chunk)]
+        self._pool.map(_key_chunk, [(names, n, view_mat, a, b) for a, b in bounds])
+
+        # Etapas 2 e 3: faixas independentes da saída, intercaladas em paralelo
+        sorted_keys = np.ndarray((n,), dtype=np.float64, buffer=self._blocks[1].buf)
+        if len(bounds) == 1:
+            segments = []
+            result = np.ndarray((n,), dtype=np.int64, buffer=self._blocks[2].buf)
+        else:
+            segments = split_runs(sorted_keys, bounds, self.workers)
+            self._pool.map(_merge_segment, [(names, n, pieces, offset) for pieces, offset in segments])
+            result = np.ndarray((n,), dtype=np.int64, buffer=self._blocks[3].buf)
+
+        self.stats = {"polygons": n, "workers": self.workers, "chunks": len(bounds), "segments": len(segments)}
+        return result.copy()
+
+    def __call__(self, polygons, view_mat):
+        """Interface de sort_func: retorna os polígonos na ordem de desenho"""
+        return take_polygons(polygons, self.order(polygons, view_mat))
@@ -0,0 +1,87 @@
+# pipeline.py
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from painter_algorithm import sort_polygons
+from polygon_batch import same_polygons
+
+# ------------------------------------------------------
+# Ordenação assíncrona (double buffering da ordem de desenho)
+# ------------------------------------------------------
+# Com render_scene_painter o callback display() ordena e depois desenha, tudo na
+# thread do GLUT; enquanto isso o teclado fica sem resposta. O AsyncSorter move a
+# ordenação para uma thread de trabalho: no frame N ele entrega a ordem já pronta
+# (calculada para o frame N-1) e dispara a ordenação do frame N, que roda enquanto
+# o frame atual é desenhado. O cálculo é NumPy (argsort, produtos de matrizes) e
+# as chamadas OpenGL passam por ctypes, que liberam o GIL, então as duas etapas
+# realmente se sobrepõem. São dois "buffers" de ordem: o que está sendo desenhado
+# e o que está sendo calculado.
+
+class AsyncSorter:
+    """
+    sort_func que ordena em uma thread separada, com no máximo 'max_latency' frames de atraso
+    Uso: render_scene_painter(..., sort_func=AsyncSorter(sort_polygons))
+
+    sort_func: ordenador usado na thread (qualquer sort_func(polygons, view_mat) sem OpenGL)
+    max_latency: 1 -> desenha a ordem do frame anterior enquanto a atual é calculada
+                 0 -> espera a ordenação do próprio frame (comportamento síncrono)
+    Com atraso de 1 frame a ordem desenhada corresponde à câmera do frame anterior;
+    em movimentos rápidos alguns polígonos podem sair da ordem por um frame.
+    Se polígonos e câmera não mudaram desde o último pedido, nada é reordenado.
+
+    stats: estatísticas do ordenador interno (se houver) e ainda
+           {"wait_ms": espera pelo resultado, "latency": frames de atraso, "resorted": bool}
+    """
+
+    def __init__(self, sort_func=sort_polygons, max_latency=1):
+        if max_latency not in (0, 1):
+            raise ValueError("max_latency deve ser 0 ou 1")
+        self.sort_func = sort_func
+        self.max_latency = max_latency
+        self.stats = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="painter-sort")
+        self._pending = None     # Ordenação em andamento (Future)
+        self._ready = None       # Última ordem pronta (polígonos ordenados)
+        self._request = None     # (polygons, view_mat) do último pedido
+
+    def _same_request(self, polygons, view_mat):
+        """
+        Mesma câmera e mesmos polígonos do último pedido; com culling cada frame recebe um
+        lote novo, então os polígonos são comparados pelo conteúdo (same_polygons)
+        """
+        return self._request is not None and np.array_equal(view_mat, self._request[1]) \
+            and same_polygons(polygons, self._request[0])
+
+    def _collect(self):
+        """Espera a ordenação em andamento (se houver) e guarda o resultado"""
+        if self._pending is not None:
+            self._ready = self._pending.result()
+            self._pending = None
+
+    def __call__(self, polygons, view_mat):
+        """Interface de sort_func: retorna os polígonos na ordem de desenho (até 1 frame atrasada)"""
+        start = time.perf_counter()
+        # Limita o atraso: o resultado do frame anterior precisa estar pronto antes de desenhar
+        self._collect()
+        resorted = not self._same_request(polygons, view_mat)
+        if resorted:
+            self._request = (polygons, np.array(view_mat, dtype=float))
+            self._pending = self._executor.submit(self.sort_func, polygons, self._request[1])
+            if self.max_latency == 0 or self._ready is None:
+                self._collect()  # Síncrono, ou primeiro frame (ainda não há ordem para desenhar)
+        latency = 0 if self._pending is None else 1
+
+        self.stats = dict(getattr(self.sort_func, "stats", None) or {})
+        self.stats.update(wait_ms=(time.perf_counter() - start) * 1000.0, latency=latency, resorted=resorted)
+        return self._ready
+
+    def close(self):
+        """Espera a ordenação em andamento e encerra a thread"""
+        self._executor.shutdown(wait=True)
+        self._pending = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,226 @@
+# polygon_batch.py
+import numpy as np
+
+# ------------------------------------------------------
+# Armazenamento colunar de polígonos
+# ------------------------------------------------------
+
+class PolygonBatch:
+    """
+    Conjunto de N triângulos guardado em arrays contíguos (formato colunar)
+    vertices: array (N, 3, 3) float32 - 3 vértices (x, y, z) por triângulo
+    colors: array (N, 3) float32 - cor RGB de cada triângulo
+    normals: array (N, 3) float32 opcional - normal de cada triângulo
+    object_ids: array (N,) int32 opcional - objeto (cubo, esfera, ...) a que o triângulo pertence
+
+    Substitui a lista de dicionários {"vertices": [...], "color": (...)}.
+    Para código antigo, iterar ou indexar um único elemento devolve o
+    dicionário equivalente (visão de compatibilidade).
+    """
+
+    def __init__(self, vertices, colors, normals=None, object_ids=None):
+        self.vertices = np.ascontiguousarray(vertices, dtype=np.float32).reshape(-1, 3, 3)
+        n = len(self.vertices)
+
+        # Uma única cor pode ser informada para todos os triângulos
+        colors = np.asarray(colors, dtype=np.float32)
+        if colors.ndim == 1:
+            colors = np.broadcast_to(colors, (n, 3))
+        self.colors = np.ascontiguousarray(colors, dtype=np.float32).reshape(-1, 3)
+
+        if normals is not None:
+            normals = np.ascontiguousarray(normals, dtype=np.float32).reshape(-1, 3)
+        self.normals = normals
+
+        if object_ids is not None:
+            object_ids = np.ascontiguousarray(object_ids, dtype=np.int32).reshape(-1)
+        self.object_ids = object_ids
+
+        if len(self.colors) != n or (normals is not None and len(normals) != n) \
+                or (object_ids is not None and len(object_ids) != n):
+            raise ValueError("vertices, colors, normals e object_ids precisam ter o mesmo número de polígonos")
+
+    # --------------------------------------------------
+    # Construção
+    # --------------------------------------------------
+
+    @classmethod
+    def empty(cls):
+        """Cria um lote sem polígonos"""
+        return cls(np.empty((0, 3, 3)), np.empty((0, 3)))
+
+    @classmethod
+    def from_polygons(cls, polygons):
+        """
+        Converte uma lista de dicionários no formato antigo para um PolygonBatch
+        Polígonos com mais de 3 vértices são divididos em leque (fan) de triângulos
+        """
+        if isinstance(polygons, cls):
+            return polygons
+
+        tris, colors, normals = [], [], []
+        has_normals = True
+        for p in polygons:
+            verts = p["vertices"]
+            color = p.get("color", (1, 1, 1))
+            normal = p.get("normal")
+            has_normals = has_normals and normal is not None
+            # Triangulação em leque: (v0, v1, v2), (v0, v2, v3), ...
+            for k in range(1, len(verts) - 1):
+                tris.append((verts[0], verts[k], verts[k + 1]))
+                colors.append(color)
+                normals.append(normal)
+
+        if not tris:
+            return cls.empty()
+        return cls(np.array(tris, dtype=np.float32), np.array(colors, dtype=np.float32),
+                   np.array(normals, dtype=np.float32) if has_normals else None)
+
+    @classmethod
+    def concatenate(cls, batches):
+        """Junta vários lotes (ou listas de dicionários) em um único PolygonBatch"""
+        batches = [as_batch(b) for b in batches]
+        batches = [b for b in batches if len(b)]
+        if not batches:
+            return cls.empty()
+        if len(batches) == 1:
+            return batches[0]
+
+        # As normais e os objetos só são mantidos se todos os lotes os tiverem
+        normals = None
+        if all(b.normals is not None for b in batches):
+            normals = np.concatenate([b.normals for b in batches])
+        object_ids = None
+        if all(b.object_ids is not None for b in batches):
+            # Desloca os ids de cada lote para que objetos de lotes diferentes não se misturem
+            ids, offset = [], 0
+            for b in batches:
+                ids.append(b.object_ids + offset)
+                offset += int(b.object_ids.max()) + 1
+            object_ids = np.concatenate(ids)
+        return cls(np.concatenate([b.vertices for b in batches]),
+                   np.concatenate([b.colors for b in batches]),
+                   normals, object_ids)
+
+    # --------------------------------------------------
+    # Acesso
+    # --------------------------------------------------
+
+    def take(self, indices):
+        """Retorna um novo lote com os polígonos nas posições 'indices' (na ordem dada)"""
+        indices = np.asarray(indices, dtype=np.intp)
+        normals = self.normals[indices] if self.normals is not None else None
+        object_ids = self.object_ids[indices] if self.object_ids is not None else None
+        return PolygonBatch(self.vertices[indices], self.colors[indices], normals, object_ids)
+
+    def single_object(self):
+        """Retorna o mesmo lote marcado como um único objeto (object_ids = 0)"""
+        return PolygonBatch(self.vertices, self.colors, self.normals, np.zeros(len(self), dtype=np.int32))
+
+    @property
+    def num_objects(self):
+        """Número de objetos distintos (0 se o lote não tem object_ids)"""
+        if self.object_ids is None or len(self) == 0:
+            return 0
+        return len(np.unique(self.object_ids))
+
+    def polygon(self, i):
+        """Visão de compatibilidade: o polígono i como dicionário do formato antigo"""
+        p = {"vertices": list(self.vertices[i]), "color": tuple(self.colors[i].tolist())}
+        if self.normals is not None:
+            p["normal"] = self.normals[i]
+        return p
+
+    def to_dicts(self):
+        """Converte o lote inteiro para a lista de dicionários do formato antigo"""
+        return [self.polygon(i) for i in range(len(self))]
+
+    @property
+    def nbytes(self):
+        """Memória ocupada pelos arrays do lote (em bytes)"""
+        total = self.vertices.nbytes + self.colors.nbytes
+        if self.normals is not None:
+            total += self.normals.nbytes
+        if self.object_ids is not None:
+            total += self.object_ids.nbytes
+        return total
+
+    def __len__(self):
+        return len(self.vertices)
+
+    def __getitem__(self, key):
+        # Índice inteiro -> dicionário; fatia ou array de índices -> novo lote
+        if isinstance(key, (int, np.integer)):
+            if key < 0:
+                key += len(self)
+            if not 0 <= key < len(self):
+                raise IndexError("índice de polígono fora do intervalo")
+            return self.polygon(key)
+        if isinstance(key, slice):
+            return self.take(np.arange(len(self))[key])
+        return self.take(key)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.polygon(i)
+
+    def __add__(self, other):
+        return PolygonBatch.concatenate([self, other])
+
+    def __radd__(self, other):
+        return PolygonBatch.concatenate([other, self])
+
+    def __repr__(self):
+        return "PolygonBatch(%d polígonos, %.1f KiB)" % (len(self), self.nbytes / 1024.0)
+
+
+def as_batch(polygons):
+    """Garante um PolygonBatch, convertendo listas de dicionários (ou IndexedMesh) quando necessário"""
+    if isinstance(polygons, PolygonBatch):
+        return polygons
+    if hasattr(polygons, "to_batch"):
+        return polygons.to_batch()
+    return PolygonBatch.from_polygons(polygons)
+
+def same_polygons(a, b):
+    """
+    True se a e b têm os mesmos polígonos: o mesmo objeto, ou vértices, cores, normais e
+    object_ids iguais. Serve de chave para caches de quem recebe um lote novo a cada frame
+    com o mesmo conteúdo (ex.: os visíveis depois do culling, com a câmera parada)
+    """
+    if a is b:
+        return True
+    if a is None or b is None:
+        return False
+    a, b = as_batch(a), as_batch(b)
+    if len(a) != len(b):
+        return False
+    for x, y in ((a.vertices, b.vertices), (a.colors, b.colors),
+                 (a.normals, b.normals), (a.object_ids, b.object_ids)):
+        if (x is None) != (y is None) or (x is not None and not np.array_equal(x, y)):
+            return False
+    return True
+
+def compute_normals(polygons):
+    """
+    Calcula (uma vez, vetorizado) a normal unitária de cada triângulo e retorna
+    um novo PolygonBatch com a coluna normals preenchida
+    Com object_ids, cada normal é orientada para fora do seu objeto (do centro do
+    objeto para a face), independente da ordem dos vértices; sem object_ids vale
+    a regra da mão direita (v0, v1, v2). Triângulos degenerados recebem normal nula.
+    """
+    batch = as_batch(polygons)
+    v = batch.vertices.astype(float)
+    n = np.cross(v[:, 1] - v[:, 0], v[:, 2] - v[:, 0])
+    length = np.linalg.norm(n, axis=1)
+    n[length > 0] /= length[length > 0, None]
+
+    if batch.object_ids is not None and len(batch):
+        # Centro de cada objeto: média dos centroides de seus triângulos
+        _, inverse, counts = np.unique(batch.object_ids, return_inverse=True, return_counts=True)
+        centroids = v.mean(axis=1)
+        centers = np.stack([np.bincount(inverse, weights=centroids[:, k]) for k in range(3)], axis=1)
+        centers /= counts[:, None]
+        inward = np.einsum("ij,ij->i", n, centroids - centers[inverse]) < 0
+        n[inward] = -n[inward]
+    return PolygonBatch(batch.vertices, batch.colors, n, batch.object_ids)
@@ -0,0 +1,166 @@
+# polygon_stream.py
+import argparse
+import os
+import struct
+import numpy as np
+from polygon_batch import PolygonBatch, as_batch
+from painter_algorithm import polygon_depths, cull_frustum, cull_backfaces
+
+# ------------------------------------------------------
+# Cenas em disco maiores que a memória (leitura em blocos)
+# ------------------------------------------------------
+# Formato binário (little-endian):
+#   cabeçalho de 64 bytes: magic "PSTR" (4s), versão (I), n_polygons (Q), floats por registro (I)
+#   seguido de n_polygons registros de 12 float32 (48 bytes): 9 coordenadas dos 3 vértices e a cor RGB.
+# O arquivo é aberto com mmap e percorrido em blocos de chunk_size polígonos: cada bloco é
+# descartado (frustum/faces de costas) e recebe suas chaves de profundidade de forma
+# independente, e só os seus polígonos visíveis, já ordenados, ficam na memória. No fim as
+# sequências ordenadas dos blocos são intercaladas na ordem final. O pico de memória
+# acompanha o conjunto visível (mais um bloco), não o tamanho do arquivo.
+
+MAGIC = b"PSTR"
+VERSION = 1
+HEADER = struct.Struct("<4sIQI")
+HEADER_SIZE = 64
+RECORD_FLOATS = 12            # 3 vértices x (x, y, z) + cor (r, g, b)
+CHUNK_SIZE = 1 << 18          # Polígonos por bloco (12 MB de registros)
+
+def _records(batch):
+    """Registros (N, 12) float32 de um PolygonBatch"""
+    records = np.empty((len(batch), RECORD_FLOATS), dtype="<f4")
+    records[:, 0:9] = batch.vertices.reshape(-1, 9)
+    records[:, 9:12] = batch.colors
+    return records
+
+def _batch(records):
+    """PolygonBatch a partir de registros (N, 12)"""
+    return PolygonBatch(records[:, 0:9], records[:, 9:12])
+
+def write_polygon_stream(path, source):
+    """
+    Grava polígonos no formato de polygon_stream, de forma atômica (arquivo temporário + rename)
+    source: um PolygonBatch (ou lista de polígonos), ou um iterável de lotes, gravados um
+            de cada vez (cenas maiores que a memória podem ser geradas em partes)
+    Normais e object_ids não são guardados. Retorna o número de polígonos gravados
+    """
+    if isinstance(source, PolygonBatch) or hasattr(source, "to_batch") \
+            or (isinstance(source, list) and source and isinstance(source[0], dict)):
+        source = [source]
+    total = 0
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(b"\0" * HEADER_SIZE)  # O número de polígonos só é conhecido no fim
+        for part in source:
+            batch = as_batch(part)
+            f.write(_records(batch).tobytes())
+            total += len(batch)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, total, RECORD_FLOATS))
+    os.replace(tmp, path)
+    return total
+
+class PolygonStream:
+    """
+    Polígonos de um arquivo de write_polygon_stream, lidos sob demanda (mmap)
+    Pode ser passado no lugar dos polígonos para painter_algorithm/render_scene_painter:
+    a cada frame, ordered_visible percorre o arquivo em blocos e entrega só o conjunto
+    visível, já na ordem de desenho
+
+    chunk_size: polígonos lidos por bloco
+    stats: {"polygons", "chunks", "visible", "peak_chunk"} do último ordered_visible
+    """
+
+    def __init__(self, path, chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.stats = {}
+        data = np.memmap(path, dtype=np.uint8, mode="r")
+        magic, version, n_polygons, record_floats = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION or record_floats != RECORD_FLOATS:
+            raise ValueError("arquivo de polígonos inválido ou de outra versão: %s" % path)
+        if len(data) != HEADER_SIZE + n_polygons * RECORD_FLOATS * 4:
+            raise ValueError("arquivo de polígonos truncado ou corrompido: %s" % path)
+        self.records = np.frombuffer(data, dtype="<f4", count=n_polygons * RECORD_FLOATS,
+                                     offset=HEADER_SIZE).reshape(-1, RECORD_FLOATS)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __repr__(self):
+        return "PolygonStream(%r, %d polígonos)" % (self.path, len(self))
+
+    # --------------------------------------------------
+    # Acesso
+    # --------------------------------------------------
+
+    def chunks(self):
+        """Itera sobre (início, PolygonBatch) de cada bloco do arquivo"""
+        for start in range(0, len(self), self.chunk_size):
+            yield start, _batch(self.records[start:start + self.chunk_size])
+
+    def take(self, indices):
+        """PolygonBatch com os polígonos nas posições 'indices' (lê só essas linhas do arquivo)"""
+        return _batch(self.records[np.asarray(indices, dtype=np.intp)])
+
+    def to_batch(self):
+        """Arquivo inteiro em memória (só para cenas que cabem na RAM)"""
+        return _batch(self.records)
+
+    # --------------------------------------------------
+    # Conjunto visível ordenado
+    # --------------------------------------------------
+
+    def ordered_visible(self, model_view, view_mat, projection=None, cull_func=cull_frustum,
+                        backface_culling=False):
+        """
+        Polígonos visíveis do mais distante para o mais próximo, como painter_algorithm faria
+        com a cena inteira: descarte com model_view (cull_func/cull_backfaces) e profundidade
+        média com view_mat. Empates mantêm a ordem do arquivo (mesma ordem de sort_polygons)
+        cull_func: precisa funcionar em um bloco qualquer (ex.: cull_frustum; não uma BVH da cena)
+        """
+        runs, run_keys, chunks, peak = [], [], 0, 0
+        for _, chunk in self.chunks():
+            chunks += 1
+            if projection is not None:
+                chunk = chunk.take(cull_func(chunk, model_view, projection))
+            if backface_culling:
+                chunk = chunk.take(cull_backfaces(chunk, model_view))
+            # Chaves e ordem locais: cada bloco vira uma sequência já ordenada
+            keys = polygon_depths(chunk, view_mat)
+            local = np.argsort(keys, kind="stable")
+            runs.append(chunk.take(local))
+            run_keys.append(keys[local])
+            peak = max(peak, len(chunk))
+
+        visible = PolygonBatch.concatenate(runs)
+        if len(runs) > 1:
+            # Intercalação: o sort estável do NumPy (timsort) aproveita as sequências já ordenadas,
+            # e blocos anteriores ficam antes nos empates (ordem do arquivo)
+            visible = visible.take(np.argsort(np.concatenate(run_keys), kind="stable"))
+        self.stats = {"polygons": len(self), "chunks": chunks, "visible": len(visible), "peak_chunk": peak}
+        return visible
+
+# ------------------------------------------------------
+# Conversão da saída dos geradores
+# ------------------------------------------------------
+
+def random_polygon_parts(num, part_size=CHUNK_SIZE, seed=0):
+    """
+    Gera ~'num' triângulos de create_random_polygons em partes de até part_size
+    (para gravar com write_polygon_stream cenas maiores que a memória)
+    """
+    from polygons import create_random_polygons
+    rng = np.random.default_rng(seed)
+    for start in range(0, num, part_size):
+        yield create_random_polygons(num=max(1, min(part_size, num - start) // 2), rng=rng)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grava uma cena aleatória no formato de polygon_stream")
+    parser.add_argument("path", help="arquivo de saída")
+    parser.add_argument("--polygons", type=int, default=10000000, help="número aproximado de triângulos")
+    parser.add_argument("--part", type=int, default=CHUNK_SIZE, help="triângulos gerados por vez")
+    parser.add_argument("--seed", type=int, default=0, help="semente da cena aleatória")
+    args = parser.parse_args()
+
+    n = write_polygon_stream(args.path, random_polygon_parts(args.polygons, args.part, args.seed))
+    print("%d polígonos gravados em %s" % (n, args.path))
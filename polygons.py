@@ -5,123 +5,187 @@ from OpenGL.GLU import *
 import numpy as np
 import math
 import sys
+from polygon_batch import PolygonBatch, compute_normals
+from indexed_mesh import weld
+from lod import LODScene, LOD_FACTORS, circle_error
+
+# ------------------------------------------------------
+# Modelos unitários (vetorizados) das figuras
+# ------------------------------------------------------
+# Cada figura é gerada uma única vez em tamanho unitário, centrada na origem,
+# como um array (K, 3, 3) de triângulos; as instâncias são obtidas escalando e
+# transladando o modelo com operações de array (_place), sem laços por vértice.
+
+# Cubo: 8 cantos e 12 triângulos (2 por face)
+CUBE_CORNERS = np.array([
+    (-0.5, -0.5, -0.5), (0.5, -0.5, -0.5), (0.5, 0.5, -0.5), (-0.5, 0.5, -0.5),  # Face traseira
+    (-0.5, -0.5, 0.5), (0.5, -0.5, 0.5), (0.5, 0.5, 0.5), (-0.5, 0.5, 0.5),      # Face frontal
+])
+CUBE_TRIS = np.array([
+    (0, 1, 2), (0, 2, 3),  # Face traseira
+    (4, 5, 6), (4, 6, 7),  # Face frontal
+    (0, 1, 5), (0, 5, 4),  # Face inferior
+    (2, 3, 7), (2, 7, 6),  # Face superior
+    (1, 2, 6), (1, 6, 5),  # Face direita
+    (0, 3, 7), (0, 7, 4),  # Face esquerda
+])
+
+# Pirâmide: base quadrada em y = 0 e ápice em y = 1
+PYRAMID_POINTS = np.array([
+    (-0.5, 0.0, -0.5), (0.5, 0.0, -0.5), (0.5, 0.0, 0.5), (-0.5, 0.0, 0.5),  # Base
+    (0.0, 1.0, 0.0),                                                          # Ápice
+])
+PYRAMID_TRIS = np.array([
+    (0, 1, 2), (0, 2, 3),                        # Base (dois triângulos)
+    (0, 1, 4), (1, 2, 4), (2, 3, 4), (3, 0, 4),  # Faces laterais
+])
+
+def unit_cube():
+    """Cubo de lado 1 centrado na origem: array (12, 3, 3)"""
+    return CUBE_CORNERS[CUBE_TRIS]
+
+def unit_pyramid():
+    """Pirâmide de base 1x1 (em y = 0) e altura 1: array (6, 3, 3)"""
+    return PYRAMID_POINTS[PYRAMID_TRIS]
+
+def unit_sphere(slices=12, stacks=12):
+    """
+    Esfera UV de raio 1 centrada na origem: array (2 * slices * stacks, 3, 3)
+    Mesma ordem de triângulos do laço original (paralelo a paralelo, 2 por quadrilátero)
+    """
+    # Latitudes (linhas) e longitudes (colunas) de todos os quadriláteros de uma vez
+    i = np.arange(stacks)[:, None]
+    j = np.arange(slices)[None, :]
+    lat0 = np.pi * (-0.5 + i / stacks)
+    lat1 = np.pi * (-0.5 + (i + 1) / stacks)
+    lng0 = 2 * np.pi * j / slices
+    lng1 = 2 * np.pi * (j + 1) / slices
+
+    def ring_point(lat, lng):
+        x, y, z = np.broadcast_arrays(np.cos(lng) * np.cos(lat), np.sin(lng) * np.cos(lat), np.sin(lat))
+        return np.stack([x, y, z], axis=-1)  # (stacks, slices, 3)
+
+    # 4 vértices de cada quadrilátero esférico
+    v1, v2 = ring_point(lat0, lng0), ring_point(lat0, lng1)
+    v3, v4 = ring_point(lat1, lng1), ring_point(lat1, lng0)
+    tris = np.stack([np.stack([v1, v2, v3], axis=-2), np.stack([v1, v3, v4], axis=-2)], axis=2)
+    return tris.reshape(-1, 3, 3)
+
+def unit_cylinder(slices=12):
+    """
+    Cilindro de raio 1 e altura 1 (y de -0.5 a 0.5): array (4 * slices, 3, 3)
+    Primeiro as laterais (2 triângulos por segmento), depois as tampas (inferior e superior)
+    """
+    angle = 2 * np.pi * np.arange(slices + 1) / slices
+    ring = np.stack([np.cos(angle), np.zeros_like(angle), np.sin(angle)], axis=1)
+    bottom = ring + (0.0, -0.5, 0.0)  # bottom[i + 1] é o vértice seguinte (fecha o círculo)
+    top = ring + (0.0, 0.5, 0.0)
+    b0, b1, t0, t1 = bottom[:-1], bottom[1:], top[:-1], top[1:]
+
+    sides = np.stack([np.stack([b0, b1, t1], axis=1), np.stack([b0, t1, t0], axis=1)], axis=1)
+    bottom_center = np.broadcast_to((0.0, -0.5, 0.0), b0.shape)
+    top_center = np.broadcast_to((0.0, 0.5, 0.0), t0.shape)
+    caps = np.stack([np.stack([bottom_center, b0, b1], axis=1),   # Tampa inferior
+                     np.stack([top_center, t1, t0], axis=1)], axis=1)  # Tampa superior (ordem inversa)
+    return np.concatenate([sides.reshape(-1, 3, 3), caps.reshape(-1, 3, 3)])
+
+def _place(template, centers, scales):
+    """
+    Instancia um modelo unitário (K, 3, 3) em M posições com escala por eixo
+    centers, scales: arrays (M, 3). Retorna (M * K, 3, 3)
+    """
+    centers = np.asarray(centers, dtype=float).reshape(-1, 1, 1, 3)
+    scales = np.asarray(scales, dtype=float).reshape(-1, 1, 1, 3)
+    return (template[None] * scales + centers).reshape(-1, 3, 3)
+
+def _solid(tris, color, indexed=False):
+    """
+    Lote de uma figura fechada: um único objeto, com normais para fora
+    indexed: retorna uma IndexedMesh (vértices compartilhados) em vez de um PolygonBatch
+    """
+    batch = compute_normals(PolygonBatch(tris, color).single_object())
+    return weld(batch) if indexed else batch
+
+def _solid_lod(levels, color, indexed=False):
+    """
+    LODScene de uma figura fechada a partir de [(triângulos, erro geométrico)] do nível
+    mais fino ao mais grosso
+    """
+    if indexed:
+        raise ValueError("indexed e lod_levels não podem ser combinados")
+    return LODScene.from_levels([_solid(tris, color) for tris, _ in levels],
+                                [np.array([error]) for _, error in levels])
+
+def _rng(rng):
+    """Gerador de números aleatórios: o informado, ou um novo (não reprodutível) se None"""
+    return np.random.default_rng() if rng is None else rng
 
 # ------------------------------------------------------
 # Funções para criar cubo e esfera
 # ------------------------------------------------------
 
-def create_cube(center=(0,0,0), size=1.0, color=(1,0,0)):
+def create_cube(center=(0,0,0), size=1.0, color=(1,0,0), indexed=False):
     """
     Cria um cubo 3D composto por triângulos
     center: centro do cubo (x, y, z)
     size: tamanho do cubo
     color: cor RGB do cubo
-    Retorna lista de polígonos triangulares
+    indexed: se True, retorna uma IndexedMesh com os 8 vértices compartilhados
+    Retorna um PolygonBatch com os 12 triângulos do cubo (um único objeto, normais para fora)
     """
-    cx, cy, cz = center
-    s = size / 2.0  # Metade do tamanho (raio)
-    
-    # 8 vértices do cubo
-    vertices = [
-        (cx-s, cy-s, cz-s), (cx+s, cy-s, cz-s), (cx+s, cy+s, cz-s), (cx-s, cy+s, cz-s),  # Face traseira
-        (cx-s, cy-s, cz+s), (cx+s, cy-s, cz+s), (cx+s, cy+s, cz+s), (cx-s, cy+s, cz+s),  # Face frontal
-    ]
-    
-    # 6 faces do cubo (cada face tem 4 vértices)
-    faces = [
-        (0,1,2,3),  # Face traseira
-        (4,5,6,7),  # Face frontal
-        (0,1,5,4),  # Face inferior
-        (2,3,7,6),  # Face superior
-        (1,2,6,5),  # Face direita
-        (0,3,7,4),  # Face esquerda
-    ]
-    
-    polys = []
-    for f in faces:
-        # Converte índices em vértices reais
-        v = [np.array(vertices[i]) for i in f]
-        # Divide cada face quadrada em 2 triângulos
-        polys.append({"vertices":[v[0], v[1], v[2]], "color": color})
-        polys.append({"vertices":[v[0], v[2], v[3]], "color": color})
-    return polys
-
-def create_sphere(center=(0,0,0), radius=1.0, slices=12, stacks=12, color=(0,0,1)):
+    return _solid(_place(unit_cube(), [center], [(size, size, size)]), color, indexed)
+
+def sphere_error(radius, slices, stacks):
+    """Erro geométrico (maior flecha entre meridianos e paralelos) de uma esfera UV"""
+    return np.maximum(circle_error(radius, slices), circle_error(radius, stacks, np.pi))
+
+def create_sphere(center=(0,0,0), radius=1.0, slices=12, stacks=12, color=(0,0,1), indexed=False, lod_levels=1):
     """
     Cria uma esfera usando aproximação por triângulos (UV sphere)
     center: centro da esfera
     radius: raio da esfera
     slices: número de divisões longitudinais (meridianos)
     stacks: número de divisões latitudinais (paralelos)
+    indexed: se True, retorna uma IndexedMesh (cada vértice interno aparece uma vez, não 6)
+    lod_levels: se > 1, retorna uma LODScene (lod.py) com a resolução dividida por LOD_FACTORS
     """
-    cx, cy, cz = center
-    polys = []
-    
-    # Itera pelas fatias verticais (stacks)
-    for i in range(stacks):
-        # Calcula latitudes (ângulos verticais)
-        lat0 = math.pi * (-0.5 + float(i) / stacks)    # Latitude inferior
-        z0 = math.sin(lat0)    # Altura nesta latitude
-        zr0 = math.cos(lat0)   # Raio horizontal nesta latitude
-        
-        lat1 = math.pi * (-0.5 + float(i+1) / stacks)  # Latitude superior
-        z1 = math.sin(lat1)
-        zr1 = math.cos(lat1)
-        
-        # Itera pelas fatias horizontais (slices)
-        for j in range(slices):
-            # Calcula longitudes (ângulos horizontais)
-            lng0 = 2*math.pi * float(j) / slices      # Longitude esquerda
-            x0, y0 = math.cos(lng0), math.sin(lng0)   # Coordenadas no círculo
-            
-            lng1 = 2*math.pi * float(j+1) / slices    # Longitude direita
-            x1, y1 = math.cos(lng1), math.sin(lng1)
-            
-            # Calcula os 4 vértices do quadrilátero esférico
-            v1 = np.array([cx + radius*x0*zr0, cy + radius*y0*zr0, cz + radius*z0])
-            v2 = np.array([cx + radius*x1*zr0, cy + radius*y1*zr0, cz + radius*z0])
-            v3 = np.array([cx + radius*x1*zr1, cy + radius*y1*zr1, cz + radius*z1])
-            v4 = np.array([cx + radius*x0*zr1, cy + radius*y0*zr1, cz + radius*z1])
-            
-            # Divide o quadrilátero em 2 triângulos
-            polys.append({"vertices":[v1,v2,v3], "color": color})
-            polys.append({"vertices":[v1,v3,v4], "color": color})
-    return polys
-
-# Cria polígonos 3D e para mostrar que o algoritmo não se comporta bem com interseções
+    if lod_levels > 1:
+        levels = [(max(slices // f, 4), max(stacks // f, 3)) for f in LOD_FACTORS[:lod_levels]]
+        return _solid_lod([(_place(unit_sphere(sl, st), [center], [(radius, radius, radius)]),
+                            sphere_error(radius, sl, st)) for sl, st in levels], color, indexed)
+    return _solid(_place(unit_sphere(slices, stacks), [center], [(radius, radius, radius)]), color, indexed)
+
 def create_polygons_3D(): 
     """
     Cria uma cena 3D simples com cubos e esferas para testar o Painter's Algorithm
     Mostra os limites do algoritmo com objetos 3D que se intersectam
     """
-    polygons = []
     # Adiciona objetos em diferentes posições e tamanhos
-    polygons += create_cube(center=(-2,0,-3), size=1.0, color=(1,0,0))    # Cubo vermelho
-    polygons += create_cube(center=(2,0,-5), size=1.5, color=(0,1,0))     # Cubo verde
-    polygons += create_sphere(center=(0,1,-4), radius=1.0, color=(0,0,1)) # Esfera azul
-    polygons += create_sphere(center=(0,-1,-6), radius=0.7, color=(1,1,0))# Esfera amarela
-    return polygons
+    return PolygonBatch.concatenate([
+        create_cube(center=(-2,0,-3), size=1.0, color=(1,0,0)),    # Cubo vermelho
+        create_cube(center=(2,0,-5), size=1.5, color=(0,1,0)),     # Cubo verde
+        create_sphere(center=(0,1,-4), radius=1.0, color=(0,0,1)), # Esfera azul
+        create_sphere(center=(0,-1,-6), radius=0.7, color=(1,1,0)),# Esfera amarela
+    ])
 
 def create_polygons_3D_oclusion():
     """
     Cria uma cena 3D com objetos intencionalmente sobrepostos
     para demonstrar as limitações do Painter's Algorithm com oclusão complexa
     """
-    polygons = []
-
-    # 🔴 Cubo maior no fundo (vermelho)
-    polygons += create_cube(center=(0, 0, -6), size=3.0, color=(1, 0, 0))
+    return PolygonBatch.concatenate([
+        # 🔴 Cubo maior no fundo (vermelho)
+        create_cube(center=(0, 0, -6), size=3.0, color=(1, 0, 0)),
 
-    # 🟢 Cubo médio parcialmente dentro do cubo maior (verde)
-    polygons += create_cube(center=(0.5, 0.5, -5.5), size=2.0, color=(0, 1, 0))
+        # 🟢 Cubo médio parcialmente dentro do cubo maior (verde)
+        create_cube(center=(0.5, 0.5, -5.5), size=2.0, color=(0, 1, 0)),
 
-    # 🔵 Esfera atravessando os dois cubos (azul)
-    polygons += create_sphere(center=(-0.5, 0, -5.8), radius=1.5, color=(0, 0, 1))
+        # 🔵 Esfera atravessando os dois cubos (azul)
+        create_sphere(center=(-0.5, 0, -5.8), radius=1.5, color=(0, 0, 1)),
 
-    # 🟡 Esfera menor parcialmente dentro da verde (amarela)
-    polygons += create_sphere(center=(1.0, -0.5, -5.2), radius=1.0, color=(1, 1, 0))
-
-    return polygons
+        # 🟡 Esfera menor parcialmente dentro da verde (amarela)
+        create_sphere(center=(1.0, -0.5, -5.2), radius=1.0, color=(1, 1, 0)),
+    ])
 
 # Cria polígonos 2D no espaço 3D (cena plana)
 def create_polygons_2D():
@@ -180,7 +244,7 @@ def create_polygons_2D():
         
         polygons.append({"vertices":[v1,v2,v3], "color": (1.0, 1.0, 0.0)})
 
-    return polygons
+    return PolygonBatch.from_polygons(polygons)
 
 def create_polygons_2D_scene():
     """
@@ -220,176 +284,140 @@ def create_polygons_2D_scene():
         polygons.append({"vertices": [v[0], v[1], v[2]], "color": color})
         polygons.append({"vertices": [v[0], v[2], v[3]], "color": color})
 
-    return polygons
+    return PolygonBatch.from_polygons(polygons)
 
-def create_random_polygons(num=1000, spread=10.0, z_near=-1.0, z_far=-20.0):
+def create_random_polygons(num=1000, spread=10.0, z_near=-1.0, z_far=-20.0, rng=None):
     """
     Gera 'num' polígonos aleatórios no espaço 3D para teste de performance
     e estresse do Painter's Algorithm.
     
     Args:
-        num (int): quantidade de polígonos
+        num (int): quantidade de polígonos (quadriláteros, 2 triângulos cada)
         spread (float): intervalo de variação em x e y
         z_near (float): profundidade mínima (mais próxima)
         z_far (float): profundidade máxima (mais distante)
+        rng (np.random.Generator): gerador aleatório; use np.random.default_rng(seed)
+            para cenas reproduzíveis (None: novo gerador a cada chamada)
     """
-    polygons = []
-    for _ in range(num):
-        # Centro aleatório do polígono
-        cx = np.random.uniform(-spread, spread)
-        cy = np.random.uniform(-spread, spread)
-        cz = np.random.uniform(z_far, z_near)  # z_far < z_near (coordenadas negativas)
-
-        # Tamanho aleatório
-        size = np.random.uniform(0.1, 1.0)
-
-        # Cor aleatória
-        color = (np.random.rand(), np.random.rand(), np.random.rand())
-
-        # Criar um quadrilátero plano em torno do centro
-        dx = size * np.random.uniform(0.5, 1.0)  # Largura
-        dy = size * np.random.uniform(0.5, 1.0)  # Altura
-
-        # 4 vértices do quadrilátero
-        v1 = np.array([cx - dx, cy - dy, cz])
-        v2 = np.array([cx + dx, cy - dy, cz])
-        v3 = np.array([cx + dx, cy + dy, cz])
-        v4 = np.array([cx - dx, cy + dy, cz])
-
-        # Divide em dois triângulos
-        polygons.append({"vertices": [v1, v2, v3], "color": color})
-        polygons.append({"vertices": [v1, v3, v4], "color": color})
-
-    return polygons
-
-def create_random_3d_shapes(num_shapes=10, spread=15.0, z_near=-5.0, z_far=-30.0):
+    rng = _rng(rng)
+
+    # Todos os sorteios de uma vez: centro, tamanho, cor, largura e altura de cada quadrilátero
+    centers = rng.uniform((-spread, -spread, z_far), (spread, spread, z_near), size=(num, 3))
+    size = rng.uniform(0.1, 1.0, num)
+    colors = rng.random((num, 3))
+    dx = size * rng.uniform(0.5, 1.0, num)  # Largura
+    dy = size * rng.uniform(0.5, 1.0, num)  # Altura
+
+    # 4 vértices do quadrilátero: (-dx,-dy), (+dx,-dy), (+dx,+dy), (-dx,+dy) em torno do centro
+    sx = np.array([-1.0, 1.0, 1.0, -1.0])
+    sy = np.array([-1.0, -1.0, 1.0, 1.0])
+    quads = np.empty((num, 4, 3), dtype=np.float32)
+    quads[:, :, 0] = centers[:, 0:1] + sx * dx[:, None]
+    quads[:, :, 1] = centers[:, 1:2] + sy * dy[:, None]
+    quads[:, :, 2] = centers[:, 2:3]
+
+    # Divide em dois triângulos: (v1, v2, v3) e (v1, v3, v4)
+    tris = quads[:, [0, 1, 2, 0, 2, 3]].reshape(-1, 3, 3)
+    return PolygonBatch(tris, np.repeat(colors, 2, axis=0))
+
+SHAPE_TYPES = ('cube', 'sphere', 'pyramid', 'cylinder')
+SHAPE_PROBABILITIES = (0.4, 0.3, 0.2, 0.1)
+
+def create_random_3d_shapes(num_shapes=10, spread=15.0, z_near=-5.0, z_far=-30.0, rng=None, indexed=False,
+                            lod_levels=1):
     """
-    Gera 'num_shapes' figuras 3D aleatórias (cubos, esferas e pirâmides)
+    Gera 'num_shapes' figuras 3D aleatórias (cubos, esferas, pirâmides e cilindros)
     para testar o Painter's Algorithm com geometria 3D complexa.
+    Cada figura é um objeto (object_ids) e todas têm normais para fora.
     
     Args:
         num_shapes (int): quantidade de figuras 3D
         spread (float): intervalo de variação em x e y
         z_near (float): profundidade mínima
         z_far (float): profundidade máxima
+        rng (np.random.Generator): gerador aleatório (None: novo gerador a cada chamada)
+        indexed (bool): retorna uma IndexedMesh (vértices soldados dentro de cada figura)
+        lod_levels (int): se > 1, retorna uma LODScene (lod.py) com esferas e cilindros em
+            'lod_levels' resoluções (divididas por LOD_FACTORS); o nível 0 é a cena normal
     """
-    polygons = []
-    
-    for _ in range(num_shapes):
-        # Posição aleatória
-        x = np.random.uniform(-spread, spread)
-        y = np.random.uniform(-spread/2, spread/2)  # Menor variação em y para realismo
-        z = np.random.uniform(z_far, z_near)
-        
-        # Cor aleatória
-        color = (np.random.rand(), np.random.rand(), np.random.rand())
-        
-        # Escolhe aleatoriamente o tipo de figura
-        shape_type = np.random.choice(['cube', 'sphere', 'pyramid', 'cylinder'], 
-                                     p=[0.4, 0.3, 0.2, 0.1])  # Probabilidades
-        
-        if shape_type == 'cube':
-            size = np.random.uniform(0.3, 2.0)
-            polygons += create_cube(center=(x, y, z), size=size, color=color)
-            
-        elif shape_type == 'sphere':
-            radius = np.random.uniform(0.2, 1.5)
-            slices = np.random.randint(8, 16)   # Resolução variável
-            stacks = np.random.randint(8, 16)
-            polygons += create_sphere(center=(x, y, z), radius=radius, 
-                                    slices=slices, stacks=stacks, color=color)
-            
-        elif shape_type == 'pyramid':
-            base_size = np.random.uniform(0.4, 1.5)
-            height = np.random.uniform(0.5, 2.0)
-            pyramid_polys = create_pyramid(center=(x, y, z), base_size=base_size, 
-                                         height=height, color=color)
-            polygons += pyramid_polys
-            
-        elif shape_type == 'cylinder':
-            radius = np.random.uniform(0.3, 1.0)
-            height = np.random.uniform(0.5, 2.0)
-            cylinder_polys = create_cylinder(center=(x, y, z), radius=radius, 
-                                           height=height, slices=12, color=color)
-            polygons += cylinder_polys
-    
-    return polygons
-
-def create_pyramid(center=(0,0,0), base_size=1.0, height=1.0, color=(1,0,0)):
-    """Cria uma pirâmide (tetraedro) com base quadrada."""
-    cx, cy, cz = center
-    s = base_size / 2.0
-    
-    # Base da pirâmide (quadrado no plano Y fixo)
-    base_vertices = [
-        np.array([cx-s, cy, cz-s]),  # vértice traseiro esquerdo
-        np.array([cx+s, cy, cz-s]),  # vértice traseiro direito
-        np.array([cx+s, cy, cz+s]),  # vértice frontal direito
-        np.array([cx-s, cy, cz+s])   # vértice frontal esquerdo
-    ]
-    
-    # Topo da pirâmide (acima do centro)
-    apex = np.array([cx, cy+height, cz])
-    
-    polygons = []
-    
-    # Base (dois triângulos)
-    polygons.append({"vertices": [base_vertices[0], base_vertices[1], base_vertices[2]], "color": color})
-    polygons.append({"vertices": [base_vertices[0], base_vertices[2], base_vertices[3]], "color": color})
-    
-    # Faces laterais (triângulos conectando base ao ápice)
-    polygons.append({"vertices": [base_vertices[0], base_vertices[1], apex], "color": color})  # Face traseira
-    polygons.append({"vertices": [base_vertices[1], base_vertices[2], apex], "color": color})  # Face direita
-    polygons.append({"vertices": [base_vertices[2], base_vertices[3], apex], "color": color})  # Face frontal
-    polygons.append({"vertices": [base_vertices[3], base_vertices[0], apex], "color": color})  # Face esquerda
-    
-    return polygons
-
-def create_cylinder(center=(0,0,0), radius=1.0, height=1.0, slices=12, color=(0,1,0)):
-    """Cria um cilindro composto por triângulos."""
-    cx, cy, cz = center
-    half_height = height / 2.0
-    
-    polygons = []
-    bottom_vertices = []  # Vértices da base inferior
-    top_vertices = []     # Vértices da base superior
-    
-    # Gera vértices para as laterais
-    for i in range(slices):
-        angle = 2 * math.pi * i / slices
-        next_angle = 2 * math.pi * (i + 1) / slices
-        
-        # Calcula vértices na circunferência
-        x1 = radius * math.cos(angle)
-        z1 = radius * math.sin(angle)
-        x2 = radius * math.cos(next_angle)
-        z2 = radius * math.sin(next_angle)
-        
-        # Vértices da base inferior e superior
-        bottom_v1 = np.array([cx + x1, cy - half_height, cz + z1])
-        bottom_v2 = np.array([cx + x2, cy - half_height, cz + z2])
-        top_v1 = np.array([cx + x1, cy + half_height, cz + z1])
-        top_v2 = np.array([cx + x2, cy + half_height, cz + z2])
-        
-        bottom_vertices.append(bottom_v1)
-        top_vertices.append(top_v1)
-        
-        # Face lateral (dois triângulos por segmento)
-        polygons.append({"vertices": [bottom_v1, bottom_v2, top_v2], "color": color})
-        polygons.append({"vertices": [bottom_v1, top_v2, top_v1], "color": color})
-    
-    # Centros das tampas
-    bottom_center = np.array([cx, cy - half_height, cz])
-    top_center = np.array([cx, cy + half_height, cz])
-    
-    # Cria as tampas (base inferior e superior)
-    for i in range(slices):
-        next_i = (i + 1) % slices  # Índice do próximo vértice (cíclico)
-        
-        # Tampa inferior
-        polygons.append({"vertices": [bottom_center, bottom_vertices[i], bottom_vertices[next_i]], "color": color})
-        
-        # Tampa superior (ordem inversa para normal apontar para fora)
-        polygons.append({"vertices": [top_center, top_vertices[next_i], top_vertices[i]], "color": color})
-    
-    return polygons
\ No newline at end of file
+    rng = _rng(rng)
+    n = num_shapes
+    if indexed and lod_levels > 1:
+        raise ValueError("indexed e lod_levels não podem ser combinados")
+    if n == 0:
+        return weld(PolygonBatch.empty()) if indexed else PolygonBatch.empty()
+
+    # Posição (menor variação em y para realismo), cor e tipo de cada figura
+    centers = rng.uniform((-spread, -spread/2, z_far), (spread, spread/2, z_near), size=(n, 3))
+    colors = rng.random((n, 3))
+    kinds = rng.choice(len(SHAPE_TYPES), size=n, p=SHAPE_PROBABILITIES)
+
+    # Parâmetros sorteados para todas as figuras; cada tipo usa apenas os seus
+    cube_size = rng.uniform(0.3, 2.0, n)
+    sphere_radius = rng.uniform(0.2, 1.5, n)
+    sphere_slices = rng.integers(8, 16, n)   # Resolução variável
+    sphere_stacks = rng.integers(8, 16, n)
+    pyramid_base = rng.uniform(0.4, 1.5, n)
+    pyramid_height = rng.uniform(0.5, 2.0, n)
+    cylinder_radius = rng.uniform(0.3, 1.0, n)
+    cylinder_height = rng.uniform(0.5, 2.0, n)
+
+    def build(factor):
+        """Todas as figuras, com a resolução de esferas e cilindros dividida por 'factor'"""
+        slices = np.maximum(sphere_slices // factor, 4)
+        stacks = np.maximum(sphere_stacks // factor, 3)
+        cylinder_slices = max(12 // factor, 4)
+        error = np.zeros(n)  # Cubos e pirâmides são exatos em qualquer nível
+
+        # Grupos de figuras com o mesmo modelo unitário: (índices, modelo, escalas por eixo)
+        groups = []
+        idx = np.flatnonzero(kinds == 0)
+        groups.append((idx, unit_cube(), np.repeat(cube_size[idx, None], 3, axis=1)))
+        idx = np.flatnonzero(kinds == 2)
+        groups.append((idx, unit_pyramid(),
+                       np.column_stack([pyramid_base[idx], pyramid_height[idx], pyramid_base[idx]])))
+        idx = np.flatnonzero(kinds == 3)
+        groups.append((idx, unit_cylinder(cylinder_slices),
+                       np.column_stack([cylinder_radius[idx], cylinder_height[idx], cylinder_radius[idx]])))
+        error[idx] = circle_error(cylinder_radius[idx], cylinder_slices)
+        spheres = np.flatnonzero(kinds == 1)
+        error[spheres] = sphere_error(sphere_radius[spheres], slices[spheres], stacks[spheres])
+        resolution = slices[spheres] * 16 + stacks[spheres]
+        for res in np.unique(resolution):
+            idx = spheres[resolution == res]
+            groups.append((idx, unit_sphere(res // 16, res % 16), np.repeat(sphere_radius[idx, None], 3, axis=1)))
+
+        # Monta todos os triângulos na ordem das figuras (cada figura é um bloco contíguo)
+        counts = np.zeros(n, dtype=np.int64)
+        for idx, template, _ in groups:
+            counts[idx] = len(template)
+        offsets = np.cumsum(counts) - counts
+        tris = np.empty((counts.sum(), 3, 3), dtype=np.float32)
+        for idx, template, scales in groups:
+            dest = (offsets[idx, None] + np.arange(len(template))).ravel()
+            tris[dest] = _place(template, centers[idx], scales)
+
+        batch = PolygonBatch(tris, np.repeat(colors, counts, axis=0), object_ids=np.repeat(np.arange(n), counts))
+        return compute_normals(batch), error
+
+    if lod_levels > 1:
+        levels = [build(f) for f in LOD_FACTORS[:lod_levels]]
+        return LODScene.from_levels([batch for batch, _ in levels], [error for _, error in levels])
+    batch, _ = build(1)
+    return weld(batch) if indexed else batch
+
+def create_pyramid(center=(0,0,0), base_size=1.0, height=1.0, color=(1,0,0), indexed=False):
+    """Cria uma pirâmide com base quadrada (no y do centro) e ápice 'height' acima."""
+    return _solid(_place(unit_pyramid(), [center], [(base_size, height, base_size)]), color, indexed)
+
+def create_cylinder(center=(0,0,0), radius=1.0, height=1.0, slices=12, color=(0,1,0), indexed=False,
+                    lod_levels=1):
+    """
+    Cria um cilindro composto por triângulos (indexed: centros das tampas compartilhados).
+    lod_levels: se > 1, retorna uma LODScene (lod.py) com slices dividido por LOD_FACTORS
+    """
+    if lod_levels > 1:
+        levels = [max(slices // f, 4) for f in LOD_FACTORS[:lod_levels]]
+        return _solid_lod([(_place(unit_cylinder(sl), [center], [(radius, height, radius)]),
+                            circle_error(radius, sl)) for sl in levels], color, indexed)
+    return _solid(_place(unit_cylinder(slices), [center], [(radius, height, radius)]), color, indexed)
@@ -0,0 +1,168 @@
+# profiler.py
+import csv
+import json
+import time
+import numpy as np
+
+# ------------------------------------------------------
+# Instrumentação por frame do pipeline de renderização
+# ------------------------------------------------------
+
+class FrameProfiler:
+    """
+    Registra, para cada frame, o tempo de cada etapa do render_scene_painter
+    (look_at, sort, draw, swap, ...) e contadores (polígonos desenhados/descartados,
+    trabalho da ordenação) em um buffer circular com os últimos 'capacity' frames.
+
+    Uso: render_scene_painter(..., profiler=FrameProfiler())
+    Sem profiler (padrão None) nenhuma medição é feita.
+    """
+
+    def __init__(self, capacity=600, overlay=True):
+        """
+        capacity: quantos frames recentes são mantidos no buffer circular
+        overlay: desenha as estatísticas na tela (render_scene_painter chama draw_overlay)
+        """
+        self.capacity = capacity
+        self.overlay = overlay
+        self.frames = 0                          # Total de frames registrados
+        self.frame_ms = np.zeros(capacity)       # Duração total de cada frame
+        self.stage_ms = {}                       # Nome da etapa -> array (capacity,)
+        self.counters = {}                       # Nome do contador -> array (capacity,)
+        self._row = 0
+        self._frame_start = self._last = None
+
+    # --------------------------------------------------
+    # Registro
+    # --------------------------------------------------
+
+    def begin_frame(self):
+        """Inicia a medição de um novo frame (sobrescreve a posição mais antiga do buffer)"""
+        self._row = self.frames % self.capacity
+        for values in self.stage_ms.values():
+            values[self._row] = 0.0
+        for values in self.counters.values():
+            values[self._row] = 0
+        self._frame_start = self._last = time.perf_counter()
+
+    def mark(self, stage):
+        """Atribui à etapa 'stage' o tempo decorrido desde a marcação anterior"""
+        now = time.perf_counter()
+        if stage not in self.stage_ms:
+            self.stage_ms[stage] = np.zeros(self.capacity)
+        self.stage_ms[stage][self._row] += (now - self._last) * 1000.0
+        self._last = now
+
+    def count(self, name, value):
+        """Registra um contador do frame atual (ex.: 'drawn', 'culled', 'sort_swaps')"""
+        if name not in self.counters:
+            self.counters[name] = np.zeros(self.capacity, dtype=np.int64)
+        self.counters[name][self._row] = value
+
+    def end_frame(self):
+        """Finaliza o frame atual"""
+        self.frame_ms[self._row] = (time.perf_counter() - self._frame_start) * 1000.0
+        self.frames += 1
+
+    # --------------------------------------------------
+    # Estatísticas
+    # --------------------------------------------------
+
+    def _recent(self, values):
+        """Valores dos frames presentes no buffer, do mais antigo para o mais recente"""
+        n = min(self.frames, self.capacity)
+        if self.frames <= self.capacity:
+            return values[:n]
+        start = self.frames % self.capacity
+        return np.concatenate([values[start:], values[:start]])
+
+    def fps(self):
+        """FPS médio dos frames no buffer"""
+        recent = self._recent(self.frame_ms)
+        total = recent.sum()
+        return len(recent) * 1000.0 / total if total > 0 else 0.0
+
+    def stats(self):
+        """Resumo dos frames no buffer: FPS, tempo médio/p95/p99 e média por etapa e contador"""
+        recent = self._recent(self.frame_ms)
+        if len(recent) == 0:
+            return {"frames": 0}
+        return {
+            "frames": len(recent),
+            "fps": self.fps(),
+            "frame_ms_mean": float(recent.mean()),
+            "frame_ms_p95": float(np.percentile(recent, 95)),
+            "frame_ms_p99": float(np.percentile(recent, 99)),
+            "stages_ms_mean": {k: float(self._recent(v).mean()) for k, v in self.stage_ms.items()},
+            "counters_mean": {k: float(self._recent(v).mean()) for k, v in self.counters.items()},
+        }
+
+    # --------------------------------------------------
+    # Saída
+    # --------------------------------------------------
+
+    def to_csv(self, path):
+        """Grava um frame por linha: frame, frame_ms, <etapas>_ms, <contadores>"""
+        stages, counters = sorted(self.stage_ms), sorted(self.counters)
+        first = self.frames - min(self.frames, self.capacity)
+        columns = [self._recent(self.frame_ms)] + [self._recent(self.stage_ms[s]) for s in stages] \
+                  + [self._recent(self.counters[c]) for c in counters]
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "frame_ms"] + [s + "_ms" for s in stages] + counters)
+            for i, row in enumerate(zip(*columns)):
+                writer.writerow([first + i] + [v.item() for v in row])
+
+    def to_json(self, path):
+        """Grava o resumo (stats) e os tempos de frame brutos em JSON"""
+        data = self.stats()
+        data["frame_ms"] = self._recent(self.frame_ms).tolist()
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+    def overlay_text(self):
+        """Texto curto com as estatísticas, usado no overlay"""
+        s = self.stats()
+        if s["frames"] == 0:
+            return ""
+        stages = "  ".join("%s %.1f" % (k, v) for k, v in s["stages_ms_mean"].items())
+        last = (self.frames - 1) % self.capacity
+        counters = "  ".join("%s %d" % (k, v[last]) for k, v in self.counters.items())
+        return "%.1f FPS  p95 %.1f ms  p99 %.1f ms  |  %s  |  %s" % (
+            s["fps"], s["frame_ms_p95"], s["frame_ms_p99"], stages, counters)
+
+    def draw_overlay(self):
+        """Desenha overlay_text() no canto superior esquerdo da janela (OpenGL/GLUT)"""
+        from OpenGL.GL import (glGetIntegerv, glIsEnabled, glDisable, glEnable, glMatrixMode,
+                               glPushMatrix, glPopMatrix, glLoadIdentity, glColor3f, glRasterPos2f,
+                               GL_VIEWPORT, GL_LIGHTING, GL_DEPTH_TEST, GL_PROJECTION, GL_MODELVIEW)
+        from OpenGL.GLU import gluOrtho2D
+        from OpenGL.GLUT import glutBitmapCharacter, GLUT_BITMAP_HELVETICA_12
+
+        _, _, w, h = glGetIntegerv(GL_VIEWPORT)
+        lighting, depth = glIsEnabled(GL_LIGHTING), glIsEnabled(GL_DEPTH_TEST)
+        glDisable(GL_LIGHTING)
+        glDisable(GL_DEPTH_TEST)
+
+        # Projeção ortográfica em pixels para escrever o texto
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glLoadIdentity()
+        gluOrtho2D(0, w, 0, h)
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        glLoadIdentity()
+
+        glColor3f(0, 0, 0)
+        glRasterPos2f(10, h - 20)
+        for ch in self.overlay_text():
+            glutBitmapCharacter(GLUT_BITMAP_HELVETICA_12, ord(ch))
+
+        glPopMatrix()
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        if lighting:
+            glEnable(GL_LIGHTING)
+        if depth:
+            glEnable(GL_DEPTH_TEST)
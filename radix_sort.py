@@ -0,0 +1,66 @@
+# radix_sort.py
+import numpy as np
+
+# ------------------------------------------------------
+# Ordenação por radix (LSD) de profundidades quantizadas
+# ------------------------------------------------------
+# As profundidades ficam entre um mínimo e um máximo conhecidos, então podem ser
+# convertidas em inteiros sem sinal de 16 ou 32 bits. Inteiros são ordenados em
+# tempo linear com um radix sort LSD: uma passada estável por dígito, do menos
+# para o mais significativo. Cada passada usa argsort estável sobre um dígito de
+# 8 ou 16 bits, que o NumPy executa com counting/radix sort (O(n)).
+# Profundidades muito próximas podem cair no mesmo inteiro (empate): nesse caso
+# fica a ordem original, como em qualquer ordenação estável.
+
+def quantize_depths(depths, bits=32):
+    """
+    Converte profundidades (float) em chaves inteiras sem sinal de 'bits' bits (16 ou 32)
+    A faixa [mínimo, máximo] das profundidades é mapeada em [0, 2**bits - 1], preservando a ordem
+    """
+    if bits not in (16, 32):
+        raise ValueError("bits deve ser 16 ou 32")
+    depths = np.asarray(depths, dtype=float)
+    dtype = np.uint16 if bits == 16 else np.uint32
+    if len(depths) == 0:
+        return np.empty(0, dtype=dtype)
+    lo, hi = depths.min(), depths.max()
+    scale = (2.0 ** bits - 1) / (hi - lo) if hi > lo else 0.0
+    return ((depths - lo) * scale).astype(dtype)
+
+def radix_argsort(keys, digit_bits=16):
+    """
+    Índices que ordenam 'keys' (inteiros sem sinal) de forma estável, com radix sort LSD
+    digit_bits: tamanho do dígito (8 ou 16); chaves de 32 bits levam 32 / digit_bits passadas
+    """
+    if digit_bits not in (8, 16):
+        raise ValueError("digit_bits deve ser 8 ou 16")
+    keys = np.asarray(keys)
+    digit_type = np.uint8 if digit_bits == 8 else np.uint16
+    mask = (1 << digit_bits) - 1
+    order = np.arange(len(keys))
+    for shift in range(0, keys.dtype.itemsize * 8, digit_bits):
+        digit = ((keys[order] >> shift) & mask).astype(digit_type)
+        order = order[np.argsort(digit, kind="stable")]  # Passada estável por dígito
+    return order
+
+def quantization_ties(depths, keys, order):
+    """
+    Quantos pares vizinhos na ordem final têm a mesma chave inteira mas profundidades
+    diferentes, ou seja, empates criados pela quantização (e desfeitos pela ordem original)
+    """
+    k = keys[order]
+    d = np.asarray(depths)[order]
+    return int(((k[1:] == k[:-1]) & (d[1:] != d[:-1])).sum())
+
+def radix_depth_order(depths, bits=32, digit_bits=16, stats=None):
+    """
+    Ordem de desenho (mais distante primeiro) por radix sort das profundidades quantizadas
+    Equivalente a np.argsort(depths, kind="stable"), exceto em empates da quantização
+    stats: dicionário opcional que recebe {"passes", "ties"}
+    """
+    keys = quantize_depths(depths, bits)
+    order = radix_argsort(keys, digit_bits)
+    if stats is not None:
+        stats["passes"] = keys.dtype.itemsize * 8 // digit_bits
+        stats["ties"] = quantization_ties(depths, keys, order)
+    return order
@@ -0,0 +1,245 @@
+# scene_cache.py
+import hashlib
+import os
+import struct
+import numpy as np
+from polygon_batch import PolygonBatch, as_batch
+from indexed_mesh import IndexedMesh
+from bsp_tree import BSPTree, build_bsp
+from bvh import BVH, build_bvh
+from painter_algorithm import depth_order
+
+# ------------------------------------------------------
+# Cache em disco de estruturas pré-calculadas (BSP, BVH, ordens de profundidade e malhas importadas)
+# ------------------------------------------------------
+# Formato binário (little-endian), sem pickle:
+#   cabeçalho de 64 bytes: magic (4s), versão (I), n_polygons (Q), n_nodes (Q), flags (I)
+#   seguido dos arrays planos, na ordem em que aparecem em _bsp_layout/_bvh_layout/_order_layout/_mesh_layout
+#   (nas malhas, n_polygons é o número de faces e n_nodes o de vértices; na BVH, flags guarda leaf_size).
+# Os arrays são lidos com mmap, sem cópia: abrir o arquivo custa poucos milissegundos.
+
+CACHE_DIR = ".scene_cache"
+VERSION = 1
+HEADER = struct.Struct("<4sIQQI")
+HEADER_SIZE = 64
+FLAG_NORMALS = 1
+FLAG_OBJECTS = 2
+
+def scene_hash(polygons):
+    """
+    Hash (hex) do conteúdo da cena: tudo o que as estruturas do cache guardam ou usam
+    (vértices, cores, normais e ids de objeto; a ausência de um array também conta)
+    """
+    batch = as_batch(polygons)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(struct.pack("<Q", len(batch)))
+    for array in (batch.vertices, batch.colors, batch.normals, batch.object_ids):
+        if array is None:
+            h.update(b"-")
+            continue
+        h.update(array.dtype.str.encode())
+        h.update(np.ascontiguousarray(array).tobytes())
+    return h.hexdigest()
+
+def _bsp_layout(n_polygons, n_nodes, flags):
+    """Lista (nome, dtype, forma) dos arrays de uma BSP serializada"""
+    layout = [
+        ("planes", "<f8", (n_nodes, 4)),  # float64 primeiro: mantém o alinhamento de 8 bytes
+        ("vertices", "<f4", (n_polygons, 3, 3)),
+        ("colors", "<f4", (n_polygons, 3)),
+    ]
+    if flags & FLAG_NORMALS:
+        layout.append(("normals", "<f4", (n_polygons, 3)))
+    if flags & FLAG_OBJECTS:
+        layout.append(("object_ids", "<i4", (n_polygons,)))
+    layout += [
+        ("front", "<i4", (n_nodes,)),
+        ("back", "<i4", (n_nodes,)),
+        ("poly_start", "<i4", (n_nodes,)),
+        ("poly_count", "<i4", (n_nodes,)),
+    ]
+    return layout
+
+def _bvh_layout(n_polygons, n_nodes, flags):
+    """Lista (nome, dtype, forma) dos arrays de uma BVH serializada"""
+    return [
+        ("bounds_min", "<f8", (n_nodes, 3)),
+        ("bounds_max", "<f8", (n_nodes, 3)),
+        ("node_count", "<i8", (n_nodes,)),
+        ("index", "<i8", (n_polygons,)),
+    ]
+
+def _order_layout(n_polygons, n_nodes, flags):
+    return [("order", "<i4", (n_polygons,))]
+
+def _write(path, magic, n_polygons, n_nodes, flags, arrays, layout):
+    """Grava cabeçalho + arrays de forma atômica (arquivo temporário + rename)"""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(magic, VERSION, n_polygons, n_nodes, flags).ljust(HEADER_SIZE, b"\0"))
+        for name, dtype, shape in layout:
+            f.write(np.ascontiguousarray(arrays[name], dtype=dtype).reshape(shape).tobytes())
+    os.replace(tmp, path)
+
+def _read(path, magic, layout_func):
+    """Abre o arquivo com mmap e retorna (n_polygons, n_nodes, flags, arrays)"""
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    file_magic, version, n_polygons, n_nodes, flags = HEADER.unpack_from(data, 0)
+    if file_magic != magic or version != VERSION:
+        raise ValueError("arquivo de cache inválido ou de outra versão: %s" % path)
+
+    arrays, offset = {}, HEADER_SIZE
+    for name, dtype, shape in layout_func(n_polygons, n_nodes, flags):
+        count = int(np.prod(shape))
+        arrays[name] = np.frombuffer(data, dtype=dtype, count=count, offset=offset).reshape(shape)
+        offset += count * np.dtype(dtype).itemsize
+    if offset != len(data):
+        raise ValueError("arquivo de cache truncado ou corrompido: %s" % path)
+    return n_polygons, n_nodes, flags, arrays
+
+# ------------------------------------------------------
+# BSP
+# ------------------------------------------------------
+
+def save_bsp(tree, path):
+    """Serializa uma BSPTree em 'path' (arrays planos, sem pickle)"""
+    polys = tree.polygons
+    flags = (FLAG_NORMALS if polys.normals is not None else 0) | (FLAG_OBJECTS if polys.object_ids is not None else 0)
+    arrays = {
+        "planes": tree.planes, "vertices": polys.vertices, "colors": polys.colors,
+        "normals": polys.normals, "object_ids": polys.object_ids, "front": tree.front, "back": tree.back,
+        "poly_start": tree.poly_start, "poly_count": tree.poly_count,
+    }
+    _write(path, b"PBSP", len(polys), len(tree), flags, arrays,
+           _bsp_layout(len(polys), len(tree), flags))
+
+def load_bsp(path):
+    """Carrega (via mmap) uma BSPTree salva com save_bsp"""
+    _, _, _, a = _read(path, b"PBSP", _bsp_layout)
+    polygons = PolygonBatch(a["vertices"], a["colors"], a.get("normals"), a.get("object_ids"))
+    return BSPTree(polygons, a["planes"], a["front"], a["back"], a["poly_start"], a["poly_count"])
+
+def cached_bsp(polygons, cache_dir=CACHE_DIR, **build_kwargs):
+    """
+    Retorna a BSPTree da cena, lendo do cache se a mesma cena já foi processada
+    A chave é scene_hash (e os parâmetros de construção)
+    """
+    key = scene_hash(polygons)
+    if build_kwargs:
+        key += "-" + hashlib.blake2b(repr(sorted(build_kwargs.items())).encode(), digest_size=4).hexdigest()
+    path = os.path.join(cache_dir, key + ".bsp")
+    if os.path.exists(path):
+        return load_bsp(path)
+
+    tree = build_bsp(polygons, **build_kwargs)
+    os.makedirs(cache_dir, exist_ok=True)
+    save_bsp(tree, path)
+    return tree
+
+# ------------------------------------------------------
+# BVH
+# ------------------------------------------------------
+
+def save_bvh(bvh, path):
+    """Serializa uma BVH em 'path' (arrays planos; leaf_size vai no campo flags do cabeçalho)"""
+    arrays = {"bounds_min": bvh.bounds_min, "bounds_max": bvh.bounds_max,
+              "node_count": bvh.node_count, "index": bvh.index}
+    _write(path, b"PBVH", len(bvh.index), len(bvh), bvh.leaf_size, arrays,
+           _bvh_layout(len(bvh.index), len(bvh), bvh.leaf_size))
+
+def load_bvh(path):
+    """Carrega (via mmap) uma BVH salva com save_bvh"""
+    _, _, leaf_size, a = _read(path, b"PBVH", _bvh_layout)
+    return BVH(a["index"].astype(np.intp, copy=False), a["bounds_min"], a["bounds_max"],
+               a["node_count"], leaf_size)
+
+def cached_bvh(polygons, cache_dir=CACHE_DIR, leaf_size=64):
+    """
+    Retorna a BVH da cena (como build_bvh), lendo do cache se a mesma cena já foi processada
+    A chave é scene_hash e o leaf_size
+    """
+    path = os.path.join(cache_dir, "%s-%d.bvh" % (scene_hash(polygons), leaf_size))
+    if os.path.exists(path):
+        return load_bvh(path)
+
+    bvh = build_bvh(polygons, leaf_size=leaf_size)
+    os.makedirs(cache_dir, exist_ok=True)
+    save_bvh(bvh, path)
+    return bvh
+
+# ------------------------------------------------------
+# Ordens de profundidade
+# ------------------------------------------------------
+
+def save_order(order, path):
+    """Serializa uma ordem de desenho (índices dos polígonos)"""
+    _write(path, b"PORD", len(order), 0, 0, {"order": order}, _order_layout(len(order), 0, 0))
+
+def load_order(path):
+    """Carrega (via mmap) uma ordem salva com save_order"""
+    return _read(path, b"PORD", _order_layout)[3]["order"]
+
+def cached_depth_order(polygons, view_mat, cache_dir=CACHE_DIR):
+    """
+    Ordem de profundidade (como depth_order) guardada em disco por cena e câmera
+    Útil para cenas grandes vistas de uma câmera fixa
+    """
+    view_key = hashlib.blake2b(np.asarray(view_mat, dtype=float).tobytes(), digest_size=8).hexdigest()
+    path = os.path.join(cache_dir, "%s-%s.order" % (scene_hash(polygons), view_key))
+    if os.path.exists(path):
+        return load_order(path)
+
+    order = depth_order(polygons, view_mat)
+    os.makedirs(cache_dir, exist_ok=True)
+    save_order(order, path)
+    return order
+
+# ------------------------------------------------------
+# Malhas importadas (mesh_io)
+# ------------------------------------------------------
+
+def _mesh_layout(n_faces, n_vertices, flags):
+    """Lista (nome, dtype, forma) dos arrays de uma IndexedMesh serializada"""
+    layout = [
+        ("positions", "<f4", (n_vertices, 3)),
+        ("vertex_colors", "<f4", (n_vertices, 3)),
+        ("faces", "<i4", (n_faces, 3)),
+    ]
+    if flags & FLAG_NORMALS:
+        layout.append(("normals", "<f4", (n_faces, 3)))
+    if flags & FLAG_OBJECTS:
+        layout.append(("object_ids", "<i4", (n_faces,)))
+    return layout
+
+def save_mesh(mesh, path):
+    """Serializa uma IndexedMesh em 'path' (arrays planos, sem pickle)"""
+    flags = (FLAG_NORMALS if mesh.normals is not None else 0) | (FLAG_OBJECTS if mesh.object_ids is not None else 0)
+    arrays = {
+        "positions": mesh.positions, "vertex_colors": mesh.vertex_colors, "faces": mesh.faces,
+        "normals": mesh.normals, "object_ids": mesh.object_ids,
+    }
+    _write(path, b"PMSH", len(mesh), len(mesh.positions), flags, arrays,
+           _mesh_layout(len(mesh), len(mesh.positions), flags))
+
+def load_mesh(path):
+    """Carrega (via mmap) uma IndexedMesh salva com save_mesh"""
+    _, _, _, a = _read(path, b"PMSH", _mesh_layout)
+    return IndexedMesh(a["positions"], a["faces"], a["vertex_colors"], a.get("normals"), a.get("object_ids"))
+
+def cached_mesh(path, loader, cache_dir=CACHE_DIR, **load_kwargs):
+    """
+    Malha de um arquivo (OBJ, PLY, ...) lida com loader(path, **load_kwargs), que retorna uma
+    IndexedMesh; a primeira leitura é convertida para o formato binário do cache e as
+    seguintes só abrem esse arquivo com mmap
+    A chave é o caminho absoluto, o tamanho e a data de modificação do arquivo (sem ler o conteúdo)
+    """
+    st = os.stat(path)
+    key = repr((os.path.abspath(path), st.st_size, st.st_mtime_ns, sorted(load_kwargs.items())))
+    cache_path = os.path.join(cache_dir, hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + ".mesh")
+    if os.path.exists(cache_path):
+        return load_mesh(cache_path)
+
+    mesh = loader(path, **load_kwargs)
+    os.makedirs(cache_dir, exist_ok=True)
+    save_mesh(mesh, cache_path)
+    return mesh
@@ -0,0 +1,250 @@
+# software_renderer.py
+import struct
+import zlib
+import numpy as np
+from painter_algorithm import look_at, perspective, rotation_y, sort_polygons
+from polygon_batch import as_batch
+
+# ------------------------------------------------------
+# Renderização por software (sem OpenGL / sem janela)
+# ------------------------------------------------------
+# Permite renderizar e medir o Painter's Algorithm em máquinas sem GPU.
+# A rasterização usa funções de aresta (edge functions) avaliadas de forma
+# vetorizada em todos os pixels da bounding box de cada triângulo.
+
+MAX_FRAGMENTS = 1 << 22  # Fragmentos processados por lote (limita o uso de memória)
+EDGE_EPSILON = 1e-6      # Tolerância (em pixels) do teste de aresta
+
+def project_polygons(polygons, mvp, width, height):
+    """
+    Projeta os vértices para coordenadas de tela
+    mvp: matriz projeção @ modelview (4x4)
+    Retorna (xy, z, valid):
+      xy: (N, 3, 2) posição em pixels (origem no canto superior esquerdo)
+      z: (N, 3) profundidade normalizada (NDC) em [-1, 1]
+      valid: (N,) False para triângulos com algum vértice atrás da câmera
+    """
+    verts = as_batch(polygons).vertices.astype(float)
+    clip = verts @ mvp[:, 0:3].T + mvp[:, 3]  # (N, 3, 4)
+    w = clip[..., 3]
+    # Triângulos que cruzam o plano da câmera são descartados (não há recorte)
+    valid = np.all(w > 1e-9, axis=1)
+    w = np.where(w > 1e-9, w, 1.0)
+    ndc = clip[..., 0:3] / w[..., None]
+
+    xy = np.empty(ndc.shape[:2] + (2,))
+    xy[..., 0] = (ndc[..., 0] + 1.0) * 0.5 * width
+    xy[..., 1] = (1.0 - ndc[..., 1]) * 0.5 * height  # Linha 0 no topo da imagem
+    return xy, ndc[..., 2], valid
+
+def _plane_coefficients(l, q):
+    """Coeficientes (A, B, C) de q interpolado na tela: q(x, y) = A*x + B*y + C"""
+    return tuple(q[:, 0] * l[0][j] + q[:, 1] * l[1][j] + q[:, 2] * l[2][j] for j in range(3))
+
+def rasterize(color_buffer, key_buffer, xy, z, keys, colors, max_fragments=MAX_FRAGMENTS):
+    """
+    Rasteriza triângulos em color_buffer (H, W, 3) usando um teste por pixel:
+    o fragmento é escrito quando sua chave é menor que a guardada em key_buffer (H, W)
+    xy: (N, 3, 2) vértices em pixels; z: (N, 3) profundidade NDC (recorte near/far)
+    keys: (N, 3) chave por vértice, interpolada no triângulo
+          (para o pintor: -posição na ordem de desenho; para Z-buffer: a própria profundidade)
+    colors: (N, 3) cor de cada triângulo
+    """
+    height, width = key_buffer.shape
+    if len(xy) == 0:
+        return
+
+    # Bounding box de cada triângulo em índices de pixel (centro do pixel em +0.5)
+    x0 = np.clip(np.ceil(xy[..., 0].min(axis=1) - 0.5), 0, width).astype(np.int64)
+    x1 = np.clip(np.floor(xy[..., 0].max(axis=1) - 0.5), -1, width - 1).astype(np.int64)
+    y0 = np.clip(np.ceil(xy[..., 1].min(axis=1) - 0.5), 0, height).astype(np.int64)
+    y1 = np.clip(np.floor(xy[..., 1].max(axis=1) - 0.5), -1, height - 1).astype(np.int64)
+
+    # Área com sinal (duas vezes): triângulos degenerados ou fora da tela são ignorados
+    a, b, c = xy[:, 0], xy[:, 1], xy[:, 2]
+    area = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+    keep = (area != 0) & (x1 >= x0) & (y1 >= y0)
+    a, b, c, area = a[keep], b[keep], c[keep], area[keep]
+    x0, x1, y0, y1 = x0[keep], x1[keep], y0[keep], y1[keep]
+    z, keys, colors = z[keep], keys[keep], colors[keep]
+    if len(area) == 0:
+        return
+
+    # Funções de aresta normalizadas pela área = coordenadas baricêntricas lineares na tela:
+    # l_i(x, y) = A_i*x + B_i*y + C_i
+    l0 = ((b[:, 1] - c[:, 1]) / area, (c[:, 0] - b[:, 0]) / area, (b[:, 0] * c[:, 1] - b[:, 1] * c[:, 0]) / area)
+    l1 = ((c[:, 1] - a[:, 1]) / area, (a[:, 0] - c[:, 0]) / area, (c[:, 0] * a[:, 1] - c[:, 1] * a[:, 0]) / area)
+    l2 = (-l0[0] - l1[0], -l0[1] - l1[1], 1.0 - l0[2] - l1[2])
+    edges = np.stack([np.stack(l) for l in (l0, l1, l2)])  # (3 arestas, 3 coeficientes, N)
+    za, zb, zc = _plane_coefficients((l0, l1, l2), z)
+    ka, kb, kc = _plane_coefficients((l0, l1, l2), keys)
+
+    # Uma entrada por linha de pixels de cada triângulo
+    rows_per_tri = y1 - y0 + 1
+    row_tri = np.repeat(np.arange(len(area)), rows_per_tri)
+    row_y = np.arange(len(row_tri)) - np.repeat(np.cumsum(rows_per_tri) - rows_per_tri, rows_per_tri) + y0[row_tri]
+    cy = row_y + 0.5
+
+    # Intervalo [lo, hi] da linha onde as três funções de aresta são >= 0
+    lo, hi = x0[row_tri].astype(float), x1[row_tri].astype(float)
+    for e in range(3):
+        ea = edges[e, 0][row_tri]
+        ev = edges[e, 1][row_tri] * cy + edges[e, 2][row_tri]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            bound = -ev / ea - 0.5
+        # Tolerância para que pixels sobre arestas compartilhadas não fiquem sem cor
+        lo = np.where(ea > 0, np.maximum(lo, np.ceil(bound - EDGE_EPSILON)), lo)
+        hi = np.where(ea < 0, np.minimum(hi, np.floor(bound + EDGE_EPSILON)), hi)
+        # Aresta paralela à linha: a linha inteira está dentro ou fora
+        hi = np.where((ea == 0) & (ev < 0), lo - 1, hi)
+    span = np.maximum(hi - lo + 1, 0).astype(np.int64)
+
+    rows = np.flatnonzero(span)
+    if len(rows) == 0:
+        return
+    lo = lo.astype(np.int64)
+    z_row = zb[row_tri] * cy + zc[row_tri]     # Parte de z que só depende da linha
+    key_row = kb[row_tri] * cy + kc[row_tri]
+
+    # Divide as linhas em lotes com no máximo ~max_fragments fragmentos
+    cum = np.cumsum(span[rows])
+    bounds = np.searchsorted(cum, np.arange(max_fragments, cum[-1], max_fragments), side="right")
+    key_flat = key_buffer.reshape(-1)
+    color_flat = color_buffer.reshape(-1, 3)
+    for chunk in np.split(rows, np.unique(bounds)):
+        if len(chunk) == 0:
+            continue
+        n = span[chunk]
+        r = np.repeat(chunk, n)
+        px = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n) + lo[r]
+        t = row_tri[r]
+        cx = px + 0.5
+
+        # Recorte pelos planos near/far e chave interpolada de cada fragmento
+        frag_z = za[t] * cx + z_row[r]
+        inside = (frag_z >= -1.0) & (frag_z <= 1.0)
+        r, px, t, cx = r[inside], px[inside], t[inside], cx[inside]
+        frag_key = ka[t] * cx + key_row[r]
+        pixel = row_y[r] * width + px
+
+        # Mantém a menor chave de cada pixel (entre o buffer e todos os fragmentos do lote)
+        # e pinta apenas os fragmentos vencedores
+        np.minimum.at(key_flat, pixel, frag_key)
+        win = frag_key == key_flat[pixel]
+        color_flat[pixel[win]] = colors[t[win]]
+
+def new_framebuffer(width, height, background=(0.9, 0.9, 0.9)):
+    """Cria (color_buffer, key_buffer) preenchidos com a cor de fundo e chave infinita"""
+    color_buffer = np.empty((height, width, 3), dtype=np.float32)
+    color_buffer[:] = background
+    key_buffer = np.full((height, width), np.inf)
+    return color_buffer, key_buffer
+
+def to_rgb8(color_buffer):
+    """Converte o color_buffer (float em [0, 1]) para imagem RGB de 8 bits"""
+    return (np.clip(color_buffer, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8)
+
+def render_scene_software(polygons, camera_pos, camera_target, camera_up, angle=0.0,
+                          width=800, height=600, fovy=60.0, near=0.1, far=100.0,
+                          background=(0.9, 0.9, 0.9), sort_func=sort_polygons):
+    """
+    Equivalente headless de render_scene_painter: mesmos polígonos, câmera (look_at)
+    e parâmetros de gluPerspective. Desenha do mais distante para o mais próximo
+    (sem contornos) e retorna a imagem RGB (height, width, 3) uint8
+    """
+    view_mat = look_at(camera_pos, camera_target, camera_up)
+    ordered = as_batch(sort_func(polygons, view_mat))
+    mvp = perspective(fovy, float(width) / float(height), near, far) @ view_mat @ rotation_y(angle)
+
+    xy, z, valid = project_polygons(ordered, mvp, width, height)
+    # Quem é desenhado depois cobre quem veio antes: chave = -posição na ordem
+    rank = -np.arange(len(ordered), dtype=float)
+    keys = np.repeat(rank[:, None], 3, axis=1)
+
+    color_buffer, key_buffer = new_framebuffer(width, height, background)
+    rasterize(color_buffer, key_buffer, xy[valid], z[valid], keys[valid], ordered.colors[valid])
+    return to_rgb8(color_buffer)
+
+def render_scene_zbuffer(polygons, camera_pos, camera_target, camera_up, angle=0.0,
+                         width=800, height=600, fovy=60.0, near=0.1, far=100.0,
+                         background=(0.9, 0.9, 0.9)):
+    """
+    Renderização com Z-buffer para comparação com o Painter's Algorithm:
+    os polígonos são desenhados sem ordenação e cada pixel guarda o fragmento
+    de menor profundidade. Mesmos parâmetros de render_scene_software.
+    """
+    view_mat = look_at(camera_pos, camera_target, camera_up)
+    batch = as_batch(polygons)
+    mvp = perspective(fovy, float(width) / float(height), near, far) @ view_mat @ rotation_y(angle)
+
+    xy, z, valid = project_polygons(batch, mvp, width, height)
+    color_buffer, key_buffer = new_framebuffer(width, height, background)
+    # A chave do teste por pixel é a própria profundidade interpolada
+    rasterize(color_buffer, key_buffer, xy[valid], z[valid], z[valid], batch.colors[valid])
+    return to_rgb8(color_buffer)
+
+def image_difference(image_a, image_b):
+    """
+    Métricas de diferença entre duas imagens RGB uint8 do mesmo tamanho
+    Retorna dict com: mean_abs (0-255), max_abs, differing_pixels (fração) e psnr (dB,
+    None quando as imagens são idênticas)
+    """
+    diff = np.abs(image_a.astype(np.int16) - image_b.astype(np.int16))
+    mse = float(np.mean(diff.astype(float) ** 2))
+    return {
+        "mean_abs": float(diff.mean()),
+        "max_abs": int(diff.max()),
+        "differing_pixels": float(np.mean(diff.any(axis=2))),
+        "psnr": None if mse == 0 else float(10.0 * np.log10(255.0 ** 2 / mse)),
+    }
+
+# ------------------------------------------------------
+# Gravação de imagens
+# ------------------------------------------------------
+
+def write_ppm(path, image):
+    """Grava uma imagem RGB (H, W, 3) uint8 no formato PPM binário (P6)"""
+    height, width = image.shape[:2]
+    with open(path, "wb") as f:
+        f.write(b"P6\n%d %d\n255\n" % (width, height))
+        f.write(np.ascontiguousarray(image, dtype=np.uint8).tobytes())
+
+def write_png(path, image):
+    """Grava uma imagem RGB (H, W, 3) uint8 em PNG (apenas zlib, sem dependências extras)"""
+    height, width = image.shape[:2]
+    # Cada linha começa com o byte de filtro 0 (nenhum)
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 1:] = np.ascontiguousarray(image, dtype=np.uint8).reshape(height, -1)
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)))
+        f.write(chunk(b"IEND", b""))
+
+# ------------------------------------------------------
+# Main - renderiza uma cena de teste em arquivo (sem janela)
+# ------------------------------------------------------
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    import polygons as scenes
+
+    parser = argparse.ArgumentParser(description="Renderiza uma cena com o Painter's Algorithm por software")
+    parser.add_argument("output", help="arquivo de saída (.png ou .ppm)")
+    parser.add_argument("--scene", default="create_polygons_2D_scene",
+                        help="função geradora de polygons.py (ex.: create_polygons_3D_oclusion)")
+    parser.add_argument("--width", type=int, default=800)
+    parser.add_argument("--height", type=int, default=600)
+    args = parser.parse_args()
+
+    polygons = getattr(scenes, args.scene)()
+    start = time.perf_counter()
+    image = render_scene_software(polygons, np.array([0.0, 0.0, 5.0]), np.array([0.0, 0.0, 0.0]),
+                                  np.array([0.0, 1.0, 0.0]), width=args.width, height=args.height)
+    print("%d polígonos renderizados em %.1f ms" % (len(polygons), (time.perf_counter() - start) * 1000.0))
+    (write_ppm if args.output.lower().endswith(".ppm") else write_png)(args.output, image)
@@ -6,12 +6,14 @@ import numpy as np
 import sys
 from painter_algorithm import render_scene_painter
 from polygons import create_polygons_2D_scene
+from frame_cache import FrameCache
 
 # ------------------------------------------------------
 # Variáveis globais
 # ------------------------------------------------------
 width, height = 800, 600  # Dimensões iniciais da janela
 angle = 0.0  # Ângulo de rotação da cena (inicialmente 0)
+animate = False  # Rotação automática (tecla A liga/desliga)
 
 # Configuração da câmera:
 camera_pos = np.array([0.0, 0.0, 5.0])      # Posição da câmera (5 unidades afastada na direção Z)
@@ -22,6 +24,9 @@ camera_up = np.array([0.0, 1.0, 0.0])       # Vetor que define a direção "para
 # Esta cena é ideal para testar o Painter's Algorithm com objetos 2D
 polygons = create_polygons_2D_scene()
 
+# Guarda o último desenho: enquanto a câmera não se move, o frame não é reordenado
+frame_cache = FrameCache()
+
 # ------------------------------------------------------
 # Callbacks GLUT (Funções de callback do sistema OpenGL)
 # ------------------------------------------------------
@@ -33,7 +38,7 @@ def display():
     """
     global polygons, camera_pos, camera_target, camera_up, angle
     # Renderiza a cena usando o algoritmo do pintor
-    render_scene_painter(polygons, camera_pos, camera_target, camera_up, angle)
+    render_scene_painter(polygons, camera_pos, camera_target, camera_up, angle, frame_cache=frame_cache)
 
 def idle():
     """
@@ -41,8 +46,9 @@ def idle():
     Pode ser usada para animações contínuas.
     """
     global angle
-    # A rotação automática está comentada - descomente para habilitar animação
-    #angle += 0.2
+    # Rotação automática (só registrada como idle com a animação ligada)
+    if animate:
+        angle += 0.2
     
     # Mantém o ângulo no intervalo [0, 360) graus
     if angle >= 360: 
@@ -81,7 +87,7 @@ def keyboard(key, x, y):
     Função callback chamada quando uma tecla é pressionada.
     Implementa controles interativos da câmera.
     """
-    global camera_pos
+    global camera_pos, animate
     
     if key == b'\x1b':  # Tecla ESC (código ASCII 27) - sai do programa
         sys.exit(0)
@@ -92,6 +98,11 @@ def keyboard(key, x, y):
         
     if key == b's':  # Tecla S - move a câmera para trás (zoom out)
         camera_pos[2] += 0.2  # Aumenta Z (move para trás)
+
+    if key == b'a':  # Tecla A - liga/desliga a rotação automática
+        animate = not animate
+        # Sem animação não há callback de ocioso: a janela só é redesenhada quando algo muda
+        glutIdleFunc(idle if animate else None)
     
     # Solicita um redesenho da cena para refletir as mudanças
     glutPostRedisplay()
@@ -122,7 +133,7 @@ def execTest():
     
     # Registra as funções callback:
     glutDisplayFunc(display)    # Chamada quando precisa renderizar
-    glutIdleFunc(idle)          # Chamada quando o sistema está ocioso
+    glutIdleFunc(idle if animate else None)  # Chamada quando o sistema está ocioso (só com animação)
     glutReshapeFunc(reshape)    # Chamada quando a janela é redimensionada
     glutKeyboardFunc(keyboard)  # Chamada quando uma tecla é pressionada
     
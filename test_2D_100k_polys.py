@@ -4,14 +4,20 @@ from OpenGL.GLUT import *
 from OpenGL.GLU import *
 import numpy as np
 import sys
-from painter_algorithm import render_scene_painter
+import time
+from painter_algorithm import render_scene_painter, draw_polygons_arrays, perspective
 from polygons import create_random_polygons
+from profiler import FrameProfiler
+from scene_cache import cached_bvh, cached_bsp
+from pipeline import AsyncSorter
+from frame_cache import FrameCache
 
 # ------------------------------------------------------
 # Variáveis globais
 # ------------------------------------------------------
 width, height = 800, 600  # Dimensões da janela
 angle = 0.0  # Ângulo de rotação (atualmente desativado)
+animate = False  # Rotação automática (tecla A liga/desliga)
 
 # Configuração da câmera:
 camera_pos = np.array([0.0, 0.0, 5.0])      # Câmera posicionada em Z=5 (afastada)
@@ -19,7 +25,33 @@ camera_target = np.array([0.0, 0.0, 0.0])   # Mirando para a origem
 camera_up = np.array([0.0, 1.0, 0.0])       # Vetor "cima" apontando para Y+
 
 # 🔥 CARGA PESADA: Gera 100.000 polígonos aleatórios (teste de estresse extremo)
-polygons = create_random_polygons(num=100000)
+# Semente fixa: a mesma cena a cada execução, então a BVH pode vir do cache em disco
+polygons = create_random_polygons(num=100000, rng=np.random.default_rng(0))
+
+# Mede o tempo de cada etapa do frame (look_at, sort, draw, swap) e mostra na tela
+profiler = FrameProfiler()
+
+# Projeção usada no reshape: permite descartar os polígonos fora do campo de visão
+projection = perspective(60.0, float(width)/float(height), 0.1, 100.0)
+
+# BVH construída uma vez (e guardada em .scene_cache): descarta grupos inteiros de polígonos fora da tela
+# quando a maior parte da cena sai do campo de visão (W/S para dentro da cena); com a cena toda
+# à vista ela usa o teste linear, que nesse caso é mais rápido (ver bvh.py)
+start = time.perf_counter()
+bvh = cached_bvh(polygons)
+print("BVH: %.3f s" % (time.perf_counter() - start))
+
+# Ordem exata pela BSP (tecla B): construir a árvore desta cena leva ~40 s, então ela só é
+# construída na primeira vez que a tecla é usada e fica em .scene_cache (depois abre em ms)
+bsp_tree = None
+use_bsp = False
+
+# Ordenação em outra thread: o frame N é desenhado enquanto o N+1 é ordenado
+# (a janela continua respondendo ao teclado mesmo com 100k polígonos)
+sorter = AsyncSorter(max_latency=1)
+
+# Guarda o último desenho: com a câmera parada o frame é só um glCallList
+frame_cache = FrameCache()
 
 # ------------------------------------------------------
 # Callbacks GLUT
@@ -31,7 +63,16 @@ def display():
     Esta função será MUITO LENTA devido aos 100k polígonos.
     """
     global polygons, camera_pos, camera_target, camera_up, angle
-    render_scene_painter(polygons, camera_pos, camera_target, camera_up, angle)
+    if use_bsp:
+        # Percurso da BSP no lugar da ordenação (sem culling: a árvore vale para a cena inteira)
+        render_scene_painter(bsp_tree.polygons, camera_pos, camera_target, camera_up, angle,
+                             draw_func=draw_polygons_arrays, profiler=profiler,
+                             sort_func=bsp_tree, frame_cache=frame_cache)
+    else:
+        # Desenho com vertex arrays (um draw call) em vez de glBegin/glEnd por polígono
+        render_scene_painter(polygons, camera_pos, camera_target, camera_up, angle,
+                             draw_func=draw_polygons_arrays, profiler=profiler, projection=projection,
+                             cull_func=bvh, sort_func=sorter, frame_cache=frame_cache)
 
 def idle():
     """
@@ -39,8 +80,9 @@ def idle():
     Pode causar lentidão extrema se a animação estiver habilitada.
     """
     global angle
-    # Ângulo comentado para evitar animação (seria muito lento com 100k polígonos)
-    #angle += 0.2
+    # Rotação automática desligada por padrão (muito lenta com 100k polígonos)
+    if animate:
+        angle += 0.2
     
     # Mantém o ângulo no range [0, 360)
     if angle >= 360: 
@@ -53,8 +95,9 @@ def reshape(w, h):
     """
     Callback de redimensionamento - ajusta a viewport e projeção quando a janela muda de tamanho.
     """
-    global width, height
+    global width, height, projection
     width, height = w, h
+    projection = perspective(60.0, float(w)/float(h), 0.1, 100.0)
     
     # Define a área de renderização
     glViewport(0, 0, w, h)
@@ -76,9 +119,10 @@ def keyboard(key, x, y):
     """
     Callback de teclado - processa entrada do usuário.
     """
-    global camera_pos
+    global camera_pos, animate, bsp_tree, use_bsp
     
     if key == b'\x1b':  # Tecla ESC - sai do programa
+        sorter.close()
         sys.exit(0)
     
     # Controles simples de câmera:
@@ -87,6 +131,24 @@ def keyboard(key, x, y):
         
     if key == b's':  # S - move câmera para trás (zoom out)
         camera_pos[2] += 0.2
+
+    if key == b'p':  # P - grava as medições dos últimos frames
+        profiler.to_csv("profile_100k.csv")
+        profiler.to_json("profile_100k.json")
+        print("Medições gravadas em profile_100k.csv / profile_100k.json")
+
+    if key == b'b':  # B - alterna entre a ordenação assíncrona e a ordem exata da BSP
+        if bsp_tree is None:
+            start = time.perf_counter()
+            bsp_tree = cached_bsp(polygons)
+            print("BSP: %.3f s" % (time.perf_counter() - start))
+        use_bsp = not use_bsp
+        print("Ordenação:", "BSP Tree" if use_bsp else "AsyncSorter + BVH")
+
+    if key == b'a':  # A - liga/desliga a rotação automática
+        animate = not animate
+        # Sem animação não há callback de ocioso: com a cena parada a CPU fica livre
+        glutIdleFunc(idle if animate else None)
         
     # Solicita redesenho (pode ser muito lento)
     glutPostRedisplay()
@@ -117,7 +179,7 @@ def execTest():
     
     # Registra callbacks:
     glutDisplayFunc(display)      # Renderização
-    glutIdleFunc(idle)            # Tempo ocioso
+    glutIdleFunc(idle if animate else None)  # Tempo ocioso (só com animação)
     glutReshapeFunc(reshape)      # Redimensionamento
     glutKeyboardFunc(keyboard)    # Teclado
     
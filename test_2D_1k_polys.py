@@ -18,8 +18,8 @@ camera_pos = np.array([0.0, 0.0, 5.0])      # Posição da câmera (afastada 5 u
 camera_target = np.array([0.0, 0.0, 0.0])   # Ponto para onde a câmera olha (origem)
 camera_up = np.array([0.0, 1.0, 0.0])       # Vetor "para cima" da câmera
 
-# Gera 1000 polígonos aleatórios para teste de performance
-polygons = create_random_polygons()
+# Gera 1000 polígonos aleatórios para teste de performance (semente fixa: mesma cena a cada execução)
+polygons = create_random_polygons(rng=np.random.default_rng(0))
 
 # ------------------------------------------------------
 # Callbacks GLUT (funções de callback do OpenGL)
@@ -0,0 +1,101 @@
+# test_bsp_oclusion.py
+from OpenGL.GL import *
+from OpenGL.GLUT import *
+from OpenGL.GLU import *
+import numpy as np
+import sys
+from painter_algorithm import render_scene_painter
+from polygons import create_polygons_3D_oclusion
+from scene_cache import cached_bsp
+from newell_sort import NewellSorter
+
+# ------------------------------------------------------
+# Variáveis globais
+# ------------------------------------------------------
+width, height = 800, 600  # Dimensões da janela
+camera_pos = np.array([0.0, 0.0, 5.0])      # Posição inicial da câmera
+camera_target = np.array([0.0, 0.0, -5.5])  # Centro da cena com objetos sobrepostos
+camera_up = np.array([0.0, 1.0, 0.0])       # Vetor "para cima"
+
+# A BSP é construída uma única vez: os polígonos que se cruzam são divididos,
+# então a ordem de desenho fica correta de qualquer ponto de vista.
+# A árvore fica em .scene_cache: nas execuções seguintes só é lida do disco
+scene = create_polygons_3D_oclusion()
+tree = cached_bsp(scene)
+
+# Alternativa sem pré-processamento: ordem aproximada corrigida por Newell-Newell-Sancha
+# a cada frame (tecla N alterna entre as duas)
+newell = NewellSorter()
+use_newell = False
+
+# ------------------------------------------------------
+# Callbacks GLUT
+# ------------------------------------------------------
+
+def display():
+    """Callback de renderização - a ordem vem do percurso da BSP (sem ordenação) ou do NewellSorter"""
+    if use_newell:
+        render_scene_painter(scene, camera_pos, camera_target, camera_up, 0.0, sort_func=newell)
+    else:
+        render_scene_painter(tree.polygons, camera_pos, camera_target, camera_up, 0.0, sort_func=tree)
+
+def reshape(w, h):
+    """Callback de redimensionamento - ajusta viewport e projeção"""
+    global width, height
+    width, height = w, h
+    glViewport(0, 0, w, h)
+    glMatrixMode(GL_PROJECTION)
+    glLoadIdentity()
+    gluPerspective(60.0, float(w)/float(h), 0.1, 100.0)
+    glMatrixMode(GL_MODELVIEW)
+
+def keyboard(key, x, y):
+    """Callback de teclado - WASD/QE movem a câmera, que continua olhando para a cena"""
+    global camera_pos, use_newell
+
+    if key == b'\x1b':  # ESC - sai do programa
+        sys.exit(0)
+    elif key == b'w':   # W - move câmera para frente
+        camera_pos[2] -= 0.2
+    elif key == b's':   # S - move câmera para trás
+        camera_pos[2] += 0.2
+    elif key == b'a':   # A - move câmera para esquerda
+        camera_pos[0] -= 0.2
+    elif key == b'd':   # D - move câmera para direita
+        camera_pos[0] += 0.2
+    elif key == b'q':   # Q - move câmera para cima
+        camera_pos[1] += 0.2
+    elif key == b'e':   # E - move câmera para baixo
+        camera_pos[1] -= 0.2
+    elif key == b'n':   # N - alterna entre BSP e Newell-Newell-Sancha
+        use_newell = not use_newell
+        print("Ordenação:", "Newell-Newell-Sancha" if use_newell else "BSP Tree")
+
+    glutPostRedisplay()
+
+# ------------------------------------------------------
+# Main
+# ------------------------------------------------------
+
+def execTest():
+    """Função principal que configura e executa a demonstração"""
+    glutInit(sys.argv)
+    glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGBA | GLUT_DEPTH)
+    glutInitWindowSize(width, height)
+    glutCreateWindow(b"Painter's Algorithm - BSP Tree")
+
+    glutDisplayFunc(display)
+    glutReshapeFunc(reshape)
+    glutKeyboardFunc(keyboard)
+
+    glClearColor(0.9, 0.9, 0.9, 1.0)  # Cor de fundo cinza
+
+    print("Controles:")
+    print("WASD/QE: Mover câmera")
+    print("N: Alternar BSP Tree / Newell-Newell-Sancha")
+    print("ESC: Sair")
+
+    glutMainLoop()
+
+if __name__ == "__main__":
+    execTest()
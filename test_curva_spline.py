@@ -6,6 +6,8 @@ import numpy as np
 import sys
 from painter_algorithm import render_scene_painter
 from polygons import create_polygons_3D
+from incremental_sort import IncrementalSorter
+from object_sort import ObjectSorter
 
 # ------------------------------------------------------
 # Variáveis globais
@@ -15,6 +17,9 @@ t_global = 0.0  # Parâmetro de animação para a curva spline
 camera_up = np.array([0.0, 1.0, 0.0])  # Vetor "para cima" fixo
 polygons = []  # Lista de polígonos da cena
 control_points = []  # Pontos de controle da curva spline
+sorter = IncrementalSorter()  # Reaproveita a ordem do frame anterior (câmera anda pouco por frame)
+object_sorter = ObjectSorter()  # Alternativa: ordena os 4 objetos em vez dos triângulos (tecla O)
+use_object_sort = False
 
 # ------------------------------------------------------
 # Funções de spline (Catmull-Rom)
@@ -114,7 +119,8 @@ def display():
     camera_target = np.array([0.0, 0.0, -5.5])
 
     # 🎨 Renderiza a cena usando o Painter's Algorithm
-    render_scene_painter(polygons, camera_pos, camera_target, camera_up, 0.0)
+    render_scene_painter(polygons, camera_pos, camera_target, camera_up, 0.0,
+                         sort_func=object_sorter if use_object_sort else sorter)
 
 def idle():
     """
@@ -138,10 +144,14 @@ def reshape(w, h):
 
 def keyboard(key, x, y):
     """
-    Callback de teclado - apenas permite sair com ESC.
+    Callback de teclado - ESC sai, O alterna entre ordenação por triângulo e por objeto.
     """
+    global use_object_sort
     if key == b'\x1b':  # Tecla ESC - sai do programa
         sys.exit(0)
+    elif key == b'o':   # O - alterna o modo de ordenação
+        use_object_sort = not use_object_sort
+        print("Ordenação por objeto" if use_object_sort else "Ordenação por triângulo (incremental)")
 
 # ------------------------------------------------------
 # Main
@@ -136,8 +136,10 @@ def setup_lighting():
 def display():
     """Callback de renderização - desenha a cena a cada frame"""
     global polygons, camera_pos, camera_target, camera_up, angle
-    # Usa a função personalizada de desenho com iluminação
-    render_scene_painter(polygons, camera_pos, camera_target, camera_up, angle, draw_func=draw_polygons)
+    # Usa a função personalizada de desenho com iluminação; as normais vêm dos geradores
+    # e as faces de costas são descartadas antes da ordenação
+    render_scene_painter(polygons, camera_pos, camera_target, camera_up, angle, draw_func=draw_polygons,
+                         backface_culling=True)
 
 def idle():
     """Callback de ociosidade - animação automática"""
@@ -0,0 +1,39 @@
+# helpers.py
+import numpy as np
+from painter_algorithm import look_at, perspective
+from polygon_batch import as_batch
+from bsp_tree import polygon_planes
+from newell_sort import view_space, screen_project, triangles_overlap_2d, pair_order
+from tiles import bin_boxes
+
+# ------------------------------------------------------
+# Funções comuns aos testes
+# ------------------------------------------------------
+
+PROJECTION = perspective(60.0, 800.0 / 600.0, 0.1, 100.0)
+
+def view(eye, target=(0.0, 0.0, -10.0)):
+    """View matrix de uma câmera em 'eye' olhando para 'target'"""
+    return look_at(np.array(eye, dtype=float), np.array(target, dtype=float), np.array([0.0, 1.0, 0.0]))
+
+def violated_pairs(polygons, view_mat):
+    """
+    Pares que se sobrepõem na tela desenhados na ordem errada
+    polygons: lote na ordem de desenho. Cada par (a, b), a desenhado antes de b, que se
+    sobrepõe na tela é decidido por pair_order: -1 (b deveria vir antes) é uma violação
+    (0 não é: nenhum dos testes decide, ex.: fragmentos da BSP que cruzam o plano um do outro
+    sem se tocar, separados pelo plano de um terceiro polígono)
+    """
+    batch = as_batch(polygons)
+    verts = batch.vertices.astype(float)
+    view_verts = view_space(verts, view_mat)
+    screen, valid = screen_project(view_verts)
+    lo, hi = screen.min(axis=1), screen.max(axis=1)
+    size = max(np.median((hi[valid] - lo[valid]).max(axis=1)), 1e-3)
+    a, b = bin_boxes(lo, hi, size, valid=valid).pairs()
+    overlap = triangles_overlap_2d(screen[a], screen[b])
+    a, b = a[overlap], b[overlap]
+    eye = np.linalg.inv(view_mat)[0:3, 3]
+    order, _, _ = pair_order(verts, view_verts, polygon_planes(verts), eye, a, b)
+    wrong = order == -1
+    return np.stack([a[wrong], b[wrong]], axis=1)
@@ -0,0 +1,40 @@
+# test_bsp_tree.py
+import numpy as np
+import pytest
+from polygon_batch import PolygonBatch, compute_normals
+from polygons import create_polygons_3D_oclusion, create_random_3d_shapes
+from bsp_tree import build_bsp
+from helpers import view, violated_pairs
+
+EYES = [(0.0, 0.0, 5.0), (6.0, 3.0, 2.0), (-8.0, -2.0, -10.0), (1.0, 12.0, -9.0), (3.0, -4.0, -25.0)]
+
+@pytest.fixture(scope="module", params=["occlusion", "shapes"])
+def tree(request):
+    if request.param == "occlusion":
+        return build_bsp(create_polygons_3D_oclusion())  # Planos que se atravessam: exige divisões
+    return build_bsp(create_random_3d_shapes(12, rng=np.random.default_rng(1)))
+
+@pytest.mark.parametrize("eye", EYES)
+def test_back_to_front_has_no_violated_pairs(tree, eye):
+    view_mat = view(eye)
+    assert len(violated_pairs(tree(tree.polygons, view_mat), view_mat)) == 0
+
+@pytest.mark.parametrize("eye", EYES)
+def test_back_to_front_is_a_permutation(tree, eye):
+    order = tree.back_to_front(np.array(eye))
+    np.testing.assert_array_equal(np.sort(order), np.arange(len(tree.polygons)))
+
+def test_splits_keep_attributes():
+    # Um objeto por polígono: cada fragmento precisa herdar a cor, a normal e o id do original
+    batch = compute_normals(create_polygons_3D_oclusion())
+    batch = PolygonBatch(batch.vertices, batch.colors, batch.normals, np.arange(len(batch)))
+    polys = build_bsp(batch).polygons
+    assert len(polys) > len(batch)
+    source = polys.object_ids
+    np.testing.assert_array_equal(polys.colors, batch.colors[source])
+    np.testing.assert_array_equal(polys.normals, batch.normals[source])
+    np.testing.assert_array_equal(np.unique(source), np.arange(len(batch)))
+
+def test_rejects_other_scene(tree):
+    with pytest.raises(ValueError):
+        tree(tree.polygons.take(np.arange(3)), view((0.0, 0.0, 5.0)))
@@ -0,0 +1,49 @@
+# test_bvh.py
+import numpy as np
+import pytest
+from painter_algorithm import cull_frustum
+from polygons import create_random_polygons
+from bvh import build_bvh
+from helpers import PROJECTION, view
+
+# Câmeras de frente, dentro da cena, de lado e de costas para ela
+VIEWS = [((0.0, 0.0, 5.0), (0.0, 0.0, -10.0)), ((0.0, 0.0, -12.0), (3.0, 1.0, -20.0)),
+         ((30.0, 0.0, -10.0), (0.0, 0.0, -10.0)), ((0.0, 0.0, 5.0), (0.0, 0.0, 20.0))]
+
+@pytest.fixture(scope="module")
+def scene():
+    batch = create_random_polygons(num=4000, rng=np.random.default_rng(0))
+    return batch, build_bvh(batch, leaf_size=16)
+
+@pytest.mark.parametrize("eye, target", VIEWS)
+def test_traverse_equals_linear_culling(scene, eye, target):
+    batch, bvh = scene
+    model_view = view(eye, target)
+    expected = cull_frustum(batch, model_view, PROJECTION)
+    visible = bvh.traverse(batch, model_view, PROJECTION)
+    assert len(np.unique(visible)) == len(visible)
+    np.testing.assert_array_equal(np.sort(visible), expected)
+
+@pytest.mark.parametrize("linear_below", [0, 10 ** 9])
+@pytest.mark.parametrize("eye, target", VIEWS)
+def test_call_equals_linear_culling(scene, eye, target, linear_below):
+    batch, bvh = scene
+    bvh.linear_below = linear_below  # 0: a árvore ou o teste linear, pela amostra
+    model_view = view(eye, target)
+    visible = bvh(batch, model_view, PROJECTION)
+    np.testing.assert_array_equal(np.sort(visible), cull_frustum(batch, model_view, PROJECTION))
+
+def test_traverse_orders_leaves_back_to_front(scene):
+    batch, bvh = scene
+    model_view = view((0.0, 0.0, 5.0))
+    visible = bvh.traverse(batch, model_view, PROJECTION)
+    # Primeiro e último quartos: polígonos das folhas mais distantes vêm antes
+    depth = batch.vertices[visible].mean(axis=1) @ model_view[2, 0:3] + model_view[2, 3]
+    quarter = len(visible) // 4
+    assert depth[:quarter].mean() < depth[-quarter:].mean()
+
+def test_rejects_other_scene(scene):
+    _, bvh = scene
+    other = create_random_polygons(num=10, rng=np.random.default_rng(1))
+    with pytest.raises(ValueError):
+        bvh(other, view((0.0, 0.0, 5.0)), PROJECTION)
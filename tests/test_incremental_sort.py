@@ -0,0 +1,49 @@
+# test_incremental_sort.py
+import numpy as np
+from painter_algorithm import sort_polygons
+from polygons import create_random_polygons
+from incremental_sort import IncrementalSorter
+from helpers import view
+
+def test_update_equals_stable_argsort():
+    rng = np.random.default_rng(0)
+    keys = rng.uniform(-20.0, -1.0, 2000)
+    sorter = IncrementalSorter()
+    np.testing.assert_array_equal(sorter.update(keys), np.argsort(keys, kind="stable"))
+    assert sorter.stats["fallback"]
+    for _ in range(10):
+        # Movimento pequeno de câmera: poucas chaves trocam de posição
+        keys = keys + rng.normal(0.0, 0.005, len(keys))
+        np.testing.assert_array_equal(sorter.update(keys), np.argsort(keys, kind="stable"))
+        assert not sorter.stats["fallback"]
+        assert 0 < sorter.stats["moved"] < 0.25 * len(keys)
+
+def test_ties_keep_original_order():
+    sorter = IncrementalSorter()
+    sorter.update(np.arange(8.0))
+    keys = np.array([0.0, 1.0, 5.0, 3.0, 3.0, 5.0, 3.0, 7.0])
+    np.testing.assert_array_equal(sorter.update(keys), np.argsort(keys, kind="stable"))
+
+def test_large_change_falls_back_to_full_sort():
+    rng = np.random.default_rng(1)
+    sorter = IncrementalSorter()
+    sorter.update(rng.random(1000))
+    keys = rng.random(1000)
+    np.testing.assert_array_equal(sorter.update(keys), np.argsort(keys, kind="stable"))
+    assert sorter.stats["fallback"]
+
+def test_new_size_and_reset_sort_again():
+    sorter = IncrementalSorter()
+    sorter.update(np.arange(10.0))
+    sorter.update(np.arange(5.0))
+    assert sorter.stats["fallback"] and sorter.stats["polygons"] == 5
+    sorter.reset()
+    sorter.update(np.arange(5.0))
+    assert sorter.stats["fallback"]
+
+def test_call_equals_sort_polygons():
+    batch = create_random_polygons(num=500, rng=np.random.default_rng(2))
+    sorter = IncrementalSorter()
+    for x in np.linspace(0.0, 1.0, 5):
+        view_mat = view((x, 0.5, 5.0))
+        np.testing.assert_array_equal(sorter(batch, view_mat).vertices, sort_polygons(batch, view_mat).vertices)
@@ -0,0 +1,119 @@
+# test_mesh_io.py
+import numpy as np
+import pytest
+from polygon_batch import PolygonBatch
+from polygons import create_random_3d_shapes
+from mesh_io import read_mesh, read_obj, read_ply, write_obj, write_ply
+
+# Quadrado (quad), triângulo e pentágono sobre 6 vértices, em formatos de canto diferentes
+POSITIONS = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0], [2, 0, 1], [2, 1, 1]], dtype=np.float32)
+TRIANGLES = np.array([[0, 1, 2], [0, 2, 3],                  # quad 0 1 2 3
+                      [1, 4, 5],                             # triângulo 1 4 5
+                      [0, 1, 4], [0, 4, 5], [0, 5, 2]])      # pentágono 0 1 4 5 2
+
+MIXED_OBJ = """# cena de teste
+o primeiro
+v 0 0 0
+v 1 0 0   # comentário no fim da linha
+v 1 1 0
+v 0 1 0
+vn 0 0 1
+vt 0.5 0.5
+f 1 2 3 4 # quad
+g segundo
+v 2 0 1
+v 2 1 1
+f 2/1 5/1 -1/1
+f 1//1 2//1 5//1 6//1 3//1
+usemtl qualquer
+"""
+
+MIXED_PLY = """ply
+format ascii 1.0
+comment faces de tamanhos diferentes
+element vertex 6
+property float x
+property float y
+property float z
+element face 3
+property list uchar int vertex_indices
+end_header
+0 0 0
+1 0 0
+1 1 0
+0 1 0
+2 0 1
+2 1 1
+4 0 1 2 3
+3 1 4 5
+5 0 1 4 5 2
+"""
+
+def mixed_ply_binary(path, endian):
+    header = MIXED_PLY.split("end_header")[0].replace("ascii", "binary_%s_endian" % endian) + "end_header\n"
+    e = "<" if endian == "little" else ">"
+    with open(path, "wb") as f:
+        f.write(header.encode("ascii"))
+        f.write(POSITIONS.astype(e + "f4").tobytes())
+        for face in ([0, 1, 2, 3], [1, 4, 5], [0, 1, 4, 5, 2]):
+            f.write(np.uint8(len(face)).tobytes() + np.array(face, dtype=e + "i4").tobytes())
+
+def assert_same_polygons(actual, expected, color_tolerance=0.0):
+    np.testing.assert_allclose(actual.vertices, expected.vertices, atol=1e-5)
+    np.testing.assert_allclose(actual.colors, expected.colors, atol=color_tolerance)
+
+def test_obj_mixed_faces_and_comments(tmp_path):
+    path = tmp_path / "mixed.obj"
+    path.write_text(MIXED_OBJ)
+    mesh = read_obj(str(path))
+    np.testing.assert_array_equal(mesh.positions, POSITIONS)
+    np.testing.assert_array_equal(mesh.faces, TRIANGLES)
+    np.testing.assert_array_equal(mesh.object_ids, [0, 0, 1, 1, 1, 1])
+    np.testing.assert_allclose(mesh.normals[0], [0.0, 0.0, 1.0])
+
+@pytest.mark.parametrize("fmt", ["ascii", "little", "big"])
+def test_ply_mixed_faces(tmp_path, fmt):
+    path = tmp_path / "mixed.ply"
+    if fmt == "ascii":
+        path.write_text(MIXED_PLY)
+    else:
+        mixed_ply_binary(str(path), fmt)
+    mesh = read_ply(str(path))
+    np.testing.assert_array_equal(mesh.positions, POSITIONS)
+    np.testing.assert_array_equal(mesh.faces, TRIANGLES)
+
+@pytest.fixture(scope="module")
+def shapes():
+    return create_random_3d_shapes(6, rng=np.random.default_rng(0))
+
+def test_obj_round_trip(tmp_path, shapes):
+    path = str(tmp_path / "shapes.obj")
+    write_obj(path, shapes)
+    batch = read_obj(path).to_batch()
+    assert_same_polygons(batch, shapes, color_tolerance=1e-4)
+    np.testing.assert_array_equal(batch.object_ids, shapes.object_ids)
+
+@pytest.mark.parametrize("binary", [True, False])
+def test_ply_round_trip(tmp_path, shapes, binary):
+    path = str(tmp_path / "shapes.ply")
+    write_ply(path, shapes, binary=binary)
+    assert_same_polygons(read_ply(path).to_batch(), shapes, color_tolerance=0.5 / 255)
+
+def test_read_mesh_cache(tmp_path, shapes):
+    path = str(tmp_path / "shapes.ply")
+    write_ply(path, shapes)
+    cache_dir = str(tmp_path / "cache")
+    first = read_mesh(path, cache_dir=cache_dir)
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+    again = read_mesh(path, cache_dir=cache_dir)   # Lido do cache binário
+    assert_same_polygons(again, first)
+    assert isinstance(again, PolygonBatch)
+    assert len(read_mesh(path, indexed=True, cache_dir=None)) == len(shapes)
+
+def test_invalid_files(tmp_path):
+    bad_index = tmp_path / "bad.obj"
+    bad_index.write_text("v 0 0 0\nv 1 0 0\nf 1 2 3\n")
+    with pytest.raises(ValueError):
+        read_obj(str(bad_index))
+    with pytest.raises(ValueError):
+        read_mesh(str(tmp_path / "scene.stl"))
@@ -0,0 +1,55 @@
+# test_newell_sort.py
+import numpy as np
+import pytest
+from painter_algorithm import sort_polygons
+from polygon_batch import as_batch
+from polygons import create_polygons_3D_oclusion, create_random_3d_shapes, create_random_polygons
+from newell_sort import NewellSorter, split_intersections, triangles_overlap_2d
+from helpers import view, violated_pairs
+
+EYES = [(0.0, 0.0, 5.0), (6.0, 3.0, 2.0), (-8.0, -2.0, -10.0), (1.0, 12.0, -9.0), (3.0, -4.0, -25.0)]
+
+SCENES = {
+    "occlusion": create_polygons_3D_oclusion,  # Polígonos que se atravessam
+    "shapes": lambda: create_random_3d_shapes(12, rng=np.random.default_rng(1)),
+    "quads": lambda: create_random_polygons(num=300, rng=np.random.default_rng(2)),
+}
+
+@pytest.mark.parametrize("name", sorted(SCENES))
+def test_order_has_no_violated_pairs(name):
+    batch = as_batch(SCENES[name]())
+    sorter = NewellSorter()
+    for eye in EYES:
+        view_mat = view(eye)
+        result = sorter(batch, view_mat)
+        assert sorter.stats["unresolved"] == 0
+        assert len(violated_pairs(result, view_mat)) == 0
+
+def test_depth_sort_alone_violates_pairs():
+    # Confere que violated_pairs detecta o que a ordem exata corrige
+    batch = as_batch(create_polygons_3D_oclusion())
+    view_mat = view(EYES[0])
+    assert len(violated_pairs(sort_polygons(batch, view_mat), view_mat)) > 0
+
+def test_same_batch_reuses_splits():
+    batch = as_batch(create_polygons_3D_oclusion())
+    sorter = NewellSorter()
+    first = sorter(batch, view(EYES[0]))
+    # Uma cópia com o mesmo conteúdo conta como o mesmo lote: parte das divisões já feitas
+    again = sorter(batch.take(np.arange(len(batch))), view(EYES[0]))
+    assert len(again) == len(first)
+    assert sorter.stats["reordered"] == 0
+
+def test_split_intersections_leaves_no_crossing_pairs():
+    batch = as_batch(create_polygons_3D_oclusion())
+    split, count = split_intersections(batch)
+    assert count > 0 and len(split) > len(batch)
+    assert split_intersections(split)[1] == 0
+
+def test_triangles_overlap_2d():
+    tri = np.array([[[0.0, 0.0], [1.0, 0.0], [0.0, 1.0]]])
+    shifted = tri + [[0.2, 0.2]]
+    neighbour = np.array([[[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]]])   # Só divide a aresta
+    far = tri + [[3.0, 0.0]]
+    result = triangles_overlap_2d(np.repeat(tri, 3, axis=0), np.concatenate([shifted, neighbour, far]))
+    np.testing.assert_array_equal(result, [True, False, False])
@@ -0,0 +1,35 @@
+# test_parallel_sort.py
+import numpy as np
+import pytest
+from painter_algorithm import depth_order, sort_polygons
+from polygon_batch import PolygonBatch
+from polygons import create_random_polygons
+from parallel_sort import ParallelSorter
+from helpers import view
+
+@pytest.fixture(scope="module")
+def sorter():
+    with ParallelSorter(workers=2, chunk_size=700) as sorter:
+        yield sorter
+
+def test_order_equals_depth_order(sorter):
+    batch = create_random_polygons(num=1500, rng=np.random.default_rng(0))
+    for eye in ((0.0, 0.0, 5.0), (7.0, 2.0, -3.0), (-4.0, 1.0, -30.0)):
+        view_mat = view(eye)
+        np.testing.assert_array_equal(sorter.order(batch, view_mat), depth_order(batch, view_mat))
+    assert sorter.stats["chunks"] == 5
+
+def test_ties_keep_original_order(sorter):
+    # Cada polígono repetido 3 vezes: empates exatos entre blocos diferentes
+    base = create_random_polygons(num=400, rng=np.random.default_rng(1))
+    batch = PolygonBatch.concatenate([base, base, base])
+    view_mat = view((2.0, -1.0, 4.0))
+    np.testing.assert_array_equal(sorter.order(batch, view_mat), depth_order(batch, view_mat))
+
+def test_call_returns_sorted_polygons(sorter):
+    batch = create_random_polygons(num=300, rng=np.random.default_rng(2))
+    view_mat = view((0.0, 3.0, 6.0))
+    np.testing.assert_array_equal(sorter(batch, view_mat).vertices, sort_polygons(batch, view_mat).vertices)
+
+def test_empty_batch(sorter):
+    assert len(sorter.order(PolygonBatch.empty(), view((0.0, 0.0, 5.0)))) == 0
@@ -0,0 +1,63 @@
+# test_polygon_stream.py
+import numpy as np
+import pytest
+from painter_algorithm import cull_backfaces, cull_frustum, sort_polygons
+from polygon_batch import PolygonBatch
+from polygons import create_random_3d_shapes
+from polygon_stream import PolygonStream, random_polygon_parts, write_polygon_stream
+from helpers import PROJECTION, view
+
+@pytest.fixture
+def stream_path(tmp_path):
+    path = str(tmp_path / "scene.pstr")
+    assert write_polygon_stream(path, random_polygon_parts(5000, part_size=1200, seed=0)) == 5000
+    return path
+
+def expected_visible(batch, model_view, projection=None, backface_culling=False):
+    """O que painter_algorithm faria com a cena inteira na memória"""
+    if projection is not None:
+        batch = batch.take(cull_frustum(batch, model_view, projection))
+    if backface_culling:
+        batch = batch.take(cull_backfaces(batch, model_view))
+    return sort_polygons(batch, model_view)
+
+@pytest.mark.parametrize("chunk_size", [700, 5000, 1 << 20])
+def test_ordered_visible_equals_whole_scene(stream_path, chunk_size):
+    stream = PolygonStream(stream_path, chunk_size=chunk_size)
+    whole = stream.to_batch()
+    for eye, target in (((0.0, 0.0, 5.0), (0.0, 0.0, -10.0)), ((8.0, 2.0, -4.0), (0.0, 0.0, -14.0))):
+        model_view = view(eye, target)
+        for projection in (None, PROJECTION):
+            visible = stream.ordered_visible(model_view, model_view, projection)
+            expected = expected_visible(whole, model_view, projection)
+            np.testing.assert_array_equal(visible.vertices, expected.vertices)
+            np.testing.assert_array_equal(visible.colors, expected.colors)
+    assert stream.stats["chunks"] == -(-5000 // chunk_size)
+
+def test_ties_keep_file_order(tmp_path):
+    # O mesmo lote gravado duas vezes: cada par de cópias empata, e a primeira vem antes
+    part = next(random_polygon_parts(600, seed=1))
+    path = str(tmp_path / "twice.pstr")
+    write_polygon_stream(path, [part, part])
+    stream = PolygonStream(path, chunk_size=250)
+    model_view = view((1.0, 1.0, 5.0))
+    visible = stream.ordered_visible(model_view, model_view)
+    expected = sort_polygons(PolygonBatch.concatenate([part, part]), model_view)
+    np.testing.assert_array_equal(visible.colors, expected.colors)
+
+def test_take_and_single_batch(tmp_path):
+    batch = create_random_3d_shapes(4, rng=np.random.default_rng(2))
+    path = str(tmp_path / "shapes.pstr")
+    assert write_polygon_stream(path, batch) == len(batch)
+    stream = PolygonStream(path)
+    assert len(stream) == len(batch)
+    np.testing.assert_array_equal(stream.to_batch().vertices, batch.vertices)
+    picked = stream.take([5, 0, 3])
+    np.testing.assert_array_equal(picked.vertices, batch.vertices[[5, 0, 3]])
+    np.testing.assert_array_equal(picked.colors, batch.colors[[5, 0, 3]])
+
+def test_truncated_file_is_rejected(stream_path):
+    with open(stream_path, "r+b") as f:
+        f.truncate(1000)
+    with pytest.raises(ValueError):
+        PolygonStream(stream_path)
@@ -0,0 +1,46 @@
+# test_radix_sort.py
+import numpy as np
+import pytest
+from radix_sort import quantize_depths, radix_argsort, radix_depth_order
+
+@pytest.mark.parametrize("dtype", [np.uint16, np.uint32])
+@pytest.mark.parametrize("digit_bits", [8, 16])
+def test_radix_argsort_equals_stable_argsort(dtype, digit_bits):
+    rng = np.random.default_rng(0)
+    keys = rng.integers(0, 50, 5000).astype(dtype) * dtype(997)  # Muitos empates, dígitos altos e baixos
+    np.testing.assert_array_equal(radix_argsort(keys, digit_bits), np.argsort(keys, kind="stable"))
+
+def test_quantize_depths_preserves_order():
+    depths = np.random.default_rng(1).uniform(-20.0, -1.0, 1000)
+    for bits in (16, 32):
+        keys = quantize_depths(depths, bits)
+        assert keys.dtype == (np.uint16 if bits == 16 else np.uint32)
+        assert (np.diff(keys[np.argsort(depths)].astype(np.int64)) >= 0).all()
+        assert keys.min() == 0 and keys.max() == 2 ** bits - 1
+
+def test_radix_depth_order_equals_stable_argsort():
+    # Profundidades com empates exatos e espaçadas o bastante para não empatar na quantização
+    depths = -np.random.default_rng(2).integers(1, 500, 4000) * 0.01
+    for bits in (16, 32):
+        stats = {}
+        order = radix_depth_order(depths, bits=bits, stats=stats)
+        np.testing.assert_array_equal(order, np.argsort(depths, kind="stable"))
+        assert stats == {"passes": bits // 16, "ties": 0}
+
+def test_quantization_ties_keep_original_order():
+    # 0.5 e 0.5 + 1e-9 caem na mesma chave de 16 bits: ficam na ordem original (argsort daria 2, 0, 4, 1, 3)
+    depths = np.array([0.5, 0.5 + 1e-9, 0.0, 1.0, 0.5])
+    stats = {}
+    order = radix_depth_order(depths, bits=16, stats=stats)
+    np.testing.assert_array_equal(order, [2, 0, 1, 4, 3])
+    assert stats["ties"] == 2
+
+def test_empty_and_constant_depths():
+    assert len(radix_depth_order(np.empty(0))) == 0
+    np.testing.assert_array_equal(radix_depth_order(np.full(5, -3.0)), np.arange(5))
+
+def test_invalid_sizes():
+    with pytest.raises(ValueError):
+        quantize_depths([1.0], bits=8)
+    with pytest.raises(ValueError):
+        radix_argsort(np.zeros(3, dtype=np.uint32), digit_bits=4)
@@ -0,0 +1,71 @@
+# test_scene_cache.py
+import os
+import numpy as np
+import pytest
+from painter_algorithm import cull_frustum, depth_order
+from polygon_batch import PolygonBatch, compute_normals
+from polygons import create_polygons_3D_oclusion, create_random_polygons
+from bsp_tree import build_bsp
+from scene_cache import cached_bsp, cached_bvh, cached_depth_order, scene_hash
+from helpers import PROJECTION, view
+
+@pytest.fixture
+def scene():
+    return compute_normals(create_polygons_3D_oclusion())
+
+def test_scene_hash_covers_every_array(scene):
+    base = scene_hash(scene)
+    v, c, n, ids = scene.vertices, scene.colors, scene.normals, scene.object_ids
+    assert scene_hash(PolygonBatch(v.copy(), c.copy(), n.copy(), ids.copy())) == base
+    colors = c.copy()
+    colors[0, 0] += 0.5
+    variants = [
+        PolygonBatch(v[::-1], c, n, ids),
+        PolygonBatch(v, colors, n, ids),
+        PolygonBatch(v, c, -n, ids),
+        PolygonBatch(v, c, None, ids),
+        PolygonBatch(v, c, n, ids + 1),
+        PolygonBatch(v, c, n),
+    ]
+    hashes = [scene_hash(batch) for batch in variants]
+    assert base not in hashes and len(set(hashes)) == len(hashes)
+
+def test_cached_bsp_round_trip(tmp_path, scene):
+    built = build_bsp(scene)
+    first = cached_bsp(scene, cache_dir=str(tmp_path))
+    loaded = cached_bsp(scene, cache_dir=str(tmp_path))   # Aberto do arquivo
+    assert len(os.listdir(tmp_path)) == 1
+    for tree in (first, loaded):
+        for name in ("vertices", "colors", "normals", "object_ids"):
+            np.testing.assert_array_equal(getattr(tree.polygons, name), getattr(built.polygons, name))
+        eye = np.array([3.0, 2.0, 4.0])
+        np.testing.assert_array_equal(tree.back_to_front(eye), built.back_to_front(eye))
+
+    # Parâmetros de construção diferentes: outro arquivo
+    cached_bsp(scene, cache_dir=str(tmp_path), candidates=4)
+    assert len(os.listdir(tmp_path)) == 2
+
+def test_cached_bvh_culls_like_linear(tmp_path):
+    batch = create_random_polygons(num=2000, rng=np.random.default_rng(0))
+    cached_bvh(batch, cache_dir=str(tmp_path), leaf_size=16)
+    bvh = cached_bvh(batch, cache_dir=str(tmp_path), leaf_size=16)
+    assert bvh.leaf_size == 16 and len(os.listdir(tmp_path)) == 1
+    model_view = view((5.0, 0.0, -5.0), (0.0, 0.0, -15.0))
+    np.testing.assert_array_equal(np.sort(bvh.traverse(batch, model_view, PROJECTION)),
+                                  cull_frustum(batch, model_view, PROJECTION))
+
+def test_cached_depth_order(tmp_path, scene):
+    for eye in ((0.0, 0.0, 5.0), (4.0, 1.0, 2.0)):
+        view_mat = view(eye)
+        cached_depth_order(scene, view_mat, cache_dir=str(tmp_path))
+        np.testing.assert_array_equal(cached_depth_order(scene, view_mat, cache_dir=str(tmp_path)),
+                                      depth_order(scene, view_mat))
+    assert len(os.listdir(tmp_path)) == 2
+
+def test_corrupted_file_is_rejected(tmp_path, scene):
+    cached_bsp(scene, cache_dir=str(tmp_path))
+    path = os.path.join(tmp_path, os.listdir(tmp_path)[0])
+    with open(path, "ab") as f:
+        f.write(b"\0" * 8)
+    with pytest.raises(ValueError):
+        cached_bsp(scene, cache_dir=str(tmp_path))
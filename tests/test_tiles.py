@@ -0,0 +1,70 @@
+# test_tiles.py
+import numpy as np
+from painter_algorithm import perspective
+from polygons import create_random_polygons
+from tiles import bin_boxes, screen_bounds, screen_tiles
+from helpers import view
+
+def random_boxes(n, seed=0):
+    rng = np.random.default_rng(seed)
+    lo = rng.uniform(0.0, 500.0, (n, 2))
+    return lo, lo + rng.exponential(20.0, (n, 2))
+
+def overlapping_pairs(lo, hi):
+    """Todos os pares a < b de caixas que se sobrepõem (força bruta)"""
+    a, b = np.triu_indices(len(lo), 1)
+    keep = ((lo[a] <= hi[b]) & (lo[b] <= hi[a])).all(axis=1)
+    return set(zip(a[keep].tolist(), b[keep].tolist()))
+
+def test_tiles_hold_the_boxes_that_cover_them():
+    lo, hi = random_boxes(300)
+    bins = bin_boxes(lo, hi, 32.0)
+    for t in range(len(bins)):
+        tx, ty = t % bins.tiles_x, t // bins.tiles_x
+        tile_lo = bins.origin + bins.tile_size * np.array([tx, ty])
+        tile_hi = tile_lo + bins.tile_size
+        covers = ((np.floor((lo - bins.origin) / bins.tile_size) <= [tx, ty]) &
+                  (np.floor((hi - bins.origin) / bins.tile_size) >= [tx, ty])).all(axis=1)
+        np.testing.assert_array_equal(bins[t], np.flatnonzero(covers))
+        assert (lo[bins[t]] < tile_hi).all() and (hi[bins[t]] >= tile_lo).all()
+    assert bins.counts.sum() == len(bins.poly_index)
+
+def test_pairs_equal_brute_force():
+    lo, hi = random_boxes(400, seed=1)
+    for tile_size in (8.0, 32.0, 1000.0):
+        a, b = bin_boxes(lo, hi, tile_size).pairs()
+        assert (a < b).all()
+        found = list(zip(a.tolist(), b.tolist()))
+        assert len(found) == len(set(found))          # Cada par uma única vez
+        assert set(found) == overlapping_pairs(lo, hi)
+
+def test_pair_batches_equal_pairs():
+    lo, hi = random_boxes(400, seed=2)
+    bins = bin_boxes(lo, hi, 16.0)
+    expected = set(zip(*(x.tolist() for x in bins.pairs())))
+    batches = list(bins.pair_batches(50))
+    assert len(batches) > 1
+    found = [p for a, b in batches for p in zip(a.tolist(), b.tolist())]
+    assert len(found) == len(expected) and set(found) == expected
+
+    # select descarta pares antes dos outros testes
+    even = list(bins.pair_batches(50, select=lambda a, b: (a + b) % 2 == 0))
+    found = {p for a, b in even for p in zip(a.tolist(), b.tolist())}
+    assert found == {p for p in expected if sum(p) % 2 == 0}
+
+def test_invalid_and_outside_boxes_are_not_binned():
+    lo, hi = random_boxes(50, seed=3)
+    valid = np.arange(50) % 5 != 0
+    bins = bin_boxes(lo, hi, 32.0, origin=(0.0, 0.0), shape=(4, 4), valid=valid)
+    inside = valid & (lo < 128.0).all(axis=1)
+    np.testing.assert_array_equal(bins.binned, inside)
+    np.testing.assert_array_equal(np.unique(bins.poly_index), np.flatnonzero(inside))
+
+def test_screen_tiles_cover_the_window():
+    batch = create_random_polygons(num=500, rng=np.random.default_rng(4))
+    mvp = perspective(60.0, 800.0 / 600.0, 0.1, 100.0) @ view((0.0, 0.0, 5.0))
+    bins = screen_tiles(batch, mvp, 800, 600, tile_size=64)
+    assert (bins.tiles_x, bins.tiles_y) == (13, 10)
+    lo, hi, valid = screen_bounds(batch, mvp, 800, 600)
+    on_screen = valid & (hi >= 0).all(axis=1) & (lo < [832, 640]).all(axis=1)
+    np.testing.assert_array_equal(bins.binned, on_screen)
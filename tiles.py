@@ -0,0 +1,220 @@
+# tiles.py
+import numpy as np
+from polygon_batch import as_batch
+
+# ------------------------------------------------------
+# Agrupamento dos polígonos por tiles da tela
+# ------------------------------------------------------
+# A tela é dividida em tiles quadrados de tile_size x tile_size e cada polígono
+# entra em todos os tiles que sua caixa (AABB) na tela cobre. O resultado fica em
+# formato CSR (um array de índices e um de inícios), montado sem laços em Python.
+# Cada tile pode então ser processado de forma independente (testes de
+# sobreposição, ordenação, rasterização), e o trabalho acompanha a densidade
+# local: polígonos que nunca dividem um tile nunca são comparados.
+
+TILE_SIZE = 32  # Lado padrão de um tile em pixels
+
+class TileBins:
+    """
+    Polígonos agrupados por tile (formato CSR), criados por bin_boxes ou screen_tiles
+    Os polígonos do tile t (coluna tx, linha ty, t = ty * tiles_x + tx) são
+    poly_index[tile_start[t]:tile_start[t + 1]], em ordem crescente
+    lo, hi: (N, 2) caixa de cada polígono; binned: (N,) se o polígono entrou em algum tile
+    """
+
+    def __init__(self, poly_index, tile_start, tiles_x, tiles_y, tile_size, origin, lo, hi, binned):
+        self.poly_index = poly_index
+        self.tile_start = tile_start
+        self.tiles_x = tiles_x
+        self.tiles_y = tiles_y
+        self.tile_size = tile_size
+        self.origin = origin
+        self.lo = lo
+        self.hi = hi
+        self.binned = binned
+        self._corner = None  # Tile (tx, ty) do canto mínimo de cada caixa (calculado em pairs)
+
+    def __len__(self):
+        return self.tiles_x * self.tiles_y
+
+    def __getitem__(self, t):
+        """Índices dos polígonos do tile t"""
+        return self.poly_index[self.tile_start[t]:self.tile_start[t + 1]]
+
+    def __repr__(self):
+        return "TileBins(%dx%d tiles de %g, %d entradas)" % (
+            self.tiles_x, self.tiles_y, self.tile_size, len(self.poly_index))
+
+    @property
+    def counts(self):
+        """Número de polígonos em cada tile (tiles_x * tiles_y,)"""
+        return np.diff(self.tile_start)
+
+    def tile_of(self, points):
+        """Tile (tx, ty) que contém cada ponto (M, 2), limitado à grade"""
+        cell = np.floor((np.asarray(points, dtype=float) - self.origin) / self.tile_size).astype(np.intp)
+        return np.clip(cell, 0, [self.tiles_x - 1, self.tiles_y - 1])
+
+    # --------------------------------------------------
+    # Ocupação
+    # --------------------------------------------------
+
+    def occupancy_histogram(self):
+        """
+        Histograma da ocupação dos tiles em faixas de potências de 2
+        Retorna (hist, edges): hist[k] tiles com edges[k] <= polígonos < edges[k + 1]
+        (edges = 0, 1, 2, 4, 8, ...)
+        """
+        counts = self.counts
+        top = int(counts.max()) if len(counts) else 0
+        edges = [0, 1]
+        while edges[-1] <= top:
+            edges.append(edges[-1] * 2)
+        hist, _ = np.histogram(counts, bins=edges)
+        return hist, np.array(edges)
+
+    def stats(self):
+        """Resumo da ocupação: tiles, vazios, média/p95/máximo e replicação (entradas por polígono)"""
+        counts = self.counts
+        binned = int(self.binned.sum())
+        return {
+            "tiles": len(self),
+            "tile_size": self.tile_size,
+            "entries": len(self.poly_index),
+            "empty_tiles": int((counts == 0).sum()),
+            "occupancy_mean": float(counts.mean()) if len(counts) else 0.0,
+            "occupancy_p95": float(np.percentile(counts, 95)) if len(counts) else 0.0,
+            "occupancy_max": int(counts.max()) if len(counts) else 0,
+            "replication": len(self.poly_index) / binned if binned else 0.0,
+        }
+
+    # --------------------------------------------------
+    # Pares candidatos
+    # --------------------------------------------------
+
+    def pairs(self):
+        """
+        Pares (a, b), a < b, de polígonos que dividem algum tile e cujas caixas se sobrepõem
+        Cada par aparece uma vez: só no tile que contém o canto mínimo da interseção das caixas
+        """
+        return self._tile_pairs(0, len(self))
+
+    def pair_batches(self, max_pairs, select=None):
+        """
+        Os mesmos pares de pairs(), entregues em grupos de tiles consecutivos com até
+        max_pairs pares brutos (antes de descartar repetidos) cada; um tile com mais
+        pares que isso forma um grupo sozinho. Limita a memória em cenas muito densas
+        select(a, b): máscara opcional aplicada aos pares brutos antes dos outros testes
+                      (um filtro barato que descarta a maioria dos pares economiza o resto)
+        """
+        counts = self.counts
+        raw = np.cumsum(counts * (counts - 1) // 2)
+        t0 = 0
+        while t0 < len(self):
+            base = raw[t0 - 1] if t0 else 0
+            t1 = max(int(np.searchsorted(raw, base + max_pairs, side="right")), t0 + 1)
+            yield self._tile_pairs(t0, t1, select)
+            t0 = t1
+
+    def _tile_pairs(self, t0, t1, select=None):
+        """Pares de pairs() cujo tile do canto da interseção está entre t0 e t1 - 1"""
+        start, end = self.tile_start[t0], self.tile_start[t1]
+        counts = self.counts[t0:t1]
+        if end - start < 2:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+
+        # Todos os pares dentro de cada tile
+        tile = np.repeat(np.arange(t0, t1), counts)
+        ends = np.repeat(self.tile_start[t0 + 1:t1 + 1], counts)
+        pos = np.arange(start, end)
+        partners = ends - pos - 1
+        first = np.repeat(pos, partners)
+        second = first + 1 + np.arange(partners.sum()) - np.repeat(np.cumsum(partners) - partners, partners)
+        a, b = self.poly_index[first], self.poly_index[second]
+        if select is not None:
+            keep = select(a, b)
+            a, b, first = a[keep], b[keep], first[keep]
+
+        # Um par é gerado em cada tile em comum: fica só o do canto da interseção
+        # (o tile de max(lo_a, lo_b) é o máximo, por eixo, dos tiles dos dois cantos)
+        if self._corner is None:
+            self._corner = self.tile_of(self.lo)
+        corner = np.maximum(self._corner[a], self._corner[b])
+        keep = tile[first - start] == corner[:, 1] * self.tiles_x + corner[:, 0]
+        a, b = a[keep], b[keep]
+        lo, hi = self.lo, self.hi
+        keep = (lo[a, 0] <= hi[b, 0]) & (lo[b, 0] <= hi[a, 0]) & (lo[a, 1] <= hi[b, 1]) & (lo[b, 1] <= hi[a, 1])
+        return a[keep], b[keep]
+
+def bin_boxes(lo, hi, tile_size=TILE_SIZE, origin=None, shape=None, valid=None):
+    """
+    Agrupa caixas 2D (lo, hi: (N, 2)) em tiles de lado tile_size
+    origin: canto da grade (padrão: canto mínimo das caixas)
+    shape: (tiles_x, tiles_y) (padrão: o suficiente para cobrir todas as caixas)
+    valid: (N,) máscara opcional; caixas inválidas ou fora da grade não entram em nenhum tile
+    """
+    lo = np.asarray(lo, dtype=float).reshape(-1, 2)
+    hi = np.asarray(hi, dtype=float).reshape(-1, 2)
+    n = len(lo)
+    valid = np.ones(n, dtype=bool) if valid is None else np.asarray(valid, dtype=bool)
+    if origin is None:
+        origin = lo[valid].min(axis=0) if valid.any() else np.zeros(2)
+    origin = np.asarray(origin, dtype=float)
+    if shape is None:
+        extent = (hi[valid].max(axis=0) - origin) if valid.any() else np.zeros(2)
+        shape = np.maximum(np.floor(extent / tile_size).astype(np.intp) + 1, 1)
+    tiles_x, tiles_y = int(shape[0]), int(shape[1])
+
+    # Tiles do canto mínimo e máximo de cada caixa (recortados à grade)
+    c0 = np.floor((lo - origin) / tile_size)
+    c1 = np.floor((hi - origin) / tile_size)
+    inside = valid & (c1[:, 0] >= 0) & (c1[:, 1] >= 0) & (c0[:, 0] < tiles_x) & (c0[:, 1] < tiles_y)
+    limit = np.array([tiles_x - 1, tiles_y - 1])
+    c0 = np.clip(c0, 0, limit).astype(np.intp)
+    c1 = np.clip(c1, 0, limit).astype(np.intp)
+
+    # Cada polígono entra em todos os tiles que sua caixa cobre
+    span = c1 - c0 + 1
+    cover = np.where(inside, span[:, 0] * span[:, 1], 0)
+    owner = np.repeat(np.arange(n), cover)
+    k = np.arange(len(owner)) - np.repeat(np.cumsum(cover) - cover, cover)
+    tx = c0[owner, 0] + k % span[owner, 0]
+    ty = c0[owner, 1] + k // span[owner, 0]
+    tile = ty * tiles_x + tx
+
+    # CSR: ordenação estável por tile mantém os polígonos em ordem crescente dentro de cada tile
+    # (com até 65536 tiles a chave cabe em 16 bits e o NumPy usa radix sort)
+    by_tile = np.argsort(tile.astype(np.uint16) if tiles_x * tiles_y <= 1 << 16 else tile, kind="stable")
+    tile_start = np.zeros(tiles_x * tiles_y + 1, dtype=np.intp)
+    np.cumsum(np.bincount(tile, minlength=tiles_x * tiles_y), out=tile_start[1:])
+    return TileBins(owner[by_tile], tile_start, tiles_x, tiles_y, tile_size, origin, lo, hi, inside)
+
+def screen_bounds(polygons, mvp, width, height):
+    """
+    Caixa de cada polígono na tela, em pixels (mesmas coordenadas de software_renderer)
+    Retorna (lo, hi, valid): lo, hi (N, 2) float32; valid False com vértice atrás da câmera
+    """
+    verts = as_batch(polygons).vertices
+    rows = np.asarray(mvp, dtype=np.float32)[[0, 1, 3]]
+    clip = (verts.reshape(-1, 3) @ rows[:, 0:3].T + rows[:, 3]).reshape(-1, 3, 3)  # x, y, w de cada vértice
+    w = clip[..., 2]
+    valid = (w > 1e-9).all(axis=1)
+    w = np.where(w > 1e-9, w, np.float32(1.0))
+    x = (clip[..., 0] / w + 1.0) * (0.5 * width)
+    y = (1.0 - clip[..., 1] / w) * (0.5 * height)       # Linha 0 no topo da imagem
+    lo = np.stack([np.minimum(np.minimum(x[:, 0], x[:, 1]), x[:, 2]),
+                   np.minimum(np.minimum(y[:, 0], y[:, 1]), y[:, 2])], axis=1)
+    hi = np.stack([np.maximum(np.maximum(x[:, 0], x[:, 1]), x[:, 2]),
+                   np.maximum(np.maximum(y[:, 0], y[:, 1]), y[:, 2])], axis=1)
+    return lo, hi, valid
+
+def screen_tiles(polygons, mvp, width, height, tile_size=TILE_SIZE):
+    """
+    Projeta os polígonos (mvp = projeção @ modelview) e os agrupa em tiles de
+    tile_size pixels sobre a tela width x height
+    Polígonos atrás da câmera ou fora da tela não entram em nenhum tile
+    """
+    lo, hi, valid = screen_bounds(polygons, mvp, width, height)
+    shape = (-(-width // tile_size), -(-height // tile_size))
+    return bin_boxes(lo, hi, tile_size, origin=(0.0, 0.0), shape=shape, valid=valid)